@@ -2,19 +2,32 @@
 Module defining the Base Bot.
 """
 from abc import ABC, abstractmethod
+from typing import Optional
 
 from engine import Color, Game, Move
+from engine.book import OpeningBook
 
 
 class BaseBot(ABC):
     """
     Base class for all bots. To be used as an interface.
+
+    :param name: Defaults to `default_name`.
+    :param book: Opening book for the bot to play from while the game is in it,
+        see `book_move`.
     """
-    def __init__(self, color: Color) -> None:
+    def __init__(
+        self, color: Color, name: Optional[str] = None, book: Optional[OpeningBook] = None
+    ) -> None:
         self.color: Color = color
-        self.name: str = f"{color.name.capitalize()}_{self.__class__.__name__}"
+        self.name: str = name or self.default_name(color)
         self.clock: float = 0
         self.move_count: int = 0
+        self.book = book
+
+    @classmethod
+    def default_name(cls, color: Color) -> str:
+        return f"{color.name.capitalize()}_{cls.__name__}"
 
     @abstractmethod
     def select_move(self, game: Game) -> Move:
@@ -25,5 +38,12 @@ class BaseBot(ABC):
             raise RuntimeError(f"It's not my turn yet. I'm playing as {str(self.color).lower()}.")
         return next(game.legal_moves())
 
+    def book_move(self, game: Game) -> Optional[Move]:
+        """
+        A move from the opening book for the position, to play instead of searching one.
+        None without a book or out of it.
+        """
+        return self.book.choose(game) if self.book is not None else None
+
     def display_time_taken(self) -> None:
         print(f"{self.name} took {round(self.clock, 5)}s.")
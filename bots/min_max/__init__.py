@@ -2,6 +2,7 @@
 This package contains the implementation of the Min-Max Bot.
 """
 
-from bots.min_max.bot import MinMaxBot
+from bots.min_max.bot import MinMaxBot, SearchConfig, SearchOptions, TimeControl
+from bots.min_max.stats import SearchStats
 
-__all__ = ["MinMaxBot"]
+__all__ = ["MinMaxBot", "SearchConfig", "SearchOptions", "SearchStats", "TimeControl"]
@@ -1,72 +1,491 @@
 """
 Minmax bot.
 """
+from __future__ import annotations
+
+import math
+import multiprocessing
+import queue
 import random
-from typing import Optional
+import time
+from multiprocessing.queues import Queue
+from multiprocessing.synchronize import Event as EventType
+from typing import Iterator, NamedTuple, Optional
 
 from bots.basebot import BaseBot
-from engine import Color, Game, Move, PieceType
+from bots.min_max.ordering import MoveOrdering, material_gain
+from bots.min_max.stats import SearchStats
+from bots.min_max.transposition import (
+    ENTRY_SIZE, Bound, Entry, SharedTranspositionTable, TranspositionTable
+)
+from engine import Color, Game, Move, from_fen, to_fen
+from engine.batch import board_array, play_moves
+from engine.board import BaseBoard
+from engine.book import OpeningBook
+from engine.encoding import decode_move
+from engine.evaluation import PIECE_VALUES, evaluate_boards
+from engine.types import BISHOP, KNIGHT, NULL_MOVE, QUEEN, ROOK
+
+MOVES_TO_GO = 30  # Moves the remaining game time is spread over
+TIME_CHECK_INTERVAL = 256  # Nodes searched between two looks at the clock
+DELTA_MARGIN = 200  # Positional gain a capture may bring on top of the material it wins
+ASPIRATION_WINDOW = 50  # Distance of the aspiration window bounds from the expected score
+NULL_MOVE_REDUCTION = 2  # Plies, on top of the passed one
+LATE_MOVE_INDEX = 3  # Moves searched at full depth before the late move reductions start
+REDUCTION_MIN_DEPTH = 3  # Shallowest search to reduce late moves in
+RESULT_POLL_INTERVAL = 0.1  # Seconds between two checks for helper processes that died
+FULL_WINDOW = (float("-inf"), float("inf"))
+
+
+class TimeControl(NamedTuple):
+    """
+    Time allowed for the moves: `move_time` seconds for every move, or else `game_time` seconds
+    for the whole game, `increment` seconds more for every move played.
+    """
+    move_time: Optional[float] = None
+    game_time: Optional[float] = None
+    increment: float = 0
+
+    def budget(self, clock: float, move_count: int) -> Optional[float]:
+        """
+        Seconds to spend on the next move, given the time used and the moves played so far.
+        None when the time is not limited.
+        """
+        if self.move_time is not None:
+            return self.move_time
+        if self.game_time is None:
+            return None
+        remaining = self.game_time + self.increment * move_count - clock
+        return max(0.0, min(remaining / MOVES_TO_GO + self.increment, remaining / 2))
+
+
+class SearchOptions(NamedTuple):
+    """
+    Search techniques on top of plain alpha-beta, each of which can be switched off
+    to compare the search with and without it.
+
+    :param quiescence: Search captures and promotions past `max_depth`, until the position
+        is quiet, instead of scoring it in the middle of an exchange.
+    :param pvs: Principal variation search: once a move has set the score to beat, search the
+        others with a null window, which only tells whether they beat it, and search again
+        with the full window the few that do.
+    :param aspiration: Search the first root move in a window of `ASPIRATION_WINDOW` around the
+        score of the previous iteration, again with the full window if it falls outside.
+    :param null_move: Skip the moves of a position in which passing the turn, searched
+        `NULL_MOVE_REDUCTION` plies shallower, already refutes the opponent's last move.
+        Not when in check, nor with only pawns left, where passing may really be the best move.
+    :param late_move_reductions: Search the quiet moves that come late in the move order a ply
+        shallower, and again at full depth if they turn out better than the best so far.
+    """
+    quiescence: bool = True
+    pvs: bool = True
+    aspiration: bool = True
+    null_move: bool = True
+    late_move_reductions: bool = True
+
+
+class SearchConfig(NamedTuple):
+    """
+    How a `MinMaxBot` searches, beyond how deep.
+
+    :param hash_size_mb: Memory budget of the transposition table, kept across moves.
+        0 disables the table.
+    :param workers: Number of processes to search with, see `MinMaxBot.lazy_smp`. Their
+        transposition table of `hash_size_mb` is in shared memory.
+    :param time_control: Time allowed for the moves, checked against the bot's `clock` and
+        `move_count`. Without a limit every search goes to `max_depth`.
+    :param options: Search techniques to use, all of them by default.
+    :param stats: Filled with the statistics of each move's search, see `SearchStats`.
+        Without it nothing is counted but `nodes`.
+    :param book: Opening book to play from before searching, see `BaseBot`.
+    """
+    hash_size_mb: float = 16
+    workers: int = 1
+    time_control: TimeControl = TimeControl()
+    options: SearchOptions = SearchOptions()
+    stats: Optional[SearchStats] = None
+    book: Optional[OpeningBook] = None
+
+
+class Node(NamedTuple):
+    """
+    Where a position stands in the search.
+    """
+    depth: int  # Plies left to search
+    window: tuple[float, float]  # Alpha-beta window (a, b)
+    ply: int  # Plies from the root
+
+
+class SearchResult(NamedTuple):
+    depth: int  # Deepest iteration completed
+    scored_moves: list[tuple[Move, float]]
+    nodes: int
+
+
+class HelperTask(NamedTuple):
+    """
+    What a helper process of `MinMaxBot.lazy_smp` needs to search, all of it cheap to pickle.
+    """
+    fen: str
+    board_type: type[BaseBoard]
+    color: Color
+    max_depth: int
+    move_time: Optional[float]  # Seconds to search for, None for no limit
+    options: SearchOptions
+    hash_size_mb: float
+    table_name: Optional[str]  # Shared memory block of the transposition table, if any
+    table_age: int
+    helper: int  # Index of the process, see `MinMaxBot.iterative_deepening`
+
+
+class SearchTimeout(Exception):
+    """
+    Raised from inside the search when the time for the move is up.
+    """
 
 
 class MinMaxBot(BaseBot):
+    """
+    Iterative deepening alpha-beta search, scoring positions from this bot's point of view.
+    Every iteration searches one ply deeper, up to `max_depth`, starting with the best root moves
+    of the previous one. Past `max_depth` only captures are searched, see `quiescence`.
+    Under time control the search stops when the time for the move is up,
+    and the move played is the best one of the last completed iteration.
+
+    :param config: Table size, processes, time control, search techniques, stats and
+        opening book, see `SearchConfig`.
+    """
 
-    def __init__(self, color: Color, max_depth: int, name: Optional[str] = None) -> None:
-        super().__init__(color)
+    def __init__(
+        self,
+        color: Color,
+        max_depth: int,
+        name: Optional[str] = None,
+        config: SearchConfig = SearchConfig(),
+    ) -> None:
+        super().__init__(color, name or f"{self.default_name(color)}_d{max_depth}", config.book)
         self.max_depth = max_depth
-        self.name = name or f"{self.name}_d{max_depth}"
+        self.config = config
+        self.table: Optional[TranspositionTable] = None
+        if config.hash_size_mb > 0:
+            self.table = (
+                SharedTranspositionTable(config.hash_size_mb) if config.workers > 1
+                else TranspositionTable(config.hash_size_mb)
+            )
+        self.ordering = MoveOrdering()
+        self.deadline: Optional[float] = None  # Clock time the running search has to stop at
+        self.nodes = 0
+        self.completed_depth = -1  # Of the last move's search
 
     def select_move(self, game: Game) -> Move:
         super().select_move(game)
-        moves = game.legal_moves(color=self.color)
-        scored_moves: list[tuple[Move, float]]  = []
-        best_score = float("-inf")
-        for move in moves:
-            score = self.evaluate(
-                game.seek_move(move), depth=self.max_depth, a=float("-inf"), b=float("inf")
-            )
-            scored_moves.append((move, score))
-            best_score = max(best_score, score)
+        if (move := self.book_move(game)) is not None:
+            self.completed_depth = -1
+            if self.config.stats is not None:
+                self.config.stats.reset()
+                self.config.stats.finish()
+            return move
+        if self.table is not None:
+            self.table.new_search()
+        self.ordering.new_search()
+        if self.config.workers > 1:
+            scored_moves = self.lazy_smp(game)
+        else:
+            scored_moves = self.iterative_deepening(game)
+        best_score = max(score for _, score in scored_moves)
         return random.choice([move for move, score in scored_moves if score == best_score])
 
+    def lazy_smp(self, game: Game) -> list[tuple[Move, float]]:
+        """
+        Scores of the root moves, searched by `SearchConfig.workers` processes at once (Lazy SMP).
+        The helper processes run the same iterative deepening as this one, each in its own order
+        and every other one a ply deeper. They share nothing but the transposition table,
+        where they find most of the positions the others have searched already.
+        When this process's search ends, the helpers are stopped, and the scores of the deepest
+        iteration any of them completed are kept.
+        """
+        stop_event = multiprocessing.Event()
+        results: Queue[SearchResult] = multiprocessing.Queue()
+        table = self.table if isinstance(self.table, SharedTranspositionTable) else None
+        task = HelperTask(
+            to_fen(game), type(game.board), self.color, self.max_depth,
+            self.config.time_control.budget(self.clock, self.move_count), self.config.options,
+            table.size * ENTRY_SIZE / 2**20 if table else 0, table.name if table else None,
+            table.age if table else 0, helper=0
+        )
+        started: list[multiprocessing.Process] = []
+        searches = []
+        try:
+            for helper in range(1, self.config.workers):
+                process = multiprocessing.Process(
+                    target=_lazy_smp_helper,
+                    args=(task._replace(helper=helper), stop_event, results)
+                )
+                process.start()
+                started.append(process)
+            scored_moves = self.iterative_deepening(game)
+            searches.append(SearchResult(self.completed_depth, scored_moves, 0))  # Nodes counted
+        finally:
+            stop_event.set()
+            searches += _collect_results(results, started)
+            for process in started:
+                process.join()
+        self.completed_depth, scored_moves, _ = max(searches, key=lambda search: search.depth)
+        self.nodes += sum(search.nodes for search in searches)
+        return scored_moves
+
+    def iterative_deepening(self, game: Game, helper: int = 0) -> list[tuple[Move, float]]:
+        """
+        Scores of the root moves from the deepest iteration completed in time.
+        The first iteration, a single ply, always completes.
+
+        :param helper: Index of the process in a `lazy_smp` search, 0 for the main one.
+            Helpers search the root moves in their own random order, the odd ones starting
+            a ply deeper.
+        """
+        start = time.perf_counter()
+        budget = self.config.time_control.budget(self.clock, self.move_count)
+        moves = list(game.legal_moves(color=self.color))
+        if helper:
+            random.Random(helper).shuffle(moves)
+        scored_moves: list[tuple[Move, float]] = []
+        self.completed_depth = -1
+        stats = self.config.stats
+        if stats is not None:
+            stats.reset()
+        for depth in range(helper % 2, self.max_depth + 1):
+            self.deadline = None if budget is None or depth == 0 else start + budget
+            guess = max((score for _, score in scored_moves), default=None)
+            try:
+                scored_moves = self.search_root(game, moves, depth, guess)
+            except SearchTimeout:
+                break
+            self.completed_depth = depth
+            # The principal variation first: the best moves so far are the most likely to stay so
+            moves = [move for move, _ in sorted(scored_moves, key=lambda x: x[1], reverse=True)]
+            if stats is not None:
+                stats.end_iteration(depth, max(score for _, score in scored_moves), moves[0])
+            if budget is not None and time.perf_counter() - start > budget / 2:
+                break  # The next iteration would not complete in the time left
+        self.deadline = None
+        if stats is not None:
+            stats.finish()
+        return scored_moves
+
+    def search_root(
+        self, game: Game, moves: list[Move], depth: int, guess: Optional[float] = None
+    ) -> list[tuple[Move, float]]:
+        """
+        Score of each root move, `depth` plies below it, or with `pvs` an upper bound of the score
+        for the moves that are worse than the best one, strictly below the best score.
+        On a timeout the game is put back as it was before the `SearchTimeout` propagates.
+
+        :param guess: Expected best score, the previous iteration's, to set the aspiration window.
+        """
+        ply = len(game.undo_stack)
+        options = self.config.options
+        scored_moves: list[tuple[Move, float]] = []
+        best_score = float("-inf")
+        try:
+            for move in moves:
+                game.make_move(move)
+                if (
+                    not scored_moves and options.aspiration
+                    and guess is not None and math.isfinite(guess)
+                ):
+                    window = guess - ASPIRATION_WINDOW, guess + ASPIRATION_WINDOW
+                    score = self.evaluate(game, Node(depth, window, 1))
+                    if not window[0] < score < window[1]:
+                        score = self.evaluate(game, Node(depth, FULL_WINDOW, 1))
+                elif scored_moves and options.pvs and math.isfinite(best_score):
+                    # Whether the move is at least as good as the best, then by how much
+                    score = self.evaluate(game, Node(depth, (best_score - 1, best_score), 1))
+                    if score >= best_score:
+                        score = self.evaluate(
+                            game, Node(depth, (best_score - 1, float("inf")), 1)
+                        )
+                else:
+                    score = self.evaluate(game, Node(depth, FULL_WINDOW, 1))
+                game.unmake_move()
+                scored_moves.append((move, score))
+                best_score = max(best_score, score)
+        except SearchTimeout:
+            while len(game.undo_stack) > ply:
+                game.unmake_move()
+            raise
+        return scored_moves
+
     def leaf_node_heuristics(self, game: Game) -> float:
+        if self.config.stats is not None:
+            self.config.stats.leaf()
+        return game.evaluation.score(self.color)
+
+    def leaf_scores(self, game: Game, moves: list[Move]) -> list[float]:
+        """
+        Heuristic scores of the positions after each of the moves, computed in a single call.
+        """
+        boards = play_moves(board_array(game.board), moves)
+        scores: list[float] = evaluate_boards(boards, self.color).astype(float).tolist()
+        if self.config.stats is not None:
+            self.config.stats.leaf(len(moves))
+        return scores
 
-        piece_weights: dict[PieceType, float] = {
-            PieceType.PAWN: 1,
-            PieceType.KNIGHT: 3,
-            PieceType.BISHOP: 3,
-            PieceType.ROOK: 5,
-            PieceType.QUEEN: 9,
-            PieceType.KING: 100
-        }
-
-        my_pieces = game.board.get_pieces(color=self.color)
-        opponent_pieces = game.board.get_pieces(color=~self.color)
-
-        advantage = (
-            (
-                sum(map(lambda x: piece_weights[x[0].type], my_pieces))
-                - sum(map(lambda x: piece_weights[x[0].type], opponent_pieces))
-            ) / (
-                sum(map(lambda x: piece_weights[x[0].type], my_pieces))
-                + sum(map(lambda x: piece_weights[x[0].type], opponent_pieces))
+    def ordered_moves(
+        self, game: Game, depth: int, entry: Optional[Entry], ply: int
+    ) -> Iterator[tuple[Move, Optional[float]]]:
+        """
+        Legal moves in the order to search them, with their leaf scores on the last ply.
+        See `MoveOrdering` for the order above it. There the moves are generated in the stages
+        of `Game.move_stages`, so quiet moves are never generated at a node that a capture cuts.
+        """
+        if depth == 1:
+            # The children are leaves: score them all at once, and search the best scoring first
+            moves = list(game.legal_moves(color=game.active_color))
+            scores = self.leaf_scores(game, moves)
+            order = sorted(
+                range(len(moves)), key=scores.__getitem__, reverse=game.active_color == self.color
             )
+            yield from ((moves[index], scores[index]) for index in order)
+            return
+        hash_move = decode_move(entry.move, game.board) if entry and entry.move else None
+        for stage in game.move_stages(hash_move):
+            yield from ((move, None) for move in self.ordering.order(game, stage, ply))
+
+    def count_node(self, ply: int) -> None:
+        """
+        Counts a node searched, `ply` plies from the root, looking at the clock
+        every `TIME_CHECK_INTERVAL` nodes.
+
+        :raises SearchTimeout: When the clock passes `deadline`.
+        """
+        self.nodes += 1
+        if self.config.stats is not None:
+            self.config.stats.node(ply)
+        if (
+            not self.nodes % TIME_CHECK_INTERVAL
+            and self.deadline is not None and time.perf_counter() > self.deadline
+        ):
+            raise SearchTimeout
+
+    def quiescence(
+        self, game: Game, a: float, b: float, stand_pat: Optional[float] = None, ply: int = 1
+    ) -> float:
+        """
+        Score of a position past the search horizon, searching only captures and promotions
+        until none is left worth playing. The side to move may also stand pat: decline them all
+        and keep the heuristic score. A capture is skipped when even winning the piece for free,
+        with `DELTA_MARGIN` on top, could not bring the score back into the window.
+
+        :param stand_pat: Heuristic score of the position, if already known.
+        :raises SearchTimeout: When the clock passes `deadline`.
+        """
+        self.count_node(ply)
+        its_my_turn = game.active_color == self.color
+        best_score = stand_pat = self.leaf_node_heuristics(game) if stand_pat is None else stand_pat
+        if its_my_turn:
+            a = max(a, stand_pat)
+        else:
+            b = min(b, stand_pat)
+        if a >= b:
+            return stand_pat
+
+        captures = list(game.legal_moves(captures_only=True))
+        for move in self.ordering.order(game, captures, ply):
+            # Delta pruning. The score stays below the most the capture could bring
+            reach = material_gain(move) + DELTA_MARGIN
+            if its_my_turn and stand_pat + reach <= a:
+                best_score = max(best_score, stand_pat + reach)
+                continue
+            if not its_my_turn and stand_pat - reach >= b:
+                best_score = min(best_score, stand_pat - reach)
+                continue
+            if self.losing_capture(game, move):
+                continue
+
+            game.make_move(move)
+            score = self.quiescence(game, a, b, ply=ply + 1)
+            game.unmake_move()
+
+            if its_my_turn:
+                best_score = max(best_score, score)
+                a = max(a, score)
+            else:
+                best_score = min(best_score, score)
+                b = min(b, score)
+            if a >= b:
+                break
+        return best_score
+
+    @staticmethod
+    def losing_capture(game: Game, move: Move) -> bool:
+        """
+        Whether the move gives a piece for a less valuable one that is defended.
+        """
+        if move.target is None or move.promotion_rank is not None:
+            return False
+        attacker = game.board.get_piece(move.start).type
+        return (
+            PIECE_VALUES[attacker] > PIECE_VALUES[move.target]
+            and game.square_attacked(move.end, ~game.active_color)
         )
-        return advantage * 20
 
-    def evaluate(self, game: Game, depth: int, a: float, b: float) -> float:
+    def evaluate(self, game: Game, node: Node, leaf_score: Optional[float] = None) -> float:
+        """
+        Alpha-beta score of the position, searched `node.depth` plies deep in `node.window`.
 
+        :param leaf_score: Heuristic score of the position, if already known from `leaf_scores`.
+        :raises SearchTimeout: When the clock passes `deadline`.
+        """
+        depth, (a, b), ply = node
+        self.count_node(ply)
         its_my_turn = game.active_color == self.color
+        stats = self.config.stats
+
+        entry = self.table.probe(game.zobrist_key) if self.table is not None else None
+        if stats is not None and self.table is not None:
+            stats.probe(entry is not None)
+        if entry and entry.depth >= depth:
+            a, b = entry.window(a, b)
+            if a >= b:
+                return entry.score
 
         if game.is_in_checkmate(game.active_color):
             return float("-inf") if its_my_turn else float("inf")
 
+        if depth == 0 and self.config.options.quiescence:
+            return self.quiescence(game, a, b, leaf_score, ply)
+
         if depth == 0 or game.is_in_stalemate(game.active_color):
-            return self.leaf_node_heuristics(game)
+            return self.leaf_node_heuristics(game) if leaf_score is None else leaf_score
+
+        node = Node(depth, (a, b), ply)
+        in_check = game.is_in_check(game.active_color)
+        null_score = None if in_check else self.null_move_score(game, node)
+        if null_score is not None:
+            return null_score
+        return self.search_moves(game, node, entry, in_check)
+
+    def search_moves(
+        self, game: Game, node: Node, entry: Optional[Entry], in_check: bool
+    ) -> float:
+        """
+        The moves part of `evaluate`: the best score of the moves of the position, searched
+        in order until one is good enough for a cutoff. The result goes to the transposition table.
+        """
+        its_my_turn = game.active_color == self.color
+        a, b = node.window
+        best_score = float("-inf") if its_my_turn else float("inf")
+        best_move: Optional[Move] = None
+        moves = self.ordered_moves(game, node.depth, entry, node.ply)
+        for index, (move, child_score) in enumerate(moves):
+            game.make_move(move)
+            score = self.search_child(
+                game, Node(node.depth - 1, (a, b), node.ply + 1), child_score, index, in_check
+            )
+            game.unmake_move()
 
-        scores = []
-        for move in game.legal_moves(color=game.active_color):
-            score = self.evaluate(game.seek_move(move), depth-1, a, b)
-            scores.append(score)
+            if best_move is None or (score > best_score if its_my_turn else score < best_score):
+                best_score, best_move = score, move
 
             if its_my_turn:
                 a = max(a, score)
@@ -74,10 +493,137 @@ class MinMaxBot(BaseBot):
             else:
                 b = min(b, score)
 
-            if a - b < 0:
+            if a >= b:
+                self.ordering.record_cutoff(game, move, node.ply, node.depth)
+                if self.config.stats is not None:
+                    self.config.stats.cutoff(index)
                 break
 
-        return max(scores) if its_my_turn else min(scores)
+        if self.table is not None:
+            self.table.store(
+                game.zobrist_key, node.depth, best_score,
+                Bound.of(best_score, *node.window), best_move
+            )
+        return best_score
+
+    def null_move_score(self, game: Game, node: Node) -> Optional[float]:
+        """
+        Score of the position if the side to move passed the turn, when that is enough for
+        a cutoff, see `SearchOptions.null_move`. Expects the side to move not to be in check.
+        """
+        its_my_turn = game.active_color == self.color
+        depth, (a, b), ply = node
+        if not (
+            self.config.options.null_move and depth > NULL_MOVE_REDUCTION
+            and math.isfinite(b if its_my_turn else a)
+        ):
+            return None
+        if not game.undo_stack or game.undo_stack[-1].move is NULL_MOVE:
+            return None  # At the root or right after another pass
+        if self.zugzwang_prone(game):
+            return None
+        game.make_null_move()
+        null_window = (b - 1, b) if its_my_turn else (a, a + 1)
+        score = self.evaluate(game, Node(depth - 1 - NULL_MOVE_REDUCTION, null_window, ply + 1))
+        game.unmake_move()
+        return score if (score >= b if its_my_turn else score <= a) else None
+
+    def search_child(
+        self, game: Game, node: Node, leaf_score: Optional[float], index: int, in_check: bool
+    ) -> float:
+        """
+        Score of the position after the `index`th move of a node searched with the window,
+        for `search_moves`. See `SearchOptions` on the searches that can come before the full one.
+
+        :param in_check: Whether the side that played the move was in check, when it isn't reduced.
+        """
+        a, b = window = node.window
+        options = self.config.options
+        its_my_turn = game.active_color != self.color  # At the parent node
+        if index and options.pvs and math.isfinite(a if its_my_turn else b):
+            window = (a, a + 1) if its_my_turn else (b - 1, b)
+        move = game.undo_stack[-1].move
+        reduction = int(
+            options.late_move_reductions and index >= LATE_MOVE_INDEX
+            and node.depth + 1 >= REDUCTION_MIN_DEPTH and not in_check
+            and move.target is None and move.promotion_rank is None
+            and not game.is_in_check(game.active_color)  # Checks are searched in full
+        )
+        if window != node.window or reduction:
+            reduced = node._replace(depth=node.depth - reduction, window=window)
+            score = self.evaluate(game, reduced, leaf_score)
+            if score <= a if its_my_turn else score >= b:
+                return score  # No better than the best move so far
+            if not reduction and not a < score < b:
+                return score  # Good enough for a cutoff
+        return self.evaluate(game, node, leaf_score)
+
+    @staticmethod
+    def zugzwang_prone(game: Game) -> bool:
+        """
+        Whether the side to move has nothing but pawns and its king.
+        """
+        return not any(
+            game.board.piece_mask(game.active_color, piece_type)
+            for piece_type in (KNIGHT, BISHOP, ROOK, QUEEN)
+        )
 
     def __str__(self) -> str:
         return self.name
+
+
+class HelperBot(MinMaxBot):
+    """
+    The bot of a helper process of `MinMaxBot.lazy_smp`, searching with the main process's
+    shared transposition table, that also stops once `stop_event` is set.
+    """
+    def __init__(self, task: HelperTask, stop_event: EventType) -> None:
+        super().__init__(task.color, task.max_depth, config=SearchConfig(
+            hash_size_mb=0, time_control=TimeControl(move_time=task.move_time),
+            options=task.options
+        ))
+        if task.table_name is not None:
+            self.table = SharedTranspositionTable(task.hash_size_mb, task.table_name)
+            self.table.age = task.table_age
+        self.stop_event = stop_event
+
+    def count_node(self, ply: int) -> None:
+        super().count_node(ply)
+        if not self.nodes % TIME_CHECK_INTERVAL and self.stop_event.is_set():
+            raise SearchTimeout
+
+
+def _lazy_smp_helper(
+    task: HelperTask, stop_event: EventType, results: Queue[SearchResult]
+) -> None:
+    """
+    Helper process of `MinMaxBot.lazy_smp`: searches the position until stopped, then sends back
+    the depth it completed, the scores of the root moves and the number of nodes it searched.
+    A search that fails sends back no depth, so the main process never waits for it in vain.
+    """
+    result = SearchResult(-1, [], 0)
+    try:
+        game = Game(board_type=task.board_type)
+        from_fen(task.fen, game)
+        bot = HelperBot(task, stop_event)
+        scored_moves = bot.iterative_deepening(game, task.helper)
+        result = SearchResult(bot.completed_depth, scored_moves, bot.nodes)
+    finally:
+        results.put(result)
+
+
+def _collect_results(
+    results: Queue[SearchResult], processes: list[multiprocessing.Process]
+) -> list[SearchResult]:
+    """
+    The result of every helper process, but for those that died before sending one.
+    """
+    collected: list[SearchResult] = []
+    while len(collected) < len(processes):
+        alive = any(process.is_alive() for process in processes)
+        try:
+            collected.append(results.get(timeout=RESULT_POLL_INTERVAL))
+        except queue.Empty:
+            if not alive:  # Whatever the processes sent is in the queue by the time they end
+                break
+    return collected
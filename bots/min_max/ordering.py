@@ -0,0 +1,85 @@
+"""
+Move ordering for alpha-beta search. The earlier the best move is searched, the sooner the
+others are cut off, so every node sorts its moves by how likely they are to be the best:
+    1. The hash move, best in an earlier search of the position.
+    2. Captures and promotions, most valuable victim first, least valuable attacker second.
+    3. Killer moves, quiet moves that caused a cutoff at the same ply elsewhere in the tree.
+    4. The other quiet moves, by their history: how often and how deep they caused cutoffs.
+"""
+from typing import Optional
+
+from engine import Game, Move
+from engine.bitboard import SQUARE_COUNT, square_index
+from engine.evaluation import PIECE_VALUES
+
+HASH_MOVE_SCORE = 1 << 40
+CAPTURE_SCORE = 1 << 32
+KILLER_SCORE = 1 << 31  # History scores stay below this, see `MoveOrdering.record_cutoff`
+KILLERS_PER_PLY = 2
+
+
+def material_gain(move: Move) -> int:
+    """
+    Value of the piece the move captures plus that of the piece it promotes to.
+    """
+    return (
+        (PIECE_VALUES[move.target] if move.target else 0)
+        + (PIECE_VALUES[move.promotion_rank] if move.promotion_rank else 0)
+    )
+
+
+class MoveOrdering:
+    """
+    Killer moves and history table, gathered over the searches of one game.
+    """
+    def __init__(self) -> None:
+        self.killers: list[list[Move]] = []  # By ply, latest first
+        self.history: list[list[int]] = [[0] * SQUARE_COUNT ** 2 for _ in range(3)]  # By color
+
+    def new_search(self) -> None:
+        """
+        Forgets the killers, which belong to the previous position, and ages the history.
+        """
+        self.killers.clear()
+        for history in self.history:
+            history[:] = [score // 2 for score in history]
+
+    def score(self, game: Game, move: Move, ply: int) -> int:
+        if move.target is not None or move.promotion_rank is not None:
+            attacker = game.board.get_piece(move.start).type
+            # Victim values are at least 10 apart, attacker values below 1000
+            return CAPTURE_SCORE + material_gain(move) * 1000 - PIECE_VALUES[attacker]
+        if ply < len(self.killers) and move in self.killers[ply]:
+            return KILLER_SCORE + KILLERS_PER_PLY - self.killers[ply].index(move)
+        return self.history[game.active_color][
+            square_index(move.start) * SQUARE_COUNT + square_index(move.end)
+        ]
+
+    def order(
+        self, game: Game, moves: list[Move], ply: int, hash_move: Optional[Move] = None
+    ) -> list[Move]:
+        """
+        The moves of the side to move at `ply` plies from the root, best candidates first.
+        """
+        scores = {
+            move: HASH_MOVE_SCORE if move == hash_move else self.score(game, move, ply)
+            for move in moves
+        }
+        return sorted(moves, key=scores.__getitem__, reverse=True)
+
+    def record_cutoff(self, game: Game, move: Move, ply: int, depth: int) -> None:
+        """
+        Remembers a quiet move that refuted the position, `depth` plies from the horizon.
+        Captures and promotions are ordered well enough without.
+        """
+        if move.target is not None or move.promotion_rank is not None:
+            return
+        while len(self.killers) <= ply:
+            self.killers.append([])
+        killers = self.killers[ply]
+        if move not in killers:
+            killers.insert(0, move)
+            del killers[KILLERS_PER_PLY:]
+        history = self.history[game.active_color]
+        index = square_index(move.start) * SQUARE_COUNT + square_index(move.end)
+        history[index] = min(history[index] + depth * depth, KILLER_SCORE - 1)
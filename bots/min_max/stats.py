@@ -0,0 +1,183 @@
+"""
+Statistics of the Min-Max Bot's search, to tune it with.
+"""
+from __future__ import annotations
+
+import math
+import time
+from typing import Any, Callable, NamedTuple, Optional
+
+from engine import Move
+from engine.encoding import uci
+
+
+class Iteration(NamedTuple):
+    depth: int
+    score: float  # Of the best root move
+    move: Move  # Best root move
+    nodes: int  # Searched in the iteration
+    seconds: float  # Since the start of the search
+
+
+class SearchStats:
+    """
+    Counters of a search, kept by a `MinMaxBot` given an instance, from the start of each move's
+    search. A bot without one counts nothing, beyond its total `nodes`.
+        nodes_by_ply: Positions searched by plies from the root, quiescence search included
+        leaves: Positions scored with the heuristic
+        cutoffs: Cutoffs by index of the move that caused them, 0 being the first move searched
+        hash_lookups: Lookups in the transposition table missing, then finding, the position
+        iterations: The iterations of iterative deepening completed
+        span: When the search started and, once it has, finished, by `time.perf_counter`
+
+    With Lazy SMP only the main process is counted.
+
+    :param on_iteration: Called with the stats after every completed iteration.
+    """
+    def __init__(self, on_iteration: Optional[Callable[[SearchStats], None]] = None) -> None:
+        self.on_iteration = on_iteration
+        self.span: tuple[float, Optional[float]] = (time.perf_counter(), None)
+        self.leaves = 0
+        self.nodes_by_ply: list[int] = []
+        self.cutoffs: list[int] = []
+        self.hash_lookups = [0, 0]
+        self.iterations: list[Iteration] = []
+
+    def reset(self) -> None:
+        """
+        Starts counting a new search.
+        """
+        self.span = (time.perf_counter(), None)
+        self.leaves = 0
+        self.nodes_by_ply = []
+        self.cutoffs = []
+        self.hash_lookups = [0, 0]
+        self.iterations = []
+
+    def finish(self) -> None:
+        """
+        Stops the clock, so the stats read after the search keep its time.
+        """
+        self.span = (self.span[0], time.perf_counter())
+
+    def node(self, ply: int) -> None:
+        _count(self.nodes_by_ply, ply)
+
+    def leaf(self, count: int = 1) -> None:
+        self.leaves += count
+
+    def cutoff(self, index: int) -> None:
+        _count(self.cutoffs, index)
+
+    def probe(self, hit: bool) -> None:
+        self.hash_lookups[hit] += 1
+
+    def end_iteration(self, depth: int, score: float, move: Move) -> None:
+        searched = self.nodes - sum(iteration.nodes for iteration in self.iterations)
+        self.iterations.append(Iteration(depth, score, move, searched, self.seconds))
+        if self.on_iteration is not None:
+            self.on_iteration(self)
+
+    @property
+    def nodes(self) -> int:
+        return sum(self.nodes_by_ply)
+
+    @property
+    def max_ply(self) -> int:
+        """
+        Deepest position searched, in plies from the root.
+        """
+        return len(self.nodes_by_ply) - 1
+
+    @property
+    def hash_probes(self) -> int:
+        return sum(self.hash_lookups)
+
+    @property
+    def hash_hits(self) -> int:
+        return self.hash_lookups[True]
+
+    @property
+    def seconds(self) -> float:
+        """
+        Time the search took, or has taken so far while it runs.
+        """
+        start, end = self.span
+        return (time.perf_counter() if end is None else end) - start
+
+    @property
+    def nodes_per_second(self) -> float:
+        seconds = self.seconds
+        return self.nodes / seconds if seconds else 0.0
+
+    @property
+    def branching_factor(self) -> Optional[float]:
+        """
+        Effective branching factor: how many times more nodes the last iteration searched than
+        the one before. None before the second iteration.
+        """
+        if len(self.iterations) < 2 or not self.iterations[-2].nodes:
+            return None
+        return self.iterations[-1].nodes / self.iterations[-2].nodes
+
+    @property
+    def first_move_cutoff_rate(self) -> Optional[float]:
+        """
+        Share of the cutoffs caused by the first move searched, a measure of the move ordering.
+        """
+        return self.cutoffs[0] / sum(self.cutoffs) if self.cutoffs else None
+
+    def as_dict(self) -> dict[str, Any]:
+        """
+        The stats as JSON serializable values. Mate scores, which are infinite, are written as
+        the strings "inf" and "-inf", as standard JSON has no infinity.
+        """
+        return {
+            "nodes": self.nodes,
+            "leaves": self.leaves,
+            "cutoffs": self.cutoffs,
+            "first_move_cutoff_rate": self.first_move_cutoff_rate,
+            "hash_probes": self.hash_probes,
+            "hash_hits": self.hash_hits,
+            "max_ply": self.max_ply,
+            "branching_factor": self.branching_factor,
+            "seconds": self.seconds,
+            "nodes_per_second": self.nodes_per_second,
+            "iterations": [
+                {
+                    **iteration._asdict(),
+                    "score": iteration.score if math.isfinite(iteration.score)
+                    else str(iteration.score),
+                    "move": uci(iteration.move),
+                }
+                for iteration in self.iterations
+            ],
+        }
+
+    def __str__(self) -> str:
+        def rounded(value: Optional[float]) -> Optional[float]:
+            return None if value is None else round(value, 2)
+
+        hash_probes = self.hash_probes
+        hit_rate = self.hash_hits / hash_probes if hash_probes else None
+        lines = [
+            f"{self.nodes} nodes ({self.leaves} leaves) in {self.seconds:.3f}s, "
+            f"{self.nodes_per_second:.0f} nodes/s",
+            f"Depth {self.iterations[-1].depth if self.iterations else None}, "
+            f"max ply {self.max_ply}, branching factor {rounded(self.branching_factor)}",
+            f"Cutoffs {sum(self.cutoffs)}, "
+            f"{rounded(self.first_move_cutoff_rate)} of them on the first move",
+            f"Hash hits {self.hash_hits}/{hash_probes} ({rounded(hit_rate)})",
+        ]
+        lines += (
+            f"  depth {iteration.depth}: {uci(iteration.move)} {iteration.score} "
+            f"({iteration.nodes} nodes, {iteration.seconds:.3f}s)"
+            for iteration in self.iterations
+        )
+        return "\n".join(lines)
+
+
+def _count(histogram: list[int], index: int) -> None:
+    if index >= len(histogram):
+        histogram.extend([0] * (index + 1 - len(histogram)))
+    histogram[index] += 1
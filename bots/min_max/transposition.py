@@ -0,0 +1,178 @@
+"""
+Transposition table for the Min-Max Bot.
+"""
+from __future__ import annotations
+
+import struct
+from enum import IntEnum
+from multiprocessing.shared_memory import SharedMemory
+from typing import NamedTuple, Optional, cast
+
+from engine import Move
+from engine.encoding import encode_move
+
+# Bytes per entry: key (8), score (4), move (2), depth, bound and age (4)
+ENTRY_SIZE = 18
+SCORE = struct.Struct("f")
+SCORE_BITS = struct.Struct("I")
+
+
+class Bound(IntEnum):
+    EXACT = 1
+    LOWER = 2  # The score is at least this much (the search failed high)
+    UPPER = 3  # The score is at most this much (the search failed low)
+
+    @staticmethod
+    def of(score: float, a: float, b: float) -> Bound:
+        """
+        Bound of a score returned by a search with the window (a, b).
+        """
+        if score <= a:
+            return Bound.UPPER
+        if score >= b:
+            return Bound.LOWER
+        return Bound.EXACT
+
+
+class Entry(NamedTuple):
+    depth: int
+    score: float
+    bound: Bound
+    move: Optional[int]  # Packed with `engine.encoding.encode_move`
+
+    def window(self, a: float, b: float) -> tuple[float, float]:
+        """
+        Narrows the search window (a, b) with the stored score.
+        """
+        if self.bound is Bound.EXACT:
+            return self.score, self.score
+        if self.bound is Bound.LOWER:
+            return max(a, self.score), b
+        return a, min(b, self.score)
+
+
+class TranspositionTable:
+    """
+    Fixed size hash table of search results, keyed by Zobrist key.
+    Entries are stored column-wise in typed views of one buffer, so the memory budget is honoured
+    exactly:
+        keys: Zobrist key of the position, XORed with the rest of the entry (see `_check`)
+        scores: Score of the position
+        moves: Best move, in the 16-bit encoding of `engine.encoding` (0 for none)
+        infos: Search depth, packed as depth | bound << 8 | age << 10 (bound 0 is an empty slot)
+
+    One entry is kept per slot. A new result replaces the stored one if it is for the same
+    position, if the stored one is from an older search, or if it was searched at least as deep.
+
+    :param size_mb: Memory budget in megabytes. The slot count is rounded down to a power of 2.
+    """
+    def __init__(self, size_mb: float = 16) -> None:
+        slots = max(1, int(size_mb * 2**20) // ENTRY_SIZE)
+        self.size = size = 1 << (slots.bit_length() - 1)
+        self.age = 0
+        buffer = self._allocate(ENTRY_SIZE * size)
+        self.keys = buffer[:8 * size].cast("Q")
+        self.scores = buffer[8 * size:12 * size].cast("f")
+        self.score_bits = buffer[8 * size:12 * size].cast("I")  # The scores' raw bits
+        self.moves = buffer[12 * size:14 * size].cast("H")
+        self.infos = buffer[14 * size:18 * size].cast("I")
+
+    def _allocate(self, size: int) -> memoryview:
+        return memoryview(bytearray(size))
+
+    @staticmethod
+    def _check(score_bits: int, move: int, info: int) -> int:
+        """
+        The rest of an entry folded into 64 bits. Stored XORed into the key, it makes an entry
+        whose fields were written by different stores fail the key comparison.
+        """
+        return score_bits ^ info << 32 ^ move << 48
+
+    def new_search(self) -> None:
+        """
+        Marks the start of a new search, making older entries the first to be replaced.
+        """
+        self.age = (self.age + 1) % 256
+
+    def probe(self, key: int) -> Optional[Entry]:
+        index = key & (self.size - 1)
+        info = self.infos[index]
+        if not info:
+            return None
+        move = self.moves[index]
+        # The score comes from the bits that pass the check, not from a second read of the slot,
+        # which another process may have written to in between
+        score_bits = self.score_bits[index]
+        if self.keys[index] ^ self._check(score_bits, move, info) != key:
+            return None
+        return Entry(
+            info & 0xFF,
+            SCORE.unpack(SCORE_BITS.pack(score_bits))[0],
+            Bound(info >> 8 & 0b11),
+            move or None,
+        )
+
+    def store(
+        self, key: int, depth: int, score: float, bound: Bound, move: Optional[Move] = None
+    ) -> None:
+        index = key & (self.size - 1)
+        info = self.infos[index]
+        if (
+            info
+            and info >> 10 == self.age
+            and info & 0xFF > depth
+            and self.keys[index] ^ self._check(self.score_bits[index], self.moves[index], info)
+                != key
+        ):
+            return
+        self.scores[index] = score
+        self.moves[index] = packed_move = encode_move(move) if move else 0
+        self.infos[index] = info = max(depth, 0) | bound << 8 | self.age << 10
+        self.keys[index] = key ^ self._check(self.score_bits[index], packed_move, info)
+
+    def clear(self) -> None:
+        self.infos[:] = memoryview(bytes(4 * self.size)).cast("I")
+        self.age = 0
+
+    def filled(self) -> int:
+        """
+        Number of occupied slots.
+        """
+        return self.size - self.infos.tolist().count(0)
+
+
+class SharedTranspositionTable(TranspositionTable):
+    """
+    Transposition table in shared memory, for processes searching the same position at once.
+    The processes read and write without locks: a slot written by two of them at the same time
+    may end up with fields of both, which the key check of `TranspositionTable._check` rejects.
+
+    :param name: Shared memory block of a table to attach to. A new block is created when not
+        given, and freed along with this table.
+    """
+    def __init__(self, size_mb: float = 16, name: Optional[str] = None) -> None:
+        self.name = name
+        self.owner = name is None
+        self.memory: Optional[SharedMemory] = None
+        super().__init__(size_mb)
+
+    def _allocate(self, size: int) -> memoryview:
+        self.memory = memory = SharedMemory(self.name, create=self.owner, size=size)
+        self.name = memory.name
+        return cast(memoryview, memory.buf)  # Only None once closed
+
+    def close(self) -> None:
+        """
+        Detaches the table from the shared memory block, freeing the block if it created it.
+        """
+        if self.memory is None:
+            return
+        for view in (self.keys, self.scores, self.score_bits, self.moves, self.infos):
+            view.release()
+        self.memory.close()
+        if self.owner:
+            self.memory.unlink()
+        self.memory = None
+
+    def __del__(self) -> None:
+        self.close()
@@ -12,8 +12,7 @@ from engine import Color, Game, Move
 class RandomBot(BaseBot):
 
     def __init__(self, color: Color, name: Optional[str] = None) -> None:
-        super().__init__(color)
-        self.name = name or self.name
+        super().__init__(color, name)
 
     def select_move(self, game: Game) -> Move:
         super().select_move(game)
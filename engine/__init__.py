@@ -2,13 +2,14 @@
 Chess Game Engine
 """
 
-from engine.board import Board
+from engine.bitboard import BitBoard
+from engine.board import BaseBoard, Board
 from engine.fen_utils import from_fen, to_fen
 from engine.game import Game
 from engine.types import Color, Location, Move, MoveType, Piece, PieceType
 
 __all__ = [
-    "Board", "Game",
+    "BaseBoard", "BitBoard", "Board", "Game",
     "from_fen", "to_fen",
     "Color", "Location", "Move", "MoveType", "Piece", "PieceType",
 ]
@@ -0,0 +1,53 @@
+"""
+Attack queries that look outward from the target square, instead of generating the attacker's moves.
+"""
+from typing import Optional
+
+from engine.board import BaseBoard
+from engine.magic import bishop_attacks, rook_attacks
+from engine.tables import KING_ATTACKS, KNIGHT_ATTACKS, PAWN_ATTACKS
+from engine.types import BISHOP, KING, KNIGHT, PAWN, QUEEN, ROOK, Color
+
+
+def is_square_attacked(
+    board: BaseBoard, square: int, color: Color, occupancy: Optional[int] = None
+) -> bool:
+    """
+    Whether any piece of the given color attacks the square.
+    Leaper and pawn attacks are checked first, and the first attacker found ends the search.
+
+    :param occupancy: Occupancy that blocks the sliding rays. Defaults to the board's.
+    """
+    if (
+        PAWN_ATTACKS[~color][square] & board.piece_mask(color, PAWN)
+        or KNIGHT_ATTACKS[square] & board.piece_mask(color, KNIGHT)
+        or KING_ATTACKS[square] & board.piece_mask(color, KING)
+    ):
+        return True
+    if occupancy is None:
+        occupancy = board.occupancy()
+    queens = board.piece_mask(color, QUEEN)
+    return bool(
+        rook_attacks(square, occupancy) & (board.piece_mask(color, ROOK) | queens)
+        or bishop_attacks(square, occupancy) & (board.piece_mask(color, BISHOP) | queens)
+    )
+
+
+def attackers(
+    board: BaseBoard, square: int, color: Color, occupancy: Optional[int] = None
+) -> int:
+    """
+    Mask of all the pieces of the given color attacking the square.
+
+    :param occupancy: Occupancy that blocks the sliding rays. Defaults to the board's.
+    """
+    if occupancy is None:
+        occupancy = board.occupancy()
+    queens = board.piece_mask(color, QUEEN)
+    return (
+        PAWN_ATTACKS[~color][square] & board.piece_mask(color, PAWN)
+        | KNIGHT_ATTACKS[square] & board.piece_mask(color, KNIGHT)
+        | KING_ATTACKS[square] & board.piece_mask(color, KING)
+        | rook_attacks(square, occupancy) & (board.piece_mask(color, ROOK) | queens)
+        | bishop_attacks(square, occupancy) & (board.piece_mask(color, BISHOP) | queens)
+    )
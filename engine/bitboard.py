@@ -0,0 +1,141 @@
+"""
+BitBoard Class
+"""
+from typing import Generator, Optional
+
+from engine.board import BaseBoard, PieceLocation
+from engine.constants import BOARD_SIZE
+from engine.types import Color, Location, Piece, PieceType
+
+SQUARE_COUNT = BOARD_SIZE * BOARD_SIZE
+# Location of every square index, so no Location has to be built while scanning bits
+SQUARE_LOCATIONS: list[Location] = [Location(*divmod(sq, BOARD_SIZE)) for sq in range(SQUARE_COUNT)]
+
+
+def square_index(location: tuple[int, int]) -> int:
+    return location[0] * BOARD_SIZE + location[1]
+
+
+def iter_squares(mask: int) -> Generator[int, None, None]:
+    """
+    Yields the index of every set bit in the mask, lowest first.
+    """
+    while mask:
+        lsb = mask & -mask
+        yield lsb.bit_length() - 1
+        mask ^= lsb
+
+
+class BitBoard(BaseBoard):
+    """
+    BitBoard stores the position as one 64-bit integer per (color, piece type).
+    Bit (i * 8 + j) of a mask stands for the square (i, j).
+    Kept in sync alongside the piece masks:
+        colors: Squares occupied by each color
+        occupied: Squares occupied by either color
+        moved: Squares holding a piece that has moved
+        squares: The piece on each square, for constant time lookups
+        version: Number of changes made to the board
+    """
+    def __init__(self) -> None:
+        self.pieces: list[list[int]] = [[0] * 7 for _ in range(3)]
+        self.colors: list[int] = [0] * 3
+        self.occupied: int = 0
+        self.moved: int = 0
+        self.squares: list[Optional[Piece]] = [None] * SQUARE_COUNT
+        self.version = 0
+
+    def place_piece(
+        self, location: tuple[int, int], piece: tuple[Color, PieceType]
+    ) -> PieceLocation:
+        sq = square_index(location)
+        if self.squares[sq] is not None:
+            raise ValueError(f"{location} already occupied.")
+        placed = Piece(*piece)
+        self.version += 1
+        self._add(sq, placed)
+        self.moved &= ~(1 << sq)
+        return (placed, Location(*location))
+
+    def remove_piece(self, location: tuple[int, int]) -> None:
+        sq = square_index(location)
+        self.version += 1
+        if self.squares[sq] is not None:
+            self._remove(sq)
+
+    def promote_piece(self, location: tuple[int, int], rank: PieceType) -> None:
+        sq = square_index(location)
+        self.version += 1
+        piece = self._remove(sq)
+        self._add(sq, Piece(piece.color, rank))
+
+    def move_piece(self, start: tuple[int, int], end: tuple[int, int]) -> None:
+        start_sq, end_sq = square_index(start), square_index(end)
+        self.version += 1
+        if self.squares[end_sq] is not None:
+            self._remove(end_sq)
+        self._add(end_sq, self._remove(start_sq))
+        self.moved = (self.moved & ~(1 << start_sq)) | (1 << end_sq)
+
+    def piece_at(self, loc: tuple[int, int]) -> Optional[Piece]:
+        return self.squares[loc[0] * BOARD_SIZE + loc[1]]
+
+    def is_occupied(self, loc: tuple[int, int]) -> bool:
+        return self.squares[loc[0] * BOARD_SIZE + loc[1]] is not None
+
+    def has_moved(self, loc: tuple[int, int]) -> bool:
+        return bool(self.moved >> (loc[0] * BOARD_SIZE + loc[1]) & 1)
+
+    def set_moved(self, loc: tuple[int, int], moved: bool) -> None:
+        bit = 1 << (loc[0] * BOARD_SIZE + loc[1])
+        self.version += 1
+        self.moved = self.moved | bit if moved else self.moved & ~bit
+
+    def get_pieces(self, color: Optional[Color] = None) -> set[PieceLocation]:
+        mask = self.colors[color] if color else self.occupied
+        return {
+            (self.squares[sq], SQUARE_LOCATIONS[sq])  # type: ignore[misc]
+            for sq in iter_squares(mask)
+        }
+
+    def occupancy(self, color: Optional[Color] = None) -> int:
+        return self.colors[color] if color else self.occupied
+
+    def piece_mask(self, color: Color, piece_type: PieceType) -> int:
+        return self.pieces[color][piece_type]
+
+    def clear(self) -> None:
+        self.version += 1
+        self.pieces = [[0] * 7 for _ in range(3)]
+        self.colors = [0] * 3
+        self.occupied = 0
+        self.moved = 0
+        self.squares = [None] * SQUARE_COUNT
+
+    def copy_from(self, other: BaseBoard) -> None:
+        if not isinstance(other, BitBoard):
+            raise TypeError(f"Cannot copy a {type(other).__name__} into a BitBoard.")
+        self.version += 1
+        self.pieces = [list(masks) for masks in other.pieces]
+        self.colors = list(other.colors)
+        self.occupied = other.occupied
+        self.moved = other.moved
+        self.squares = list(other.squares)
+
+    def _add(self, sq: int, piece: Piece) -> None:
+        bit = 1 << sq
+        self.pieces[piece.color][piece.type] |= bit
+        self.colors[piece.color] |= bit
+        self.occupied |= bit
+        self.squares[sq] = piece
+
+    def _remove(self, sq: int) -> Piece:
+        piece = self.squares[sq]
+        if piece is None:
+            raise ValueError(f"No piece at {SQUARE_LOCATIONS[sq]}")
+        mask = ~(1 << sq)
+        self.pieces[piece.color][piece.type] &= mask
+        self.colors[piece.color] &= mask
+        self.occupied &= mask
+        self.squares[sq] = None
+        return piece
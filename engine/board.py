@@ -1,6 +1,7 @@
 """
-Board Class
+Board Classes
 """
+from abc import ABC, abstractmethod
 from typing import Union, overload, Optional
 
 import numpy as np
@@ -11,7 +12,101 @@ from engine.types import Color, Piece, PieceType, Location
 
 PieceLocation = tuple[Piece, Location]
 
-class Board:
+
+class BaseBoard(ABC):
+    """
+    Interface shared by all board backends.
+    Locations are (i, j) tuples, i being the row from Black's side and j the column.
+    Every method that changes the board increments its `version`.
+    """
+    version: int
+
+    @abstractmethod
+    def place_piece(
+        self, location: tuple[int, int], piece: tuple[Color, PieceType]
+    ) -> PieceLocation: ...
+
+    @abstractmethod
+    def remove_piece(self, location: tuple[int, int]) -> None: ...
+
+    @abstractmethod
+    def promote_piece(self, location: tuple[int, int], rank: PieceType) -> None: ...
+
+    @abstractmethod
+    def move_piece(self, start: tuple[int, int], end: tuple[int, int]) -> None: ...
+
+    @abstractmethod
+    def piece_at(self, loc: tuple[int, int]) -> Optional[Piece]:
+        """
+        Returns the piece at the given location, or None if the square is empty.
+        """
+
+    @abstractmethod
+    def is_occupied(self, loc: tuple[int, int]) -> bool: ...
+
+    @abstractmethod
+    def has_moved(self, loc: tuple[int, int]) -> bool: ...
+
+    @abstractmethod
+    def set_moved(self, loc: tuple[int, int], moved: bool) -> None: ...
+
+    @abstractmethod
+    def get_pieces(self, color: Optional[Color] = None) -> set[PieceLocation]: ...
+
+    @abstractmethod
+    def occupancy(self, color: Optional[Color] = None) -> int:
+        """
+        Mask of the squares occupied by the given color, or by either color if not given.
+        Bit (i * 8 + j) stands for the square (i, j).
+        """
+
+    @abstractmethod
+    def piece_mask(self, color: Color, piece_type: PieceType) -> int:
+        """
+        Mask of the squares occupied by the given piece.
+        """
+
+    @abstractmethod
+    def clear(self) -> None: ...
+
+    @abstractmethod
+    def copy_from(self, other: 'BaseBoard') -> None:
+        """
+        Overwrites this board with the position of another board of the same type.
+        """
+
+    def get_piece(self, loc: tuple[int, int]) -> Piece:
+        if (piece := self.piece_at(loc)) is None:
+            raise ValueError(f"No piece at {(loc[0], loc[1])}")
+        return piece
+
+    @staticmethod
+    def is_in_bounds(location: tuple[int, int]) -> bool:
+        return 0 <= location[0] < BOARD_SIZE and 0 <= location[1] < BOARD_SIZE
+
+    def __str__(self) -> str:
+        visual: list[str] = list(BOARD_DRAWING)
+        for piece, (i, j) in self.get_pieces():
+            line_number = 2*i+1
+            col_number = 4*j+2
+            index = (34*line_number) + col_number
+
+            if len(piece_visual := UNICODE_PIECES[piece.type][piece.color]) == 1:
+                visual[index] = piece_visual
+                visual[index-1] = " "
+                visual[index+1] = " "
+            else:
+                visual[index-1] = piece_visual[0]
+                visual[index] = piece_visual[1]
+                visual[index+1] = piece_visual[2]
+
+        return "".join(visual)
+
+    def __repr__(self) -> str:
+        return str(self)
+
+
+class Board(BaseBoard):
     """
     Board.board is an 8x8 matrix of squares.
     Values stored in a square are:
@@ -19,54 +114,127 @@ class Board:
         1: Piece Type
         2: Whether the piece has moved
         3: Whether the square is occupied
+
+    Board.piece_lists[color][piece type] is the set of pieces of that color and type, and
+    Board.piece_lists[color][0] the set of all the pieces of that color. Board.masks holds the
+    squares of the same sets as bitmasks, bit (i * 8 + j) standing for the square (i, j).
+    Both are kept in sync by every method that changes the board.
     """
     def __init__(self) -> None:
         self.board: npt.NDArray[np.int8] = np.full(
             shape=(BOARD_SIZE, BOARD_SIZE, 4), fill_value=0, dtype=np.int8
         )
+        self.piece_lists: list[list[set[PieceLocation]]] = [
+            [set() for _ in range(len(PieceType) + 1)] for _ in range(len(Color) + 1)
+        ]
+        self.masks: list[list[int]] = [[0] * (len(PieceType) + 1) for _ in range(len(Color) + 1)]
+        self.version = 0
 
     def place_piece(
         self, location: tuple[int, int], piece: tuple[Color, PieceType]
     ) -> PieceLocation:
         if self.board[location[0], location[1], 3] != 0:
             raise ValueError(f"{location} already occupied.")
+        self.version += 1
         self.board[location] = np.array([piece[0], piece[1], 0, 1], dtype=np.int8)
-        return (Piece(*piece), Location(*location))
+        placed = (Piece(*piece), Location(*location))
+        self._add(placed)
+        return placed
 
     def remove_piece(self, location: tuple[int, int]) -> None:
+        self.version += 1
+        if (piece := self.piece_at(location)) is not None:
+            self._discard((piece, Location(*location)))
         self.board[location[0], location[1], 3] = 0  # Mark square as unoccupied
 
     def promote_piece(self, location: tuple[int, int], rank: PieceType) -> None:
+        self.version += 1
+        piece = self.get_piece(location)
+        location = Location(*location)
+        self._discard((piece, location))
+        self._add((Piece(piece.color, rank), location))
         self.board[location[0], location[1], 1] = rank
 
     def move_piece(self, start: tuple[int, int], end: tuple[int, int]) -> None:
+        self.remove_piece(end)
+        piece = self.get_piece(start)
+        self.version += 1
+        self._discard((piece, Location(*start)))
+        self._add((piece, Location(*end)))
         self.board[end] = self.board[start]
         self.board[start[0], start[1], 3] = 0  # Mark square as unoccupied
         self.board[end[0], end[1], 2] = 1  # Mark piece as moved
 
-    def get_piece(self, loc: tuple[int, int]) -> Piece:
-        if self.board[loc[0], loc[1], 3] == 0:
-            raise ValueError(f"No piece at {(loc[0], loc[1])}")
-        return Piece(
-            Color(self.board[loc[0], loc[1], 0]),
-            PieceType(self.board[loc[0], loc[1], 1])
-        )
+    def piece_at(self, loc: tuple[int, int]) -> Optional[Piece]:
+        square = self.board[loc[0], loc[1]]
+        if square[3] == 0:
+            return None
+        return Piece(Color(square[0]), PieceType(square[1]))
+
+    def is_occupied(self, loc: tuple[int, int]) -> bool:
+        return bool(self.board[loc[0], loc[1], 3])
+
+    def has_moved(self, loc: tuple[int, int]) -> bool:
+        return bool(self.board[loc[0], loc[1], 2])
+
+    def set_moved(self, loc: tuple[int, int], moved: bool) -> None:
+        self.version += 1
+        self.board[loc[0], loc[1], 2] = moved
 
     def get_pieces(self, color: Optional[Color] = None) -> set[PieceLocation]:
         if not color:
-            locations = np.argwhere(self.board[:, :, 3] == 1)
-        else:
-            locations = np.argwhere(
-                (self.board[:, :, 3] == 1) & (self.board[:, :, 0] == color.value)
-            )
-        return {(self.get_piece(loc), Location(*loc)) for loc in locations}
+            return self.piece_lists[Color.BLACK][0] | self.piece_lists[Color.WHITE][0]
+        return set(self.piece_lists[color][0])
+
+    def occupancy(self, color: Optional[Color] = None) -> int:
+        if not color:
+            return self.masks[Color.BLACK][0] | self.masks[Color.WHITE][0]
+        return self.masks[color][0]
+
+    def piece_mask(self, color: Color, piece_type: PieceType) -> int:
+        return self.masks[color][piece_type]
 
     def clear(self) -> None:
+        self.version += 1
         self.board.fill(0)
+        self._index_pieces()
 
-    @staticmethod
-    def is_in_bounds(location: tuple[int, int]) -> bool:
-        return 0 <= location[0] < BOARD_SIZE and 0 <= location[1] < BOARD_SIZE
+    def copy_from(self, other: BaseBoard) -> None:
+        if not isinstance(other, Board):
+            raise TypeError(f"Cannot copy a {type(other).__name__} into a Board.")
+        self.version += 1
+        np.copyto(self.board, other.board)
+        self.piece_lists = [[set(pieces) for pieces in lists] for lists in other.piece_lists]
+        self.masks = [list(masks) for masks in other.masks]
+
+    def _add(self, placed: PieceLocation) -> None:
+        (color, piece_type), (i, j) = placed
+        bit = 1 << (i * BOARD_SIZE + j)
+        lists, masks = self.piece_lists[color], self.masks[color]
+        lists[piece_type].add(placed)
+        lists[0].add(placed)
+        masks[piece_type] |= bit
+        masks[0] |= bit
+
+    def _discard(self, placed: PieceLocation) -> None:
+        (color, piece_type), (i, j) = placed
+        bit = ~(1 << (i * BOARD_SIZE + j))
+        lists, masks = self.piece_lists[color], self.masks[color]
+        lists[piece_type].discard(placed)
+        lists[0].discard(placed)
+        masks[piece_type] &= bit
+        masks[0] &= bit
+
+    def _index_pieces(self) -> None:
+        """
+        Rebuilds the piece lists and masks from the matrix.
+        """
+        for lists in self.piece_lists:
+            for pieces in lists:
+                pieces.clear()
+        self.masks = [[0] * (len(PieceType) + 1) for _ in range(len(Color) + 1)]
+        for i, j in np.argwhere(self.board[:, :, 3] == 1).tolist():
+            self._add((self.get_piece((i, j)), Location(i, j)))
 
     @overload
     def __getitem__(self, index: tuple[int, int]) -> npt.NDArray[np.int8]: ...
@@ -92,27 +260,8 @@ class Board:
         self, index: tuple[int, ...], value: Union[npt.NDArray[np.int8], int]
     ) -> None:
         if 2 <= len(index) <= 3:
+            self.version += 1
             self.board.__setitem__(index, value)
+            self._index_pieces()  # The matrix was written directly
         else:
             raise IndexError(f"Invalid index {index} for Board.")
-
-    def __str__(self) -> str:
-        visual: list[str] = list(BOARD_DRAWING)
-        for i, j in np.argwhere(self.board[:, :, 3] == 1):
-            line_number = 2*i+1
-            col_number = 4*j+2
-            index = (34*line_number) + col_number
-            piece = self.get_piece((i, j))
-
-            if len(piece_visual := UNICODE_PIECES[piece.type][piece.color]) == 1:
-                visual[index] = piece_visual
-                visual[index-1] = " "
-                visual[index+1] = " "
-            else:
-                visual[index-1] = piece_visual[0]
-                visual[index] = piece_visual[1]
-                visual[index+1] = piece_visual[2]
-
-        return "".join(visual)
-
-    __repr__ = __str__
@@ -0,0 +1,201 @@
+"""
+Opening books in the Polyglot format: a file of 16 byte entries, sorted by position key.
+    key: The Polyglot key of the position, which is also its Zobrist key, see `engine.zobrist`
+    move: to file | to row << 3 | from file << 6 | from row << 9 | promotion << 12
+    weight: How often to play the move, relative to the other moves of the position
+    learn: Unused
+The fields are big-endian, 64, 16, 16 and 32 bits long. Rows count from White's side,
+promotions go from 1 for a knight to 4 for a queen, and castling is the king taking its own rook.
+
+The book is memory-mapped and binary searched, so it is never read into memory: the pages
+a lookup touches are loaded once by the OS and shared by every process reading the book.
+
+Build one from PGN files with:
+    python -m engine.book games.pgn --output book.bin
+"""
+import argparse
+import mmap
+import random
+import struct
+import sys
+from collections import Counter
+from typing import Iterable, NamedTuple, Optional, Union
+
+from engine.bitboard import BitBoard
+from engine.constants import BOARD_SIZE
+from engine.fen_utils import from_fen
+from engine.game import Game
+from engine.pgn import PgnGame, parse_san, read_games
+from engine.types import BISHOP, BLACK, CASTLE, KING, KNIGHT, QUEEN, ROOK, WHITE, Location, Move
+
+ENTRY = struct.Struct(">QHHI")
+POLYGLOT_PROMOTIONS = (None, KNIGHT, BISHOP, ROOK, QUEEN)
+MAX_WEIGHT = 0xFFFF
+DEFAULT_MAX_PLY = 20  # Moves of a game that go into the book
+# Weight a move gets from a game, for the side that played it
+RESULT_POINTS = {
+    "1-0": {WHITE: 2, BLACK: 0},
+    "0-1": {WHITE: 0, BLACK: 2},
+    "1/2-1/2": {WHITE: 1, BLACK: 1},
+}
+
+
+class BookEntry(NamedTuple):
+    key: int
+    move: int  # Polyglot encoded, see `encode_book_move`
+    weight: int
+
+
+def encode_book_move(move: Move) -> int:
+    end = move.end
+    if move.type is CASTLE:
+        end = Location(move.start.i, BOARD_SIZE - 1 if move.castle_type is KING else 0)
+    promotion = POLYGLOT_PROMOTIONS.index(move.promotion_rank) if move.promotion_rank else 0
+    return (
+        end.j | (BOARD_SIZE - 1 - end.i) << 3
+        | move.start.j << 6 | (BOARD_SIZE - 1 - move.start.i) << 9
+        | promotion << 12
+    )
+
+
+def decode_book_move(game: Game, book_move: int) -> Optional[Move]:
+    """
+    The legal move of the side to move that the Polyglot encoded move stands for,
+    None if there is none, as when the book mixes up positions.
+    """
+    start = Location(BOARD_SIZE - 1 - (book_move >> 9 & 7), book_move >> 6 & 7)
+    end = Location(BOARD_SIZE - 1 - (book_move >> 3 & 7), book_move & 7)
+    promotion = book_move >> 12 & 7
+    piece = game.board.piece_at(start)
+    if piece is None or piece.color != game.active_color or promotion >= len(POLYGLOT_PROMOTIONS):
+        return None
+    if piece.type is KING and abs(end.j - start.j) > 1:
+        return next((
+            move for move in game.castling_moves()
+            if (move.end.j > start.j) == (end.j > start.j)
+        ), None)
+    return next((
+        move for move in game.legal_moves(piece=(piece, start))
+        if move.end == end and move.promotion_rank is POLYGLOT_PROMOTIONS[promotion]
+        and move.type is not CASTLE
+    ), None)
+
+
+class OpeningBook:
+    """
+    A Polyglot opening book, memory-mapped read-only. Pickles as its path, so the processes
+    of a parallel search map the same file.
+
+    Positions where an en passant capture is possible have another Polyglot key than their
+    Zobrist key, and are looked up in vain.
+    """
+    def __init__(self, path: str) -> None:
+        self.path = path
+        with open(path, "rb") as file:
+            self.data: Union[mmap.mmap, bytes] = b""
+            if file.seek(0, 2):  # Empty files can't be mapped
+                self.data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        self.size = len(self.data) // ENTRY.size
+
+    def entries(self, key: int) -> list[BookEntry]:
+        """
+        The entries of the position with this key, the most played first.
+        """
+        low, high = 0, self.size
+        while low < high:
+            middle = (low + high) // 2
+            if ENTRY.unpack_from(self.data, middle * ENTRY.size)[0] < key:
+                low = middle + 1
+            else:
+                high = middle
+        entries = []
+        for index in range(low, self.size):
+            entry_key, move, weight, _ = ENTRY.unpack_from(self.data, index * ENTRY.size)
+            if entry_key != key:
+                break
+            entries.append(BookEntry(entry_key, move, weight))
+        return entries
+
+    def moves(self, game: Game) -> list[tuple[Move, int]]:
+        """
+        The book moves of the game's position with their weights.
+        """
+        moves = []
+        for entry in self.entries(game.zobrist_key):
+            if (move := decode_book_move(game, entry.move)) is not None:
+                moves.append((move, entry.weight))
+        return moves
+
+    def choose(self, game: Game) -> Optional[Move]:
+        """
+        One of the book moves of the game's position picked at random, by weight.
+        None when the position is out of the book.
+        """
+        moves = [(move, weight) for move, weight in self.moves(game) if weight]
+        if not moves:
+            return None
+        return random.choices([move for move, _ in moves], [weight for _, weight in moves])[0]
+
+    def close(self) -> None:
+        if isinstance(self.data, mmap.mmap):
+            self.data.close()
+
+    def __reduce__(self) -> tuple[type["OpeningBook"], tuple[str]]:
+        return OpeningBook, (self.path,)
+
+
+def build_book(games: Iterable[PgnGame], max_ply: int = DEFAULT_MAX_PLY) -> list[BookEntry]:
+    """
+    Book entries of the first `max_ply` moves of the games. Every time a move is played it
+    gains weight, 2 for a win of the side that played it, 1 for a draw or an unknown result.
+    Games stop at the first move the engine cannot play, en passant captures among them.
+    """
+    weights: Counter[tuple[int, int]] = Counter()
+    for pgn_game in games:
+        game = Game(board_type=BitBoard)
+        from_fen(pgn_game.fen, game)
+        points = RESULT_POINTS.get(pgn_game.tags.get("Result", "*"), {WHITE: 1, BLACK: 1})
+        for san in pgn_game.moves[:max_ply]:
+            try:
+                move = parse_san(game, san)
+            except ValueError:
+                break
+            weights[game.zobrist_key, encode_book_move(move)] += points[game.active_color]
+            game.execute_move(move)
+    top = max(weights.values(), default=0)
+    return [
+        BookEntry(key, move, max(1, weight * MAX_WEIGHT // top) if top > MAX_WEIGHT else weight)
+        for (key, move), weight in weights.items() if weight
+    ]
+
+
+def write_book(entries: Iterable[BookEntry], path: str) -> None:
+    with open(path, "wb") as file:
+        for entry in sorted(entries, key=lambda entry: (entry.key, -entry.weight)):
+            file.write(ENTRY.pack(entry.key, entry.move, entry.weight, 0))
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Build a Polyglot opening book from PGN files.")
+    parser.add_argument("pgn", nargs="+", help="PGN files to read the games from.")
+    parser.add_argument("--output", required=True, metavar="PATH", help="Book file to write.")
+    parser.add_argument(
+        "--max-ply", type=int, default=DEFAULT_MAX_PLY, help="Moves of every game to add."
+    )
+    args = parser.parse_args(argv)
+
+    games: list[PgnGame] = []
+    for path in args.pgn:
+        with open(path, encoding="utf-8", errors="replace") as file:
+            games.extend(read_games(file.read()))
+    entries = build_book(games, args.max_ply)
+    write_book(entries, args.output)
+    print(
+        f"{len(games)} games: {len(entries)} moves in "
+        f"{len({entry.key for entry in entries})} positions written to {args.output}"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
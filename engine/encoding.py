@@ -0,0 +1,93 @@
+"""
+Compact 16-bit move encoding.
+
+A packed move is start | end << 6 | flags << 12, squares being indexed as i * 8 + j.
+The 4 flag bits are:
+    0b0000: Quiet move
+    0b0010 / 0b0011: Kingside / Queenside castle
+    0b0100: Capture
+    0b1000 | rank: Promotion, rank being 0-3 for Knight, Bishop, Rook, Queen
+    0b1100 | rank: Capture and promotion
+The captured piece type is not part of the encoding, `decode_move` reads it from the board.
+"""
+from array import array
+from typing import Iterable
+
+from engine.bitboard import SQUARE_LOCATIONS, square_index
+from engine.board import BaseBoard
+from engine.constants import BOARD_SIZE
+from engine.types import (
+    BISHOP, KING, KNIGHT, QUEEN, ROOK,
+    CAPTURE, CAPTURE_AND_PROMOTION, CASTLE, PASSING, PROMOTION,
+    Move, PieceType
+)
+
+QUIET_FLAG = 0b0000
+KING_CASTLE_FLAG = 0b0010
+QUEEN_CASTLE_FLAG = 0b0011
+CAPTURE_FLAG = 0b0100
+PROMOTION_FLAG = 0b1000
+
+PROMOTION_RANKS: list[PieceType] = [KNIGHT, BISHOP, ROOK, QUEEN]
+PROMOTION_INDEX: dict[PieceType, int] = {rank: i for i, rank in enumerate(PROMOTION_RANKS)}
+
+
+def pack(start: int, end: int, flags: int = QUIET_FLAG) -> int:
+    return start | end << 6 | flags << 12
+
+
+def encode_move(move: Move) -> int:
+    flags = QUIET_FLAG
+    if move.type is CASTLE:
+        flags = KING_CASTLE_FLAG if move.castle_type is KING else QUEEN_CASTLE_FLAG
+    else:
+        if move.type & CAPTURE:
+            flags |= CAPTURE_FLAG
+        if move.promotion_rank:
+            flags |= PROMOTION_FLAG | PROMOTION_INDEX[move.promotion_rank]
+    return pack(square_index(move.start), square_index(move.end), flags)
+
+
+def decode_move(packed: int, board: BaseBoard) -> Move:
+    """
+    Rebuilds the Move, reading the captured piece from the board the move is to be played on.
+    """
+    start, end = SQUARE_LOCATIONS[packed & 0x3F], SQUARE_LOCATIONS[packed >> 6 & 0x3F]
+    flags = packed >> 12
+    if flags & PROMOTION_FLAG:
+        rank = PROMOTION_RANKS[flags & 0b11]
+        if flags & CAPTURE_FLAG:
+            return Move(
+                start, end, CAPTURE_AND_PROMOTION,
+                target=board.get_piece(end).type, promotion_rank=rank
+            )
+        return Move(start, end, PROMOTION, promotion_rank=rank)
+    if flags & CAPTURE_FLAG:
+        return Move(start, end, CAPTURE, target=board.get_piece(end).type)
+    if flags == KING_CASTLE_FLAG:
+        return Move(start, end, CASTLE, castle_type=KING)
+    if flags == QUEEN_CASTLE_FLAG:
+        return Move(start, end, CASTLE, castle_type=QUEEN)
+    return Move(start, end, PASSING)
+
+
+def uci(move: Move) -> str:
+    """
+    Long algebraic notation of the move, as used by UCI: e2e4, e1g1 (castling), a7a8q.
+    """
+    squares = "".join(
+        f"{chr(ord('a') + location.j)}{BOARD_SIZE - location.i}"
+        for location in (move.start, move.end)
+    )
+    return squares + ("nbrq"[PROMOTION_INDEX[move.promotion_rank]] if move.promotion_rank else "")
+
+
+def pack_moves(moves: Iterable[Move]) -> array:  # type: ignore[type-arg]
+    """
+    Packs the moves into an array of unsigned 16-bit integers, 2 bytes per move.
+    """
+    return array("H", map(encode_move, moves))
+
+
+def unpack_moves(packed_moves: Iterable[int], board: BaseBoard) -> list[Move]:
+    return [decode_move(packed, board) for packed in packed_moves]
@@ -0,0 +1,193 @@
+"""
+Static evaluation: material plus piece-square tables, in centipawns, tapered between middlegame
+and endgame tables by the material left on the board.
+
+The piece-square tables are those of the Simplified Evaluation Function, from White's point of
+view with row 0 being the eighth rank, which is how squares are indexed on our boards.
+Black's tables are the same with the rows flipped.
+"""
+from typing import NamedTuple
+
+import numpy as np
+import numpy.typing as npt
+
+from engine.batch import PIECE_CODES, PIECE_ROWS, SQUARES
+from engine.board import BaseBoard
+from engine.bitboard import SQUARE_COUNT, square_index
+from engine.types import BISHOP, KING, KNIGHT, PAWN, QUEEN, ROOK, WHITE, Color, Piece, PieceType
+
+PIECE_VALUES: dict[PieceType, int] = {
+    PAWN: 100, KNIGHT: 320, BISHOP: 330, ROOK: 500, QUEEN: 900, KING: 0
+}
+
+# Game phase weight of every piece, the starting material adds up to MAX_PHASE
+PHASE_WEIGHTS: dict[PieceType, int] = {PAWN: 0, KNIGHT: 1, BISHOP: 1, ROOK: 2, QUEEN: 4, KING: 0}
+MAX_PHASE = 24
+
+MIDDLEGAME_TABLES: dict[PieceType, list[int]] = {
+    PAWN: [
+        0, 0, 0, 0, 0, 0, 0, 0,
+        50, 50, 50, 50, 50, 50, 50, 50,
+        10, 10, 20, 30, 30, 20, 10, 10,
+        5, 5, 10, 25, 25, 10, 5, 5,
+        0, 0, 0, 20, 20, 0, 0, 0,
+        5, -5, -10, 0, 0, -10, -5, 5,
+        5, 10, 10, -20, -20, 10, 10, 5,
+        0, 0, 0, 0, 0, 0, 0, 0,
+    ],
+    KNIGHT: [
+        -50, -40, -30, -30, -30, -30, -40, -50,
+        -40, -20, 0, 0, 0, 0, -20, -40,
+        -30, 0, 10, 15, 15, 10, 0, -30,
+        -30, 5, 15, 20, 20, 15, 5, -30,
+        -30, 0, 15, 20, 20, 15, 0, -30,
+        -30, 5, 10, 15, 15, 10, 5, -30,
+        -40, -20, 0, 5, 5, 0, -20, -40,
+        -50, -40, -30, -30, -30, -30, -40, -50,
+    ],
+    BISHOP: [
+        -20, -10, -10, -10, -10, -10, -10, -20,
+        -10, 0, 0, 0, 0, 0, 0, -10,
+        -10, 0, 5, 10, 10, 5, 0, -10,
+        -10, 5, 5, 10, 10, 5, 5, -10,
+        -10, 0, 10, 10, 10, 10, 0, -10,
+        -10, 10, 10, 10, 10, 10, 10, -10,
+        -10, 5, 0, 0, 0, 0, 5, -10,
+        -20, -10, -10, -10, -10, -10, -10, -20,
+    ],
+    ROOK: [
+        0, 0, 0, 0, 0, 0, 0, 0,
+        5, 10, 10, 10, 10, 10, 10, 5,
+        -5, 0, 0, 0, 0, 0, 0, -5,
+        -5, 0, 0, 0, 0, 0, 0, -5,
+        -5, 0, 0, 0, 0, 0, 0, -5,
+        -5, 0, 0, 0, 0, 0, 0, -5,
+        -5, 0, 0, 0, 0, 0, 0, -5,
+        0, 0, 0, 5, 5, 0, 0, 0,
+    ],
+    QUEEN: [
+        -20, -10, -10, -5, -5, -10, -10, -20,
+        -10, 0, 0, 0, 0, 0, 0, -10,
+        -10, 0, 5, 5, 5, 5, 0, -10,
+        -5, 0, 5, 5, 5, 5, 0, -5,
+        0, 0, 5, 5, 5, 5, 0, -5,
+        -10, 5, 5, 5, 5, 5, 0, -10,
+        -10, 0, 5, 0, 0, 0, 0, -10,
+        -20, -10, -10, -5, -5, -10, -10, -20,
+    ],
+    KING: [
+        -30, -40, -40, -50, -50, -40, -40, -30,
+        -30, -40, -40, -50, -50, -40, -40, -30,
+        -30, -40, -40, -50, -50, -40, -40, -30,
+        -30, -40, -40, -50, -50, -40, -40, -30,
+        -20, -30, -30, -40, -40, -30, -30, -20,
+        -10, -20, -20, -20, -20, -20, -20, -10,
+        20, 20, 0, 0, 0, 0, 20, 20,
+        20, 30, 10, 0, 0, 10, 30, 20,
+    ],
+}
+
+ENDGAME_TABLES: dict[PieceType, list[int]] = {
+    **MIDDLEGAME_TABLES,
+    KING: [
+        -50, -40, -30, -20, -20, -30, -40, -50,
+        -30, -20, -10, 0, 0, -10, -20, -30,
+        -30, -10, 20, 30, 30, 20, -10, -30,
+        -30, -10, 30, 40, 40, 30, -10, -30,
+        -30, -10, 30, 40, 40, 30, -10, -30,
+        -30, -10, 20, 30, 30, 20, -10, -30,
+        -30, -30, 0, 0, 0, 0, -30, -30,
+        -50, -30, -30, -30, -30, -30, -30, -50,
+    ],
+}
+
+
+def _square_scores(tables: dict[PieceType, list[int]]) -> dict[Piece, list[int]]:
+    """
+    Score of every piece on every square, positive for White and negative for Black.
+    """
+    return {
+        Piece(color, piece_type): [
+            (1 if color == WHITE else -1) * (
+                PIECE_VALUES[piece_type] + tables[piece_type][sq if color == WHITE else sq ^ 56]
+            )
+            for sq in range(SQUARE_COUNT)
+        ]
+        for color in Color
+        for piece_type in PieceType
+    }
+
+
+MIDDLEGAME_SCORES = _square_scores(MIDDLEGAME_TABLES)
+ENDGAME_SCORES = _square_scores(ENDGAME_TABLES)
+
+
+class Evaluation(NamedTuple):
+    """
+    Running sums of the evaluation terms, which `Game` updates with every move.
+    """
+    middlegame: int  # White minus Black material and square scores, from the middlegame tables
+    endgame: int  # The same from the endgame tables
+    phase: int  # Sum of the PHASE_WEIGHTS of all the pieces
+
+    def score(self, color: Color) -> int:
+        """
+        Score from the point of view of `color`, weighing the endgame terms in as material leaves.
+        """
+        phase = min(self.phase, MAX_PHASE)
+        score = (self.middlegame * phase + self.endgame * (MAX_PHASE - phase)) // MAX_PHASE
+        return score if color == WHITE else -score
+
+
+def evaluation(board: BaseBoard) -> Evaluation:
+    """
+    Evaluation terms of the position, computed from scratch.
+    """
+    middlegame = endgame = phase = 0
+    for piece, location in board.get_pieces():
+        square = square_index(location)
+        middlegame += MIDDLEGAME_SCORES[piece][square]
+        endgame += ENDGAME_SCORES[piece][square]
+        phase += PHASE_WEIGHTS[piece.type]
+    return Evaluation(middlegame, endgame, phase)
+
+
+def evaluate(board: BaseBoard, color: Color) -> int:
+    """
+    Score of the position from the point of view of `color`.
+    """
+    return evaluation(board).score(color)
+
+
+def _code_table(scores: dict[Piece, list[int]]) -> npt.NDArray[np.int64]:
+    """
+    Per square scores indexed by piece code * 64 + square, see `engine.batch.PIECE_CODES`.
+    Code 0, an empty square, scores nothing.
+    """
+    table = np.zeros((len(PIECE_ROWS), SQUARE_COUNT), dtype=np.int64)
+    table[[PIECE_CODES[piece] for piece in scores]] = list(scores.values())
+    return table.ravel()
+
+
+CODE_MIDDLEGAME_SCORES = _code_table(MIDDLEGAME_SCORES)
+CODE_ENDGAME_SCORES = _code_table(ENDGAME_SCORES)
+CODE_PHASES = _code_table(
+    {piece: [PHASE_WEIGHTS[piece.type]] * SQUARE_COUNT for piece in MIDDLEGAME_SCORES}
+)
+
+
+def evaluate_boards(boards: npt.NDArray[np.int8], color: Color) -> npt.NDArray[np.int64]:
+    """
+    `evaluate` of a batch of positions, in one pass over all their squares.
+
+    :param boards: (N, 8, 8, 4) array in the layout of `Board.board`, see `engine.batch`.
+    """
+    squares = np.asarray(boards).reshape(-1, SQUARE_COUNT, 4)
+    codes = (squares[..., 0] * 8 + squares[..., 1]) * squares[..., 3]
+    index = codes.astype(np.intp) * SQUARE_COUNT + SQUARES
+    phase = np.minimum(CODE_PHASES[index].sum(axis=1), MAX_PHASE)
+    scores: npt.NDArray[np.int64] = (
+        CODE_MIDDLEGAME_SCORES[index].sum(axis=1) * phase
+        + CODE_ENDGAME_SCORES[index].sum(axis=1) * (MAX_PHASE - phase)
+    ) // MAX_PHASE
+    return scores if color == WHITE else -scores
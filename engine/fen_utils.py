@@ -3,20 +3,34 @@ Utils to load and save FEN strings
 """
 from typing import TYPE_CHECKING
 
+from engine.bitboard import SQUARE_LOCATIONS
 from engine.constants import BOARD_SIZE, FEN_MAPPING, INV_FEN_MAPPING
-from engine.types import BLACK, WHITE, Color, Piece
+from engine.types import BLACK, PAWN, WHITE, Color, Piece
+from engine.zobrist import (
+    BLACK_KINGSIDE, BLACK_QUEENSIDE, CASTLING_SQUARES, WHITE_KINGSIDE, WHITE_QUEENSIDE,
+    castling_rights
+)
 
 if TYPE_CHECKING:
     from engine.game import Game
 
+CASTLING_RIGHTS = {
+    "K": WHITE_KINGSIDE, "Q": WHITE_QUEENSIDE, "k": BLACK_KINGSIDE, "q": BLACK_QUEENSIDE
+}
+PAWN_ROWS = {WHITE: BOARD_SIZE-2, BLACK: 1}
+
 
 def from_fen(fen_string: str, game: 'Game') -> None:
+    """
+    Loads the position into the game. A placement-only FEN leaves every piece unmoved,
+    a full FEN also sets the side to move and the moved flags, see `_set_moved_flags`.
+    """
     fen_data: list[str] = fen_string.strip().split(sep=" ")
 
     if len(fen_data) == 1:
         placement_string: str = fen_data[0]
     elif len(fen_data) == 6:
-        placement_string, active_color_data, _, _, _, _ = fen_data
+        placement_string, active_color_data, castling_data, _, _, _ = fen_data
         active_color: Color = BLACK if active_color_data.lower() == "b" else WHITE
         game.active_color = active_color
 
@@ -33,15 +47,39 @@ def from_fen(fen_string: str, game: 'Game') -> None:
             if square_data != "x":
                 piece: Piece = FEN_MAPPING[square_data]
                 game.board.place_piece((i, j), piece)
+    if len(fen_data) == 6:
+        _set_moved_flags(game, castling_data)
+    game.resync()
+
+
+def _set_moved_flags(game: 'Game', castling_data: str) -> None:
+    """
+    Pawns off their starting row have moved, and so have the rooks, and kings, of the
+    castling rights missing from the FEN.
+    """
+    for piece, location in game.board.get_pieces():
+        if piece.type is PAWN and location.i != PAWN_ROWS[piece.color]:
+            game.board.set_moved(location, True)
+    rights = sum(CASTLING_RIGHTS.get(right, 0) for right in set(castling_data))
+    kept_kings = {king for right, (_, king, _) in CASTLING_SQUARES.items() if rights & right}
+    for right, (_, king_square, rook_square) in CASTLING_SQUARES.items():
+        if rights & right:
+            continue
+        for square in (rook_square, king_square):
+            if square not in kept_kings and game.board.is_occupied(SQUARE_LOCATIONS[square]):
+                game.board.set_moved(SQUARE_LOCATIONS[square], True)
 
 
 def to_fen(game: 'Game') -> str:
+    """
+    Full FEN of the position, which `from_fen` loads back with the same legal moves.
+    The engine has no en passant or move counters, so those fields are always "- 0 1".
+    """
     placement_string = ""
-    for i, rank in enumerate(game.board.board):
+    for i in range(BOARD_SIZE):
         empty_counter = 0
-        for j in range(len(rank)):
-            if game.board.board[i, j, 3]:
-                piece: Piece = game.board.get_piece((i, j))
+        for j in range(BOARD_SIZE):
+            if (piece := game.board.piece_at((i, j))) is not None:
                 square_data = INV_FEN_MAPPING[piece]
                 if empty_counter != 0:
                     placement_string += f"{empty_counter}"
@@ -56,4 +94,8 @@ def to_fen(game: 'Game') -> str:
             placement_string += f"{empty_counter}"
         placement_string += "/"
     placement_string = placement_string.strip("/")
-    return f"{placement_string} {str(game.active_color).lower()[0]}"
+    rights = castling_rights(game.board)
+    castling_string = "".join(
+        character for character, right in CASTLING_RIGHTS.items() if rights & right
+    ) or "-"
+    return f"{placement_string} {str(game.active_color).lower()[0]} {castling_string} - 0 1"
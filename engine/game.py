@@ -3,37 +3,187 @@ Game Class
 """
 from __future__ import annotations
 
+from array import array
+from collections import OrderedDict
 from functools import partial
 from itertools import chain
-from typing import Generator, Optional
+from typing import Callable, Generator, NamedTuple, Optional
 from urllib.parse import urlencode, urljoin
 
-import numpy as np
-
-from engine.board import Board, PieceLocation
+from engine.attacks import attackers, is_square_attacked
+from engine.bitboard import SQUARE_LOCATIONS, iter_squares, square_index
+from engine.board import BaseBoard, Board, PieceLocation
 from engine.constants import BOARD_SIZE
+from engine.encoding import (
+    CAPTURE_FLAG, PROMOTION_FLAG, QUIET_FLAG, decode_move, encode_move, pack, pack_moves
+)
+from engine.evaluation import (
+    ENDGAME_SCORES, MIDDLEGAME_SCORES, PHASE_WEIGHTS, Evaluation, evaluation
+)
 from engine.fen_utils import to_fen
-from engine.pieces import PIECE_LOGIC_MAP
+from engine.magic import bishop_attacks, queen_attacks, rook_attacks
+from engine.pieces import CAPTURE_LOGIC_MAP, PIECE_LOGIC_MAP, PieceLogic
+from engine.tables import (
+    BETWEEN, KING_ATTACKS, KNIGHT_ATTACKS, PAWN_ATTACKS, PAWN_DOUBLE_PUSHES, PAWN_PUSHES,
+    PROMOTION_ROWS
+)
 from engine.types import (
-    CAPTURE, KING, QUEEN, ROOK, WHITE,
-    Color, Direction, Location, Move, MoveType
+    BISHOP, KING, KNIGHT, NULL_MOVE, PAWN, QUEEN, ROOK, WHITE,
+    Color, Direction, Location, Move, MoveType, Piece, PieceType, Undo
+)
+from engine.zobrist import (
+    CASTLING_KEYS, CASTLING_MASK, PIECE_KEYS, SIDE_KEY, castling_rights, zobrist_key
 )
 
+ALL_SQUARES = (1 << (BOARD_SIZE * BOARD_SIZE)) - 1
+STATUS_CACHE_SIZE = 1024  # Positions whose legal moves and check the game remembers
+SLIDER_ATTACKS: dict[PieceType, Callable[[int, int], int]] = {
+    BISHOP: bishop_attacks, ROOK: rook_attacks, QUEEN: queen_attacks
+}
+
+
+class PositionStatus(NamedTuple):
+    """
+    Whether the side to move is in check, whether it has any legal move and the moves
+    themselves, each None until first needed.
+    """
+    in_check: Optional[bool] = None
+    has_moves: Optional[bool] = None
+    moves: Optional[tuple[Move, ...]] = None
+
 
-class Game:
+class StatusCache:
+    """
+    The statuses of the last `STATUS_CACHE_SIZE` positions of a game, by Zobrist key.
+    `version` is the board version the cache, along with the game's incrementally updated
+    state, is up to date with: moves played through the game keep it so, but changes made to
+    the board directly do not, see `Game._sync`.
+    """
+    def __init__(self, board: BaseBoard) -> None:
+        self.board = board
+        self.version = board.version
+        self.entries: OrderedDict[int, PositionStatus] = OrderedDict()
+
+    def in_sync(self) -> bool:
+        """
+        Whether the board changed only through moves since the last `sync`.
+        """
+        return self.board.version == self.version
+
+    def sync(self) -> None:
+        """
+        Accepts the board's changes since the last `sync`, as made by a move.
+        """
+        self.version = self.board.version
+
+    def clear(self) -> None:
+        self.entries.clear()
+        self.version = self.board.version
+
+    def get(self, key: int) -> PositionStatus:
+        """
+        The status of the position, empty if it is not cached.
+        """
+        status = self.entries.get(key)
+        if status is None:
+            return self.store(key, PositionStatus())
+        self.entries.move_to_end(key)
+        return status
+
+    def store(self, key: int, status: PositionStatus) -> PositionStatus:
+        self.entries[key] = status
+        if len(self.entries) > STATUS_CACHE_SIZE:
+            self.entries.popitem(last=False)
+        return status
+
+
+class IncrementalState:
+    """
+    The Zobrist key and `Evaluation` of a game's position. Moves update them incrementally,
+    changes made to the board directly have them recomputed when next read, the board's
+    `version` telling the two apart, see `StatusCache`.
+    """
+    board: BaseBoard
+    active_color: Color
+    statuses: StatusCache
+    _zobrist_key: int
+    _evaluation: Evaluation
+
+    @property
+    def zobrist_key(self) -> int:
+        self._sync()
+        return self._zobrist_key
+
+    @zobrist_key.setter
+    def zobrist_key(self, value: int) -> None:
+        self._zobrist_key = value
+
+    @property
+    def evaluation(self) -> Evaluation:
+        self._sync()
+        return self._evaluation
+
+    @evaluation.setter
+    def evaluation(self, value: Evaluation) -> None:
+        self._evaluation = value
+
+    def _sync(self) -> None:
+        """
+        Catches up with the changes made to the board other than by moves.
+        """
+        if not self.statuses.in_sync():
+            self.resync()
+
+    def resync(self) -> None:
+        """
+        Recomputes the state from scratch, as needed after setting up a position on the board.
+        """
+        self._zobrist_key = zobrist_key(self.board, self.active_color)
+        self._evaluation = evaluation(self.board)
+        self.statuses.clear()
+
+
+class Game(IncrementalState):
     """
     Game is a match of chess between Black and White.
     This class provides an interface between the players and the game.
+
+    :param board_type: The board backend to store the position in. Defaults to `Board`.
+    :param debug: Check incrementally updated state against a full recomputation after every move.
+
+    Along with the position, the game keeps its Zobrist key and its `Evaluation` up to date,
+    incrementally with every move, and from scratch after changes made to the board directly.
+    The legal moves and check of the side to move are computed once per position, and kept
+    for the last `STATUS_CACHE_SIZE` positions, see `StatusCache`.
     """
-    def __init__(self) -> None:
-        self.board = Board()
+    def __init__(self, board_type: type[BaseBoard] = Board, debug: bool = False) -> None:
+        self.board: BaseBoard = board_type()
         self.active_color = Color.WHITE
+        self.undo_stack: list[Undo] = []
+        self.debug = debug
+        self._zobrist_key = zobrist_key(self.board, self.active_color)
+        self._evaluation = evaluation(self.board)
+        self.statuses = StatusCache(self.board)
 
     def reset(self) -> None:
         self.board.clear()
         self.active_color = Color.WHITE
+        self.undo_stack.clear()
+        self.resync()
 
     def execute_move(self, move: Move) -> None:
+        piece = self.board.piece_at(move.start)
+        if piece is None:
+            raise ValueError(f'Invalid Move: {move}')
+        self._sync()
+        captured = self.board.piece_at(move.end)
+        key = self._zobrist_key ^ self._key_delta(move, piece, captured)
+        self._evaluation = self._evaluation_after(move, piece, captured)
+        if touches_castling := (
+            ((1 << square_index(move.start)) | (1 << square_index(move.end))) & CASTLING_MASK
+        ):
+            key ^= CASTLING_KEYS[castling_rights(self.board)]
+
         match move:
             case Move(start, end, MoveType.PASSING):
                 self.board.move_piece(start, end)
@@ -42,9 +192,8 @@ class Game:
                 self.board.remove_piece(end)
                 self.board.move_piece(start, end)
 
-            case Move(start, end, MoveType.CASTLE, castle_type=castle_type):
-                rook_start = (start.i, (BOARD_SIZE-1 if castle_type is KING else 0))
-                rook_dest = end + (Direction.W if castle_type is KING else Direction.E)
+            case Move(start, end, MoveType.CASTLE):
+                rook_start, rook_dest = self._castle_rook_squares(move)
                 self.board.move_piece(start, end)
                 self.board.move_piece(rook_start, rook_dest)
 
@@ -60,38 +209,208 @@ class Game:
             case _:
                 raise ValueError(f'Invalid Move: {move}')
 
+        if touches_castling:
+            key ^= CASTLING_KEYS[castling_rights(self.board)]
+        self._zobrist_key = key
+        self.active_color = ~self.active_color
+        self.statuses.sync()
+        if self.debug:
+            self._verify_zobrist_key()
+            self._verify_evaluation()
+
+    def _key_delta(self, move: Move, piece: Piece, captured: Optional[Piece]) -> int:
+        """
+        Zobrist key changes of a move, apart from castling rights.
+        """
+        start, end = square_index(move.start), square_index(move.end)
+        keys = PIECE_KEYS[piece.color]
+        delta = SIDE_KEY ^ keys[piece.type][start] ^ keys[move.promotion_rank or piece.type][end]
+        if captured is not None:
+            delta ^= PIECE_KEYS[captured.color][captured.type][end]
+        elif move.type is MoveType.CASTLE:
+            rook_start, rook_dest = self._castle_rook_squares(move)
+            delta ^= keys[ROOK][square_index(rook_start)] ^ keys[ROOK][square_index(rook_dest)]
+        return delta
+
+    def _evaluation_after(self, move: Move, piece: Piece, captured: Optional[Piece]) -> Evaluation:
+        """
+        The evaluation updated for the pieces the move takes off, puts on and moves.
+        """
+        start, end = square_index(move.start), square_index(move.end)
+        placed = Piece(piece.color, move.promotion_rank) if move.promotion_rank else piece
+        middlegame = MIDDLEGAME_SCORES[placed][end] - MIDDLEGAME_SCORES[piece][start]
+        endgame = ENDGAME_SCORES[placed][end] - ENDGAME_SCORES[piece][start]
+        phase = PHASE_WEIGHTS[placed.type] - PHASE_WEIGHTS[piece.type]
+        if captured is not None:
+            middlegame -= MIDDLEGAME_SCORES[captured][end]
+            endgame -= ENDGAME_SCORES[captured][end]
+            phase -= PHASE_WEIGHTS[captured.type]
+        elif move.type is MoveType.CASTLE:
+            rook = Piece(piece.color, ROOK)
+            rook_start, rook_dest = map(square_index, self._castle_rook_squares(move))
+            middlegame += MIDDLEGAME_SCORES[rook][rook_dest] - MIDDLEGAME_SCORES[rook][rook_start]
+            endgame += ENDGAME_SCORES[rook][rook_dest] - ENDGAME_SCORES[rook][rook_start]
+        return Evaluation(
+            self._evaluation.middlegame + middlegame,
+            self._evaluation.endgame + endgame,
+            self._evaluation.phase + phase,
+        )
+
+    def _verify_evaluation(self) -> None:
+        if self.evaluation != (expected := evaluation(self.board)):
+            raise RuntimeError(f"Incremental evaluation {self.evaluation} != {expected}")
+
+    def _verify_zobrist_key(self) -> None:
+        if self.zobrist_key != (expected := zobrist_key(self.board, self.active_color)):
+            raise RuntimeError(
+                f"Incremental Zobrist key {self.zobrist_key:#018x} != {expected:#018x}"
+            )
+
+    def make_move(self, move: Move) -> None:
+        """
+        Plays the move in place, remembering what is needed to take it back with `unmake_move`.
+        """
+        captured = self.board.piece_at(move.end)
+        self.undo_stack.append(Undo(
+            move, self.active_color, self.zobrist_key, self.evaluation,
+            self.board.has_moved(move.start),
+            captured, captured is not None and self.board.has_moved(move.end)
+        ))
+        self.execute_move(move)
+
+    def make_null_move(self) -> None:
+        """
+        Passes the turn to the other side without moving, as null-move pruning does.
+        Taken back with `unmake_move` like any other move.
+        """
+        self.undo_stack.append(Undo(
+            NULL_MOVE, self.active_color, self.zobrist_key, self.evaluation, moved=False
+        ))
+        self._zobrist_key ^= SIDE_KEY
         self.active_color = ~self.active_color
 
+    def make_packed_move(self, packed: int) -> None:
+        """
+        `make_move` for a move in the 16-bit encoding of `engine.encoding`.
+        """
+        self.make_move(decode_move(packed, self.board))
+
+    def unmake_move(self) -> Move:
+        """
+        Takes back the last move played with `make_move` and returns it.
+        """
+        undo = self.undo_stack.pop()
+        move = undo.move
+        if move is NULL_MOVE:
+            self.active_color = undo.active_color
+            self._zobrist_key = undo.zobrist_key
+            return move
+        in_sync = self.statuses.in_sync()
+        if move.promotion_rank:
+            self.board.promote_piece(move.end, PAWN)
+        self.board.move_piece(move.end, move.start)
+        self.board.set_moved(move.start, undo.moved)
+        if undo.captured is not None:
+            self.board.place_piece(move.end, undo.captured)
+            self.board.set_moved(move.end, undo.captured_moved)
+        elif move.type is MoveType.CASTLE:
+            rook_start, rook_dest = self._castle_rook_squares(move)
+            self.board.move_piece(rook_dest, rook_start)
+            self.board.set_moved(rook_start, False)  # Castling requires an unmoved rook
+        self.active_color = undo.active_color
+        self._zobrist_key = undo.zobrist_key
+        self._evaluation = undo.evaluation
+        if in_sync:
+            self.statuses.sync()
+        else:  # The board was changed directly since the move, unlike what the undo recorded
+            self.resync()
+        if self.debug:
+            self._verify_zobrist_key()
+            self._verify_evaluation()
+        return move
+
+    @staticmethod
+    def _castle_rook_squares(move: Move) -> tuple[Location, Location]:
+        rook_start = Location(move.start.i, (BOARD_SIZE-1 if move.castle_type is KING else 0))
+        rook_dest = move.end + (Direction.W if move.castle_type is KING else Direction.E)
+        return rook_start, rook_dest
+
     def seek_move(self, move: Move) -> Game:
-        game_copy = Game()
-        np.copyto(game_copy.board.board, self.board.board)
+        """
+        Returns a copy of the game with the move played, leaving this game untouched.
+        Search should prefer `make_move` and `unmake_move`, which do not copy the board.
+        """
+        game_copy = Game(board_type=type(self.board))
+        game_copy.board.copy_from(self.board)
         game_copy.active_color = self.active_color
 
         game_copy.execute_move(move)
         return game_copy
 
+    def _status(self) -> PositionStatus:
+        self._sync()
+        return self.statuses.get(self._zobrist_key)
+
+    def _store_status(self, status: PositionStatus) -> PositionStatus:
+        return self.statuses.store(self._zobrist_key, status)
+
     def is_in_check(self, color: Color) -> bool:
+        if color != self.active_color:
+            return self._king_attacked(color)
+        status = self._status()
+        if (in_check := status.in_check) is None:
+            in_check = self._king_attacked(color)
+            self._store_status(status._replace(in_check=in_check))
+        return in_check
+
+    def _king_attacked(self, color: Color) -> bool:
+        occupancy = self.board.occupancy()
         return any(
-            CAPTURE in move.type and move.target == KING
-            for move in self.legal_moves(unsafe=True, color=~color)
+            is_square_attacked(self.board, king_square, ~color, occupancy)
+            for king_square in iter_squares(self.board.piece_mask(color, KING))
         )
 
     def square_attacked(self, square: tuple[int, int], color: Color) -> bool:
-        return any(
-            move.end == square for move in self.legal_moves(unsafe=True, color=color)
-        )
+        """
+        Whether any piece of the given color attacks the square.
+        """
+        return is_square_attacked(self.board, square_index(square), color)
+
+    def attackers_of(self, square: tuple[int, int], color: Color) -> set[PieceLocation]:
+        """
+        All the pieces of the given color attacking the square.
+        """
+        return {
+            (self.board.get_piece(SQUARE_LOCATIONS[attacker]), SQUARE_LOCATIONS[attacker])
+            for attacker in iter_squares(attackers(self.board, square_index(square), color))
+        }
 
     def is_in_checkmate(self, color: Color) -> bool:
-        return not any(self.legal_moves(color=color)) and self.is_in_check(color=color)
+        return self.is_in_check(color=color) and not self._has_moves(color)
 
     def is_in_stalemate(self, color: Color) -> bool:
-        return not any(self.legal_moves(color=color)) and not self.is_in_check(color=color)
+        return not self.is_in_check(color=color) and not self._has_moves(color)
+
+    def _has_moves(self, color: Color) -> bool:
+        """
+        Whether the color has a legal move, generating no more moves than needed to find one.
+        """
+        if color != self.active_color:
+            return any(self._legal_moves(color))
+        status = self._status()
+        if (has_moves := status.has_moves) is None:
+            has_moves = bool(status.moves) if status.moves is not None else any(
+                self._legal_moves(color)
+            )
+            self._store_status(status._replace(has_moves=has_moves))
+        return has_moves
 
     def legal_moves(
         self,
         color: Optional[Color] = None,
         piece: Optional[PieceLocation] = None,
-        unsafe: bool = False
+        unsafe: bool = False,
+        captures_only: bool = False
     ) -> Generator[Move, None, None]:
         """
         Generate all legal moves for the selected pieces.
@@ -99,51 +418,333 @@ class Game:
         :param color: Color of the pieces to generate moves for. Defaults to `self.active_color`
         :param PieceLocation piece: The selected piece to generate moves for. Optional.
         :param unsafe: A flag to ignore depth 2 checks. Allowing pseudo-legal moves.
+        :param captures_only: Only generate captures and promotions, as quiescence search does.
         """
         color = color or self.active_color
+        if color == self.active_color and piece is None and not unsafe and not captures_only:
+            status = self._status()
+            if (moves := status.moves) is None:
+                moves = tuple(self._legal_moves(color))
+                self._store_status(status._replace(moves=moves))
+            yield from moves
+        else:
+            yield from self._legal_moves(color, piece, unsafe, captures_only)
+
+    def _legal_moves(
+        self,
+        color: Color,
+        piece: Optional[PieceLocation] = None,
+        unsafe: bool = False,
+        captures_only: bool = False
+    ) -> Generator[Move, None, None]:
         pieces = {piece} if piece else self.board.get_pieces(color=color)
-        piece_move_generator = chain.from_iterable(
-            PIECE_LOGIC_MAP[p[0][1]](self.board, p[1], p[0][0]) for p in pieces
-        )
+        logic = CAPTURE_LOGIC_MAP if captures_only else PIECE_LOGIC_MAP
         if unsafe:
-            yield from piece_move_generator
+            yield from chain.from_iterable(
+                logic[p[0][1]](self.board, p[1], p[0][0]) for p in pieces
+            )
+        elif self.board.piece_mask(color, KING).bit_count() != 1:
+            # Without exactly one king pins are ambiguous, so every move is played out instead
+            yield from filter(partial(self.is_move_safe, color), chain.from_iterable(
+                logic[p[0][1]](self.board, p[1], p[0][0]) for p in pieces
+            ))
         else:
-            yield from filter(partial(self.is_move_safe, color), piece_move_generator)
+            yield from self._checked_moves(color, pieces, logic)
+        if not captures_only and not unsafe:
             yield from self.castling_moves(color)
 
-    def castling_moves(self, color: Optional[Color] = None) -> Generator[Move, None, None]:
+    def move_stages(
+        self, hash_move: Optional[Move] = None, color: Optional[Color] = None
+    ) -> Generator[list[Move], None, None]:
+        """
+        Legal moves in three stages, each generated only when the previous one is used up,
+        so a search that cuts off early skips the rest, unless the moves of the position are
+        cached already:
+            1. The hash move, if it is legal in the position.
+            2. Captures and promotions.
+            3. Quiet moves and castling.
+
+        :param hash_move: Best move of an earlier search, from a table that may mix up positions.
+        :param color: Color to generate moves for. Defaults to `self.active_color`
+        """
         color = color or self.active_color
-        row = BOARD_SIZE-1 if color is WHITE else 0
-        king_loc = Location(row, 4)
-        if all((
-            np.array_equal(self.board[king_loc], [color, KING, 0, 1]),
-            np.array_equal(self.board[(row, BOARD_SIZE-1)], [color, ROOK, 0, 1]),
-            not np.any(self.board.board[row, 4+1:BOARD_SIZE-1, 3]),  # No pieces in between
-            not any(self.square_attacked((row, col), ~color) for col in range(4, 4+2)),
-                # King doesn't pass through check
-        )):
-            yield Move(
-                king_loc,
-                Location(row, 4+2),
-                type=MoveType.CASTLE,
-                castle_type=KING
+        moves: Optional[tuple[Move, ...]] = None
+        if color == self.active_color:
+            moves = self._status().moves
+        if hash_move is not None and not (
+            hash_move in moves if moves is not None else self._is_legal(hash_move, color)
+        ):
+            hash_move = None
+        yield [] if hash_move is None else [hash_move]
+
+        if moves is not None or self.board.piece_mask(color, KING).bit_count() != 1:
+            # Splitting the moves already generated for the position, or that need playing out
+            rest = [
+                move for move in (self.legal_moves(color=color) if moves is None else moves)
+                if move != hash_move
+            ]
+            yield [move for move in rest if move.target or move.promotion_rank]
+            yield [move for move in rest if not (move.target or move.promotion_rank)]
+            return
+
+        enemies = self.board.occupancy(~color)
+        promotion_row = PROMOTION_ROWS[color]
+        targets = list(self._legal_targets(color))
+        captures: list[Move] = []
+        for start, piece_type, piece_targets in targets:
+            tactical = enemies | promotion_row if piece_type is PAWN else enemies
+            for end in iter_squares(piece_targets & tactical):
+                captures.extend(self._target_moves(start, end, piece_type, promotion_row))
+        yield [move for move in captures if move != hash_move]
+
+        quiets: list[Move] = []
+        for start, piece_type, piece_targets in targets:
+            for end in iter_squares(piece_targets & ~enemies):
+                if not (piece_type is PAWN and promotion_row >> end & 1):
+                    quiets.append(Move(SQUARE_LOCATIONS[start], SQUARE_LOCATIONS[end]))
+        quiets.extend(self.castling_moves(color))
+        yield [move for move in quiets if move != hash_move]
+
+    def _target_moves(
+        self, start: int, end: int, piece_type: PieceType, promotion_row: int
+    ) -> Generator[Move, None, None]:
+        """
+        The moves of a piece onto a destination square, four for a pawn reaching the last row.
+        """
+        target = self.board.piece_at(SQUARE_LOCATIONS[end])
+        target_type = None if target is None else target.type
+        if piece_type is PAWN and promotion_row >> end & 1:
+            move_type = MoveType.PROMOTION if target is None else MoveType.CAPTURE_AND_PROMOTION
+            yield from (
+                Move(
+                    SQUARE_LOCATIONS[start], SQUARE_LOCATIONS[end], move_type,
+                    target=target_type, promotion_rank=rank
+                )
+                for rank in (QUEEN, ROOK, BISHOP, KNIGHT)
             )
-        if all((
-            np.array_equal(self.board[king_loc], [color, KING, 0, 1]),
-            np.array_equal(self.board[(row, 0)], [color, ROOK, 0, 1]),
-            not np.any(self.board.board[row, 1:4, 3]),  # No pieces in between
-            not any(self.square_attacked((row, col), ~color) for col in range(4-2, 4+1)),
-                # King doesn't pass through check
-        )):
+        else:
             yield Move(
-                king_loc,
-                Location(row, 4-2),
-                type=MoveType.CASTLE,
-                castle_type=QUEEN
+                SQUARE_LOCATIONS[start], SQUARE_LOCATIONS[end],
+                MoveType.PASSING if target is None else MoveType.CAPTURE, target=target_type
             )
 
+    def _is_legal(self, move: Move, color: Color) -> bool:
+        piece = self.board.piece_at(move.start)
+        if piece is None or piece.color != color:
+            return False
+        if move.type is MoveType.CASTLE:
+            return move in self.castling_moves(color)
+        return move in self.legal_moves(color=color, piece=(piece, move.start))
+
+    def _checked_moves(
+        self,
+        color: Color,
+        pieces: set[PieceLocation],
+        logic: dict[PieceType, PieceLogic]
+    ) -> Generator[Move, None, None]:
+        """
+        Legal moves of the given pieces generated by `logic`, computing checkers and pins once
+        for the position.
+        A piece may only move onto its allowed squares: anywhere when the king is not in check,
+        onto the checker or between it and the king when in check (nowhere in double check),
+        and only along the pin ray when pinned.
+        """
+        board = self.board
+        occupancy = board.occupancy()
+        king_square, evasions, pins = self._check_masks(color, occupancy)
+
+        for piece, location in pieces:
+            if piece.type is KING:
+                # The king must not stay on a ray it blocks, so it is taken off for the test
+                without_king = occupancy ^ (1 << king_square)
+                yield from (
+                    move for move in logic[KING](board, location, color)
+                    if not is_square_attacked(board, square_index(move.end), ~color, without_king)
+                )
+                continue
+            allowed = evasions & pins.get(square_index(location), ALL_SQUARES)
+            if allowed == ALL_SQUARES:
+                yield from logic[piece.type](board, location, color)
+            elif allowed:
+                yield from (
+                    move for move in logic[piece.type](board, location, color)
+                    if allowed >> square_index(move.end) & 1
+                )
+
+    def _check_masks(self, color: Color, occupancy: int) -> tuple[int, int, dict[int, int]]:
+        """
+        King square, squares that resolve a check (see `_checked_moves`) and pin rays
+        of the given color. Expects exactly one king.
+        """
+        king_square = self.board.piece_mask(color, KING).bit_length() - 1
+        checkers = attackers(self.board, king_square, ~color, occupancy)
+        if not checkers:
+            evasions = ALL_SQUARES
+        elif checkers & (checkers - 1):  # Double check
+            evasions = 0
+        else:
+            evasions = checkers | BETWEEN[king_square][checkers.bit_length() - 1]
+        return king_square, evasions, self._pin_rays(king_square, color, occupancy)
+
+    def packed_legal_moves(self, color: Optional[Color] = None) -> array:  # type: ignore[type-arg]
+        """
+        All legal moves as an array of 16-bit packed moves, see `engine.encoding`.
+        The moves are expanded straight from destination masks, no Move is built.
+
+        :param color: Color to generate moves for. Defaults to `self.active_color`
+        """
+        color = color or self.active_color
+        if self.board.piece_mask(color, KING).bit_count() != 1:
+            return pack_moves(self.legal_moves(color=color))
+        moves = array("H")
+        enemies = self.board.occupancy(~color)
+        promotion_row = PROMOTION_ROWS[color]
+        for start, piece_type, targets in self._legal_targets(color):
+            for end in iter_squares(targets):
+                flags = CAPTURE_FLAG if enemies >> end & 1 else QUIET_FLAG
+                if piece_type is PAWN and promotion_row >> end & 1:
+                    moves.extend(
+                        pack(start, end, flags | PROMOTION_FLAG | rank) for rank in (3, 2, 1, 0)
+                    )
+                else:
+                    moves.append(pack(start, end, flags))
+        moves.extend(map(encode_move, self.castling_moves(color)))
+        return moves
+
+    def count_legal_moves(self, color: Optional[Color] = None) -> int:
+        """
+        Number of legal moves, counted from destination masks without generating them.
+
+        :param color: Color to count moves for. Defaults to `self.active_color`
+        """
+        color = color or self.active_color
+        if self.board.piece_mask(color, KING).bit_count() != 1:
+            return sum(1 for _ in self.legal_moves(color=color))
+        return sum(
+            self._target_count(color, piece_type, targets)
+            for _, piece_type, targets in self._legal_targets(color)
+        ) + sum(1 for _ in self.castling_moves(color))
+
+    def legal_move_counts(self, color: Optional[Color] = None) -> dict[PieceLocation, int]:
+        """
+        Number of legal moves of every piece that has any, see `count_legal_moves`.
+
+        :param color: Color to count moves for. Defaults to `self.active_color`
+        """
+        color = color or self.active_color
+        counts: dict[int, int] = {}
+        if self.board.piece_mask(color, KING).bit_count() != 1:
+            for move in self.legal_moves(color=color):
+                counts[square_index(move.start)] = counts.get(square_index(move.start), 0) + 1
+        else:
+            for start, piece_type, targets in self._legal_targets(color):
+                counts[start] = self._target_count(color, piece_type, targets)
+            for move in self.castling_moves(color):
+                counts[square_index(move.start)] = counts.get(square_index(move.start), 0) + 1
+        return {
+            (self.board.get_piece(SQUARE_LOCATIONS[square]), SQUARE_LOCATIONS[square]): count
+            for square, count in counts.items()
+        }
+
+    @staticmethod
+    def _target_count(color: Color, piece_type: PieceType, targets: int) -> int:
+        """
+        Number of moves onto the destination mask, a pawn reaching the last row makes four.
+        """
+        if piece_type is PAWN:
+            return targets.bit_count() + 3 * (targets & PROMOTION_ROWS[color]).bit_count()
+        return targets.bit_count()
+
+    def _legal_targets(self, color: Color) -> Generator[tuple[int, PieceType, int], None, None]:
+        """
+        Yields the square, type and mask of legal destinations of every piece of the given color
+        that can move, castling aside. Expects exactly one king.
+        """
+        board = self.board
+        occupancy = board.occupancy()
+        own = board.occupancy(color)
+        king_square, evasions, pins = self._check_masks(color, occupancy)
+
+        without_king = occupancy ^ (1 << king_square)
+        king_targets = 0
+        for end in iter_squares(KING_ATTACKS[king_square] & ~own):
+            if not is_square_attacked(board, end, ~color, without_king):
+                king_targets |= 1 << end
+        if king_targets:
+            yield king_square, KING, king_targets
+        if not evasions:  # Double check, only the king can move
+            return
+
+        for piece_type in (PAWN, KNIGHT, BISHOP, ROOK, QUEEN):
+            for start in iter_squares(board.piece_mask(color, piece_type)):
+                if piece_type is PAWN:
+                    targets = self._pawn_targets(start, color, occupancy)
+                elif piece_type is KNIGHT:
+                    targets = KNIGHT_ATTACKS[start]
+                else:
+                    targets = SLIDER_ATTACKS[piece_type](start, occupancy)
+                if targets := targets & ~own & evasions & pins.get(start, ALL_SQUARES):
+                    yield start, piece_type, targets
+
+    def _pawn_targets(self, square: int, color: Color, occupancy: int) -> int:
+        """
+        Pushes and captures of the pawn on the square, as a mask.
+        """
+        targets = PAWN_PUSHES[color][square] & ~occupancy
+        if targets and not self.board.has_moved(SQUARE_LOCATIONS[square]):
+            targets |= PAWN_DOUBLE_PUSHES[color][square] & ~occupancy
+        return targets | PAWN_ATTACKS[color][square] & self.board.occupancy(~color)
+
+    def _pin_rays(self, king_square: int, color: Color, occupancy: int) -> dict[int, int]:
+        """
+        Maps the square of every pinned piece of the given color to the squares it may move to:
+        the ray between the king and the pinning piece, the pinning piece included.
+        """
+        board, enemy = self.board, ~color
+        queens = board.piece_mask(enemy, QUEEN)
+        snipers = (
+            rook_attacks(king_square, 0) & (board.piece_mask(enemy, ROOK) | queens)
+            | bishop_attacks(king_square, 0) & (board.piece_mask(enemy, BISHOP) | queens)
+        )
+        pins = {}
+        for sniper in iter_squares(snipers):
+            blockers = BETWEEN[king_square][sniper] & occupancy
+            if blockers and not blockers & (blockers - 1) and blockers & board.occupancy(color):
+                pins[blockers.bit_length() - 1] = BETWEEN[king_square][sniper] | (1 << sniper)
+        return pins
+
+    def castling_moves(self, color: Optional[Color] = None) -> Generator[Move, None, None]:
+        color = color or self.active_color
+        row = BOARD_SIZE-1 if color is WHITE else 0
+        king_loc = Location(row, 4)
+        if not self._is_unmoved(king_loc, Piece(color, KING)):
+            return
+        for castle_type, rook_col, between, king_path in (
+            (KING, BOARD_SIZE-1, range(4+1, BOARD_SIZE-1), range(4, 4+3)),
+            (QUEEN, 0, range(1, 4), range(4-2, 4+1)),
+        ):
+            if (
+                self._is_unmoved((row, rook_col), Piece(color, ROOK))
+                and not any(self.board.is_occupied((row, col)) for col in between)
+                    # No pieces in between
+                and not any(self.square_attacked((row, col), ~color) for col in king_path)
+                    # King doesn't pass through check
+            ):
+                yield Move(
+                    king_loc,
+                    Location(row, 4+2 if castle_type is KING else 4-2),
+                    type=MoveType.CASTLE,
+                    castle_type=castle_type
+                )
+
+    def _is_unmoved(self, location: tuple[int, int], piece: Piece) -> bool:
+        return self.board.piece_at(location) == piece and not self.board.has_moved(location)
+
     def is_move_safe(self, color: Color, move: Move) -> bool:
-        return not self.seek_move(move).is_in_check(color=color)
+        self.make_move(move)
+        safe = not self.is_in_check(color=color)
+        self.unmake_move()
+        return safe
 
     @property
     def lichess(self) -> str:
@@ -0,0 +1,182 @@
+"""
+Magic bitboard attack lookup for the sliding pieces.
+
+For every square, the attack set of a rook or bishop only depends on the occupancy of its
+relevant squares (its rays without the board edge). Multiplying that occupancy by the square's
+magic number maps every possible occupancy onto a distinct index of a per-square attack table,
+so the attacks for any occupancy are a single table lookup.
+
+The magic numbers below were found with `find_magic`. Regenerate with `python -m engine.magic`.
+"""
+import random
+from typing import Generator, Optional
+
+from engine.constants import BOARD_SIZE
+from engine.types import DIAGONAL_DIRECTIONS, PARALLEL_DIRECTIONS, Direction
+
+FULL_MASK = (1 << 64) - 1
+
+ROOK_MAGICS: list[int] = [
+    0x008000400010A280, 0x4040002000401004, 0x2080081000802001, 0x2080100094180080,
+    0x2100040800300300, 0x2A00102801442E00, 0x4880210020800200, 0x01000080A0C50002,
+    0x00008008C0008020, 0x0061002110804000, 0x0804808020001000, 0x0004801000080281,
+    0x0000800402080081, 0x002200041028AE00, 0x0041001415000200, 0x4202000402428209,
+    0x0881808000204000, 0x0210104000200842, 0x8107010020001040, 0x30128A0010C22200,
+    0x5422808004000800, 0x0804808004000200, 0x0100140008011002, 0x0000820004064081,
+    0x0004608280004004, 0x4090500040002004, 0x0080A08200401200, 0x8000300080801800,
+    0x0409000500122800, 0x1206000200100408, 0x2500300C00410802, 0x0000800280006300,
+    0x000020400A800080, 0x0801200281804000, 0x0841842000801005, 0xB105006009005000,
+    0x0008500801000500, 0x0012002280800C00, 0x8000020804002190, 0x0001040082000441,
+    0x00800080C0018020, 0x0090004820104000, 0x8000102001010044, 0x041000106B010020,
+    0x0241140008008080, 0x0002042040080130, 0x4000055008040002, 0x0820090040820004,
+    0x0400410260800B00, 0x000040088CE00480, 0x020480A000100080, 0x0106220108C01200,
+    0x0010810800040080, 0x0032002204008080, 0x03A0100228010400, 0x2040111409429200,
+    0x0929020218418022, 0x0000102081004001, 0x90A0711B20010041, 0x0802009020400806,
+    0x8002001061080442, 0x0405002400124801, 0x0000082209100184, 0x8100804100288C02,
+]
+BISHOP_MAGICS: list[int] = [
+    0x8488A00100C10502, 0x0004288808478400, 0x22A405440B001820, 0x0098060046020204,
+    0x0084042080880400, 0x00060A1005600000, 0x0015081282600000, 0xA88141C404200A00,
+    0x0080100250010200, 0x4000022202020A00, 0x0005500980810090, 0x4080080861005020,
+    0x00040C05200A0020, 0x0140015011100040, 0x0040084410082880, 0x40A0220482019001,
+    0x00200040080221A0, 0x08080D1C10908200, 0x0048400400440101, 0x8828040282004050,
+    0x0183002090400024, 0x2000800410009818, 0x00120010D1042038, 0x1002008101430401,
+    0x0062400008088828, 0x0144210110150510, 0x0009030010840400, 0x0201004004040102,
+    0x0006140002008200, 0x3808410002028200, 0x01A8920001080200, 0x0B80820005010080,
+    0x0122022008902014, 0x0882500420102300, 0x7000280808040022, 0x0000200800190104,
+    0x00A00210101400C0, 0x00100A00A042100C, 0x4061284209010108, 0x0001821604148082,
+    0x0004021310004000, 0x720C451860000800, 0x2502004208001241, 0x4068001148001400,
+    0x0220480700408408, 0x1010600800410060, 0x00082840840391A0, 0x0402120202062070,
+    0x4477012120600002, 0x0234410088211040, 0x0888020084240000, 0x0048001042020000,
+    0x4010024002820004, 0x9010101011084900, 0x4108A00192120004, 0x411216064A020802,
+    0x200180C40A200240, 0x4100206311082000, 0x0001604042084410, 0x02C4080121A08800,
+    0x2180280048230C00, 0x8530404A02080201, 0x2001400204040E80, 0x2160080300409200,
+]
+
+
+def _ray_attacks(square: int, occupancy: int, directions: list[Direction]) -> int:
+    """
+    Attacks found by walking every ray until it leaves the board or hits a piece.
+    """
+    attacks = 0
+    i, j = divmod(square, BOARD_SIZE)
+    for direction in directions:
+        step_i, step_j = i + direction.i, j + direction.j
+        while 0 <= step_i < BOARD_SIZE and 0 <= step_j < BOARD_SIZE:
+            bit = 1 << (step_i * BOARD_SIZE + step_j)
+            attacks |= bit
+            if occupancy & bit:
+                break
+            step_i, step_j = step_i + direction.i, step_j + direction.j
+    return attacks
+
+
+def _relevant_mask(square: int, directions: list[Direction]) -> int:
+    """
+    Squares whose occupancy changes the attacks from the given square.
+    The last square of every ray never blocks anything beyond it, so it is left out.
+    """
+    mask = 0
+    i, j = divmod(square, BOARD_SIZE)
+    for direction in directions:
+        step_i, step_j = i + direction.i, j + direction.j
+        while (
+            0 <= step_i + direction.i < BOARD_SIZE
+            and 0 <= step_j + direction.j < BOARD_SIZE
+        ):
+            mask |= 1 << (step_i * BOARD_SIZE + step_j)
+            step_i, step_j = step_i + direction.i, step_j + direction.j
+    return mask
+
+
+def _subsets(mask: int) -> Generator[int, None, None]:
+    """
+    Every subset of the mask, using the Carry-Rippler trick.
+    """
+    subset = 0
+    while True:
+        yield subset
+        subset = (subset - mask) & mask
+        if subset == 0:
+            return
+
+
+def find_magic(
+    square: int, directions: list[Direction], rng: Optional[random.Random] = None
+) -> int:
+    """
+    Searches for a magic number that indexes every occupancy of the square without collisions.
+    Two occupancies may share an index only if they produce the same attacks.
+    """
+    rng = rng or random.Random()
+    mask = _relevant_mask(square, directions)
+    shift = 64 - mask.bit_count()
+    occupancies = list(_subsets(mask))
+    attacks = [_ray_attacks(square, occupancy, directions) for occupancy in occupancies]
+    while True:
+        # Sparse candidates are much more likely to be magic
+        magic = rng.getrandbits(64) & rng.getrandbits(64) & rng.getrandbits(64)
+        if ((mask * magic) & FULL_MASK) >> 56 < 6:
+            continue
+        table: dict[int, int] = {}
+        for occupancy, attack in zip(occupancies, attacks):
+            index = ((occupancy * magic) & FULL_MASK) >> shift
+            if table.setdefault(index, attack) != attack:
+                break
+        else:
+            return magic
+
+
+def _build_tables(
+    directions: list[Direction], magics: list[int]
+) -> tuple[list[int], list[int], list[list[int]]]:
+    """
+    Relevant masks, index shifts and attack tables of one kind of slider, indexed by square.
+    """
+    masks, shifts, tables = [], [], []
+    for square, magic in enumerate(magics):
+        mask = _relevant_mask(square, directions)
+        shift = 64 - mask.bit_count()
+        table = [0] * (1 << mask.bit_count())
+        for occupancy in _subsets(mask):
+            table[((occupancy * magic) & FULL_MASK) >> shift] = _ray_attacks(
+                square, occupancy, directions
+            )
+        masks.append(mask)
+        shifts.append(shift)
+        tables.append(table)
+    return masks, shifts, tables
+
+
+ROOK_MASKS, ROOK_SHIFTS, ROOK_TABLES = _build_tables(PARALLEL_DIRECTIONS, ROOK_MAGICS)
+BISHOP_MASKS, BISHOP_SHIFTS, BISHOP_TABLES = _build_tables(DIAGONAL_DIRECTIONS, BISHOP_MAGICS)
+
+
+def rook_attacks(square: int, occupancy: int) -> int:
+    return ROOK_TABLES[square][
+        (((occupancy & ROOK_MASKS[square]) * ROOK_MAGICS[square]) & FULL_MASK)
+        >> ROOK_SHIFTS[square]
+    ]
+
+
+def bishop_attacks(square: int, occupancy: int) -> int:
+    return BISHOP_TABLES[square][
+        (((occupancy & BISHOP_MASKS[square]) * BISHOP_MAGICS[square]) & FULL_MASK)
+        >> BISHOP_SHIFTS[square]
+    ]
+
+
+def queen_attacks(square: int, occupancy: int) -> int:
+    return rook_attacks(square, occupancy) | bishop_attacks(square, occupancy)
+
+
+if __name__ == "__main__":
+    generator = random.Random(0)
+    for name, slider_directions in (
+        ("ROOK_MAGICS", PARALLEL_DIRECTIONS), ("BISHOP_MAGICS", DIAGONAL_DIRECTIONS)
+    ):
+        found = [find_magic(sq, slider_directions, generator) for sq in range(BOARD_SIZE**2)]
+        print(f"{name}: list[int] = [")
+        for row in range(0, len(found), 4):
+            print("    " + " ".join(f"0x{magic:016X}," for magic in found[row:row+4]))
+        print("]")
@@ -0,0 +1,98 @@
+"""
+Process pool driver that splits a tree walk across cores.
+
+The position is split into the subtrees below its root moves, or below every pair of root move
+and reply for a finer load balance. Subtrees are shipped to the workers as FEN strings, and
+their results are merged by root move.
+"""
+from __future__ import annotations
+
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, NamedTuple, Optional, TypeVar
+
+from engine.board import BaseBoard
+from engine.fen_utils import from_fen, to_fen
+from engine.game import Game
+from engine.types import Move
+
+Result = TypeVar("Result")
+
+
+class Subtree(NamedTuple):
+    root: Move  # Root move the subtree belongs to
+    fen: str  # Position at the top of the subtree
+    depth: int  # Plies left to walk
+
+
+class WorkerTiming(NamedTuple):
+    pid: int
+    tasks: int
+    seconds: float
+
+
+class SplitResult(NamedTuple):
+    results: dict[Move, list[Any]]  # Results of every subtree, by root move
+    seconds: float  # Wall time
+    workers: list[WorkerTiming]
+
+
+def split(game: Game, depth: int, split_depth: int = 1) -> list[Subtree]:
+    """
+    Subtrees below every line of `split_depth` moves from the position, `depth` plies deep in all.
+    Root moves whose lines end early, in mate or stalemate, have no subtree.
+    """
+    subtrees = []
+    split_depth = max(1, min(split_depth, depth))
+
+    def walk(root: Optional[Move], plies: int) -> None:
+        for move in list(game.legal_moves()):
+            game.make_move(move)
+            if plies == 1:
+                subtrees.append(Subtree(root or move, to_fen(game), depth - split_depth))
+            else:
+                walk(root or move, plies - 1)
+            game.unmake_move()
+
+    walk(None, split_depth)
+    return subtrees
+
+
+def _run_subtree(
+    task: tuple[Callable[[Game, int], Result], type[BaseBoard], Subtree]
+) -> tuple[Result, float, int]:
+    walker, board_type, subtree = task
+    game = Game(board_type=board_type)
+    from_fen(subtree.fen, game)
+    start = time.perf_counter()
+    result = walker(game, subtree.depth)
+    return result, time.perf_counter() - start, os.getpid()
+
+
+def run_split(
+    walker: Callable[[Game, int], Result],
+    game: Game,
+    depth: int,
+    workers: Optional[int] = None,
+    split_depth: int = 1,
+) -> SplitResult:
+    """
+    Runs `walker(game, plies left)` on every subtree of the position in a pool of processes.
+    The walker must be a module level function, so that it can be sent to the workers.
+
+    :param workers: Number of worker processes. Defaults to the number of CPUs.
+    :param split_depth: Plies to split the tree at, 2 balances the load better than 1.
+    """
+    subtrees = split(game, depth, split_depth)
+    results: dict[Move, list[Result]] = {move: [] for move in game.legal_moves()}
+    timings: dict[int, WorkerTiming] = {}
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+        for subtree, (result, seconds, pid) in zip(subtrees, pool.map(
+            _run_subtree, ((walker, type(game.board), subtree) for subtree in subtrees)
+        )):
+            results[subtree.root].append(result)
+            timing = timings.get(pid, WorkerTiming(pid, 0, 0.0))
+            timings[pid] = WorkerTiming(pid, timing.tasks + 1, timing.seconds + seconds)
+    return SplitResult(results, time.perf_counter() - start, list(timings.values()))
@@ -0,0 +1,217 @@
+"""
+Perft: counts the leaf nodes of the legal move tree to a fixed depth.
+Node counts check move generation against known values, and their rate measures its speed.
+
+Run with `python -m engine.perft --depth 3 --board bitboard --json perft.json`,
+adding `--workers N` to split every position over N processes.
+
+The expected counts follow this engine's rules, which have no en passant. They are the published
+counts wherever no en passant capture is possible within the depth.
+"""
+import argparse
+import json
+import sys
+import time
+from typing import NamedTuple, Optional
+
+from engine.bitboard import BitBoard
+from engine.board import BaseBoard, Board
+from engine.encoding import uci
+from engine.fen_utils import from_fen
+from engine.game import Game
+from engine.parallel import WorkerTiming, run_split
+
+BOARD_TYPES: dict[str, type[BaseBoard]] = {"numpy": Board, "bitboard": BitBoard}
+
+
+class PerftPosition(NamedTuple):
+    name: str
+    fen: str
+    nodes: tuple[int, ...]  # Expected node counts, from depth 1
+
+
+PERFT_POSITIONS: list[PerftPosition] = [
+    PerftPosition(
+        "start", "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1",
+        (20, 400, 8902, 197281),
+    ),
+    PerftPosition(
+        "kiwipete", "r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1",
+        (48, 2038, 97766, 4079596),
+    ),
+    PerftPosition(
+        "endgame", "8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 1",
+        (14, 191, 2810, 43087),
+    ),
+    PerftPosition(
+        "mirror", "r3k2r/Pppp1ppp/1b3nbN/nP6/BBP1P3/q4N2/Pp1P2PP/R2Q1RK1 w kq - 0 1",
+        (6, 264, 9463, 422146),
+    ),
+    PerftPosition(
+        "talkchess", "rnbq1k1r/pp1Pbppp/2p5/8/2B5/8/PPP1NnPP/RNBQK2R w KQ - 1 8",
+        (44, 1486, 62379, 2103487),
+    ),
+    PerftPosition(
+        "middlegame", "r4rk1/1pp1qppp/p1np1n2/2b1p1B1/2B1P1b1/P1NP1N2/1PP1QPPP/R4RK1 w - - 0 10",
+        (46, 2079, 89890, 3894594),
+    ),
+    PerftPosition(
+        "promotions", "n1n5/PPPk4/8/8/8/8/4Kppp/5N1N b - - 0 1",
+        (24, 496, 9483, 182838),
+    ),
+    PerftPosition(
+        "castling", "r3k2r/8/8/8/8/8/8/R3K2R w KQkq - 0 1",
+        (26, 568, 13744, 314346),
+    ),
+]
+
+
+class PerftResult(NamedTuple):
+    name: str
+    fen: str
+    depth: int
+    nodes: int
+    expected: Optional[int]
+    seconds: float
+    divide: dict[str, int]
+    workers: tuple[WorkerTiming, ...] = ()
+
+    @property
+    def nps(self) -> float:
+        return self.nodes / self.seconds if self.seconds else 0.0
+
+    @property
+    def passed(self) -> Optional[bool]:
+        return None if self.expected is None else self.nodes == self.expected
+
+    def report(self) -> dict[str, object]:
+        return {
+            "name": self.name, "fen": self.fen, "depth": self.depth, "nodes": self.nodes,
+            "expected": self.expected, "passed": self.passed, "seconds": self.seconds,
+            "nps": round(self.nps), "divide": self.divide,
+            "workers": [worker._asdict() for worker in self.workers],
+        }
+
+
+def perft(game: Game, depth: int) -> int:
+    """
+    Number of leaf nodes of the legal move tree of the given depth.
+    The last ply is counted in bulk, without playing or generating its moves.
+    """
+    if depth == 0:
+        return 1
+    if depth == 1:
+        return game.count_legal_moves()
+    nodes = 0
+    for move in list(game.legal_moves()):
+        game.make_move(move)
+        nodes += perft(game, depth - 1)
+        game.unmake_move()
+    return nodes
+
+
+def divide(game: Game, depth: int) -> dict[str, int]:
+    """
+    Perft of the position after each root move, keyed by the move in UCI notation.
+    The first move to disagree with a reference engine's divide points to the faulty branch.
+    """
+    counts = {}
+    for move in list(game.legal_moves()):
+        game.make_move(move)
+        counts[uci(move)] = perft(game, depth - 1)
+        game.unmake_move()
+    return counts
+
+
+def parallel_divide(
+    game: Game, depth: int, workers: Optional[int] = None, split_depth: int = 1
+) -> tuple[dict[str, int], tuple[WorkerTiming, ...]]:
+    """
+    `divide` with the subtrees walked by a pool of processes, see `engine.parallel.run_split`.
+    Also returns the time each worker spent walking.
+    """
+    split_result = run_split(perft, game, depth, workers, split_depth)
+    counts = {uci(move): sum(nodes) for move, nodes in split_result.results.items()}
+    return counts, tuple(split_result.workers)
+
+
+def run_position(
+    position: PerftPosition,
+    depth: int,
+    board_type: type[BaseBoard] = BitBoard,
+    workers: int = 1,
+    split_depth: int = 1,
+) -> PerftResult:
+    """
+    Perft of the position, walked by the given number of processes.
+    """
+    game = Game(board_type=board_type)
+    from_fen(position.fen, game)
+    start = time.perf_counter()
+    timings: tuple[WorkerTiming, ...] = ()
+    if workers > 1:
+        counts, timings = parallel_divide(game, depth, workers, split_depth)
+    else:
+        counts = divide(game, depth)
+    seconds = time.perf_counter() - start
+    return PerftResult(
+        position.name, position.fen, depth, sum(counts.values()),
+        position.nodes[depth - 1] if depth <= len(position.nodes) else None,
+        seconds, counts, timings,
+    )
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Count the leaf nodes of standard positions.")
+    parser.add_argument("--depth", type=int, default=3)
+    parser.add_argument("--board", choices=BOARD_TYPES, default="bitboard")
+    parser.add_argument(
+        "--position", action="append", choices=[p.name for p in PERFT_POSITIONS],
+        help="Position to run, may be repeated. Defaults to all of them."
+    )
+    parser.add_argument("--workers", type=int, default=1, help="Number of processes.")
+    parser.add_argument(
+        "--split-depth", type=int, default=1,
+        help="Plies at which the tree is split between the processes."
+    )
+    parser.add_argument("--divide", action="store_true", help="Print the per root move counts.")
+    parser.add_argument("--json", metavar="PATH", help="Write the JSON report to this file.")
+    args = parser.parse_args(argv)
+
+    positions = [p for p in PERFT_POSITIONS if not args.position or p.name in args.position]
+    results = []
+    for position in positions:
+        result = run_position(
+            position, args.depth, BOARD_TYPES[args.board], args.workers, args.split_depth
+        )
+        results.append(result)
+        status = {True: "ok", False: f"FAILED, expected {result.expected}", None: "unchecked"}
+        print(
+            f"{result.name:<12} depth {args.depth}: {result.nodes:>10} nodes "
+            f"{result.seconds:8.2f} s {result.nps:>10,.0f} nodes/s  {status[result.passed]}"
+        )
+        for worker in result.workers:
+            print(f"  worker {worker.pid}: {worker.tasks} subtrees in {worker.seconds:.2f} s")
+        if args.divide:
+            for move, count in result.divide.items():
+                print(f"  {move}: {count}")
+
+    nodes, seconds = sum(r.nodes for r in results), sum(r.seconds for r in results)
+    print(f"{'total':<12} depth {args.depth}: {nodes:>10} nodes {seconds:8.2f} s "
+          f"{nodes / seconds if seconds else 0:>10,.0f} nodes/s")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as report:
+            json.dump({
+                "board": args.board,
+                "depth": args.depth,
+                "workers": args.workers,
+                "nodes": nodes,
+                "seconds": seconds,
+                "nps": round(nodes / seconds) if seconds else 0,
+                "positions": [result.report() for result in results],
+            }, report, indent=2)
+    return 0 if all(result.passed is not False for result in results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,90 @@
+"""
+Reading games in Portable Game Notation (PGN), moves being in Standard Algebraic Notation (SAN).
+"""
+import re
+from typing import Iterator, NamedTuple
+
+from engine.constants import BOARD_SIZE
+from engine.game import Game
+from engine.types import BISHOP, KING, KNIGHT, PAWN, QUEEN, ROOK, CASTLE, Location, Move
+
+START_FEN = "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1"
+RESULTS = ("1-0", "0-1", "1/2-1/2", "*")
+PIECE_LETTERS = {"N": KNIGHT, "B": BISHOP, "R": ROOK, "Q": QUEEN, "K": KING}
+
+TAG = re.compile(r'^\[(\w+)\s+"(.*)"\]\s*$', re.MULTILINE)
+# Comments, line comments, annotation glyphs and move numbers, none of which are moves
+NOISE = re.compile(r"\{[^}]*\}|;[^\n]*|\$\d+|\d+\.(?:\.\.)?")
+SAN = re.compile(
+    r"^(?:(?P<castle>[O0]-[O0](?:-[O0])?)"
+    r"|(?P<piece>[NBRQK])?(?P<file>[a-h])?(?P<rank>[1-8])?x?(?P<end>[a-h][1-8])"
+    r"(?:=?(?P<promotion>[NBRQ]))?)[+#]?[!?]*$"
+)
+
+
+class PgnGame(NamedTuple):
+    tags: dict[str, str]
+    moves: list[str]  # In SAN
+
+    @property
+    def fen(self) -> str:
+        return self.tags.get("FEN", START_FEN)
+
+
+def read_games(pgn: str) -> Iterator[PgnGame]:
+    """
+    The games of a PGN text, main line only: variations are left out.
+    """
+    for text in re.split(r"\n\s*\n(?=\s*\[)", pgn.strip()):
+        tags = dict(TAG.findall(text))
+        movetext = _strip_variations(NOISE.sub(" ", TAG.sub("", text)))
+        moves = [token for token in movetext.split() if token not in RESULTS]
+        if tags or moves:
+            yield PgnGame(tags, moves)
+
+
+def _strip_variations(movetext: str) -> str:
+    depth, kept = 0, []
+    for char in movetext:
+        if char == "(":
+            depth += 1
+        elif char == ")":
+            depth = max(depth - 1, 0)
+        elif not depth:
+            kept.append(char)
+    return "".join(kept)
+
+
+def location(square: str) -> Location:
+    """
+    The location of a square named like e4.
+    """
+    return Location(BOARD_SIZE - int(square[1]), ord(square[0]) - ord("a"))
+
+
+def parse_san(game: Game, san: str) -> Move:
+    """
+    The legal move of the side to move that the SAN stands for.
+
+    :raises ValueError: When the SAN is malformed, or matches no legal move or more than one.
+    """
+    if not (match := SAN.match(san)):
+        raise ValueError(f"Invalid SAN: {san}")
+    if castle := match["castle"]:
+        castle_type = KING if castle.count("-") == 1 else QUEEN
+        candidates = [move for move in game.castling_moves() if move.castle_type is castle_type]
+    else:
+        end = location(match["end"])
+        piece_type = PIECE_LETTERS[match["piece"]] if match["piece"] else PAWN
+        promotion = PIECE_LETTERS[match["promotion"]] if match["promotion"] else None
+        candidates = [
+            move for move in game.legal_moves()
+            if move.end == end and move.promotion_rank is promotion
+            and game.board.get_piece(move.start).type is piece_type
+            and move.type is not CASTLE
+            and (not match["file"] or move.start.j == ord(match["file"]) - ord("a"))
+            and (not match["rank"] or move.start.i == BOARD_SIZE - int(match["rank"]))
+        ]
+    if len(candidates) != 1:
+        raise ValueError(f"{san} matches {len(candidates)} legal moves")
+    return candidates[0]
@@ -1,110 +1,165 @@
 """
-Movement logic of all the pieces. Generates pseudo-legal moves
+Movement logic of all the pieces. Generates pseudo-legal moves, all of them or only the captures
+and promotions.
 """
 
-from itertools import chain, permutations, product
 from typing import Generator, Dict, Callable
 
+from engine.bitboard import SQUARE_LOCATIONS, iter_squares, square_index
+from engine.board import BaseBoard
 from engine.constants import BOARD_SIZE
-from engine.board import Board
+from engine.magic import bishop_attacks, queen_attacks, rook_attacks
+from engine.tables import (
+    KING_DESTINATIONS, KNIGHT_DESTINATIONS, PAWN_ATTACK_DESTINATIONS, PAWN_PUSH_DESTINATIONS
+)
 from engine.types import (
-    Color, Direction, Location, Move, MoveType, PieceType,
-    DIAGONAL_DIRECTIONS, PARALLEL_DIRECTIONS,  # Direction Groups
+    Color, Location, Move, MoveType, PieceType,
     CAPTURE, CAPTURE_AND_PROMOTION, PROMOTION,  # MoveTypes
     PAWN, KNIGHT, BISHOP, ROOK, QUEEN, KING,  # PieceTypes
-    WHITE,  # Colors
+    BLACK, WHITE,  # Colors
 )
 
+PROMOTION_ROW = {WHITE: 0, BLACK: BOARD_SIZE-1}
+
 
 class PieceMovement:
 
     @staticmethod
-    def pawn_moves(board: Board, location: Location, color: Color) -> Generator[Move, None, None]:
-        front: Direction = Direction.N if color is WHITE else Direction.S
-        one_ahead = location + front
-        attack_diagonals = [one_ahead+Direction.E, one_ahead+Direction.W]
+    def pawn_moves(
+        board: BaseBoard, location: Location, color: Color
+    ) -> Generator[Move, None, None]:
+        yield from PieceMovement._pawn_attack_moves(board, location, color)
+
+        pushes = PAWN_PUSH_DESTINATIONS[color][square_index(location)]
+        if pushes and not board.is_occupied(pushes[0]):
+            yield from PieceMovement._transform_promotion(Move(location, pushes[0]), color)
 
-        for destination in filter(Board.is_in_bounds, attack_diagonals):
-            dest_square = board.board[destination[0], destination[1]]
             if (
-                dest_square[3]  # Is occupied
-                and dest_square[0] != color  # Is enemy
+                len(pushes) == 2
+                and not board.has_moved(location)
+                and not board.is_occupied(pushes[1])
+            ):
+                yield Move(location, pushes[1])
+
+    @staticmethod
+    def pawn_captures(
+        board: BaseBoard, location: Location, color: Color
+    ) -> Generator[Move, None, None]:
+        """
+        Captures and promotions of the pawn, the moves of `pawn_moves` that gain material.
+        """
+        yield from PieceMovement._pawn_attack_moves(board, location, color)
+
+        pushes = PAWN_PUSH_DESTINATIONS[color][square_index(location)]
+        if pushes and pushes[0].i == PROMOTION_ROW[color] and not board.is_occupied(pushes[0]):
+            yield from PieceMovement._transform_promotion(Move(location, pushes[0]), color)
+
+    @staticmethod
+    def _pawn_attack_moves(
+        board: BaseBoard, location: Location, color: Color
+    ) -> Generator[Move, None, None]:
+        for destination in PAWN_ATTACK_DESTINATIONS[color][square_index(location)]:
+            if (
+                (target := board.piece_at(destination)) is not None  # Is occupied
+                and target.color != color  # Is enemy
             ):
                 yield from PieceMovement._transform_promotion(
                     Move(
                         location, destination, CAPTURE,
-                        target=dest_square[1]
+                        target=target.type
                     ),
                     color
                 )
 
-        if board.is_in_bounds(one_ahead) and not board.board[one_ahead[0], one_ahead[1], 3]:
-            yield from PieceMovement._transform_promotion(Move(location, one_ahead), color)
+    @staticmethod
+    def knight_moves(
+        board: BaseBoard, location: Location, color: Color
+    ) -> Generator[Move, None, None]:
+        yield from PieceMovement._leap_moves(
+            board, location, color, KNIGHT_DESTINATIONS[square_index(location)]
+        )
 
-            if (
-                board.board[location[0], location[1], 2] == 0  # Has not moved
-                and board.is_in_bounds(two_ahead := location + (2*front))
-                and not board.board[two_ahead[0], two_ahead[1], 3]
-            ):
-                yield Move(location, two_ahead)
+    @staticmethod
+    def bishop_moves(
+        board: BaseBoard, location: Location, color: Color
+    ) -> Generator[Move, None, None]:
+        yield from PieceMovement._slide_moves(
+            board, location, color, bishop_attacks(square_index(location), board.occupancy())
+        )
 
     @staticmethod
-    def knight_moves(board: Board, location: Location, color: Color) -> Generator[Move, None, None]:
-        deltas = [-2, -1, 1, 2]
-        destination_gen: Generator[Location, None, None] = (
-            location+v for v in permutations(deltas, 2) if abs(v[0]) != abs(v[1])
+    def rook_moves(
+        board: BaseBoard, location: Location, color: Color
+    ) -> Generator[Move, None, None]:
+        yield from PieceMovement._slide_moves(
+            board, location, color, rook_attacks(square_index(location), board.occupancy())
         )
-        for destination in filter(Board.is_in_bounds, destination_gen):
-            dest_square = board.board[destination[0], destination[1]]
-            if not dest_square[3]:  # Is not occupied
-                yield Move(location, destination)
-            elif dest_square[0] != color:  # Is enemy
-                yield Move(
-                    location, destination, CAPTURE,
-                    target=dest_square[1]
-                )
 
     @staticmethod
-    def bishop_moves(board: Board, location: Location, color: Color) -> Generator[Move, None, None]:
-        yield from chain.from_iterable(
-            PieceMovement._slide_moves(board, location, color, d) for d in DIAGONAL_DIRECTIONS
+    def queen_moves(
+        board: BaseBoard, location: Location, color: Color
+    ) -> Generator[Move, None, None]:
+        yield from PieceMovement._slide_moves(
+            board, location, color, queen_attacks(square_index(location), board.occupancy())
         )
 
     @staticmethod
-    def rook_moves(board: Board, location: Location, color: Color) -> Generator[Move, None, None]:
-        yield from chain.from_iterable(
-            PieceMovement._slide_moves(board, location, color, d) for d in PARALLEL_DIRECTIONS
+    def king_moves(
+        board: BaseBoard, location: Location, color: Color
+    ) -> Generator[Move, None, None]:
+        yield from PieceMovement._leap_moves(
+            board, location, color, KING_DESTINATIONS[square_index(location)]
         )
 
     @staticmethod
-    def queen_moves(board: Board, location: Location, color: Color) -> Generator[Move, None, None]:
-        directions: list[Direction] = PARALLEL_DIRECTIONS + DIAGONAL_DIRECTIONS
-        yield from chain.from_iterable(
-            PieceMovement._slide_moves(board, location, color, d) for d in directions
+    def knight_captures(
+        board: BaseBoard, location: Location, color: Color
+    ) -> Generator[Move, None, None]:
+        yield from PieceMovement._leap_captures(
+            board, location, color, KNIGHT_DESTINATIONS[square_index(location)]
         )
 
     @staticmethod
-    def king_moves(board: Board, location: Location, color: Color) -> Generator[Move, None, None]:
-        deltas = [-1, 0, 1]
-        destination_gen: Generator[Location, None, None] = (
-            location+v for v in product(deltas, deltas) if v != (0, 0)
+    def bishop_captures(
+        board: BaseBoard, location: Location, color: Color
+    ) -> Generator[Move, None, None]:
+        yield from PieceMovement._slide_moves(
+            board, location, color,
+            bishop_attacks(square_index(location), board.occupancy()) & board.occupancy(~color)
+        )
+
+    @staticmethod
+    def rook_captures(
+        board: BaseBoard, location: Location, color: Color
+    ) -> Generator[Move, None, None]:
+        yield from PieceMovement._slide_moves(
+            board, location, color,
+            rook_attacks(square_index(location), board.occupancy()) & board.occupancy(~color)
+        )
+
+    @staticmethod
+    def queen_captures(
+        board: BaseBoard, location: Location, color: Color
+    ) -> Generator[Move, None, None]:
+        yield from PieceMovement._slide_moves(
+            board, location, color,
+            queen_attacks(square_index(location), board.occupancy()) & board.occupancy(~color)
+        )
+
+    @staticmethod
+    def king_captures(
+        board: BaseBoard, location: Location, color: Color
+    ) -> Generator[Move, None, None]:
+        yield from PieceMovement._leap_captures(
+            board, location, color, KING_DESTINATIONS[square_index(location)]
         )
-        for destination in filter(Board.is_in_bounds, destination_gen):
-            dest_square = board.board[destination[0], destination[1]]
-            if not dest_square[3]:  # Is not occupied
-                yield Move(location, destination)
-            elif dest_square[0] != color:  # Is enemy
-                yield Move(
-                    location, destination, CAPTURE,
-                    target=dest_square[1]
-                )
 
     @staticmethod
     def _transform_promotion(move: Move, color: Color) -> Generator[Move, None, None]:
 
         promotable_ranks = [PieceType.QUEEN, PieceType.ROOK, PieceType.BISHOP, PieceType.KNIGHT]
 
-        promotion_row = 0 if color is WHITE else BOARD_SIZE-1
+        promotion_row = PROMOTION_ROW[color]
         match move:
             case Move(start, end, MoveType.PASSING) if end.i == promotion_row:
                 yield from (
@@ -120,29 +175,50 @@ class PieceMovement:
                 yield move
 
     @staticmethod
-    def _slide_moves(
-        board: Board, location: Location, color: Color, direction: Direction
+    def _leap_moves(
+        board: BaseBoard, location: Location, color: Color, destinations: tuple[Location, ...]
     ) -> Generator[Move, None, None]:
-        # TODO: Find a way to yield CAPTURE moves first. (Optimization)
-        step = 1
-        while Board.is_in_bounds(destination := location+(direction*step)):
-            dest_square = board.board[destination[0], destination[1]]
-            if not dest_square[3]:  # Is not occupied
+        for destination in destinations:
+            if (target := board.piece_at(destination)) is None:  # Is not occupied
                 yield Move(location, destination)
-                step += 1
-            elif dest_square[0] != color:  # Enemy
+            elif target.color != color:  # Is enemy
                 yield Move(
                     location, destination, CAPTURE,
-                    target=dest_square[1]
+                    target=target.type
                 )
-                break
-            else:  # Friendly
-                break
 
+    @staticmethod
+    def _leap_captures(
+        board: BaseBoard, location: Location, color: Color, destinations: tuple[Location, ...]
+    ) -> Generator[Move, None, None]:
+        for destination in destinations:
+            if (target := board.piece_at(destination)) is not None and target.color != color:
+                yield Move(
+                    location, destination, CAPTURE,
+                    target=target.type
+                )
 
-PIECE_LOGIC_MAP: Dict[
-    PieceType, Callable[[Board, Location, Color], Generator[Move, None, None]]
-] = {
+    @staticmethod
+    def _slide_moves(
+        board: BaseBoard, location: Location, color: Color, attacks: int
+    ) -> Generator[Move, None, None]:
+        """
+        Moves to the squares of a sliding attack mask, captures first.
+        """
+        enemies = board.occupancy(~color)
+        for square in iter_squares(attacks & enemies):
+            destination = SQUARE_LOCATIONS[square]
+            yield Move(
+                location, destination, CAPTURE,
+                target=board.get_piece(destination).type
+            )
+        for square in iter_squares(attacks & ~(enemies | board.occupancy(color))):
+            yield Move(location, SQUARE_LOCATIONS[square])
+
+
+PieceLogic = Callable[[BaseBoard, Location, Color], Generator[Move, None, None]]
+
+PIECE_LOGIC_MAP: Dict[PieceType, PieceLogic] = {
     PAWN: PieceMovement.pawn_moves,
     KNIGHT: PieceMovement.knight_moves,
     BISHOP: PieceMovement.bishop_moves,
@@ -150,3 +226,12 @@ PIECE_LOGIC_MAP: Dict[
     QUEEN: PieceMovement.queen_moves,
     KING: PieceMovement.king_moves
 }
+
+CAPTURE_LOGIC_MAP: Dict[PieceType, PieceLogic] = {
+    PAWN: PieceMovement.pawn_captures,
+    KNIGHT: PieceMovement.knight_captures,
+    BISHOP: PieceMovement.bishop_captures,
+    ROOK: PieceMovement.rook_captures,
+    QUEEN: PieceMovement.queen_captures,
+    KING: PieceMovement.king_captures
+}
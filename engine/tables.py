@@ -0,0 +1,94 @@
+"""
+Lookup tables for the leaping pieces and pawns, built once at import.
+Every table is indexed by square (i * 8 + j), see `engine.bitboard.square_index`.
+Destination tables hold the in-bounds Locations, attack tables hold the same squares as a mask.
+"""
+from itertools import permutations, product
+
+from engine.bitboard import SQUARE_LOCATIONS, square_index
+from engine.board import BaseBoard
+from engine.constants import BOARD_SIZE
+from engine.types import (
+    BLACK, DIAGONAL_DIRECTIONS, PARALLEL_DIRECTIONS, WHITE, Color, Direction, Location
+)
+
+KNIGHT_DELTAS = [v for v in permutations([-2, -1, 1, 2], 2) if abs(v[0]) != abs(v[1])]
+KING_DELTAS = [v for v in product([-1, 0, 1], [-1, 0, 1]) if v != (0, 0)]
+PAWN_FRONT = {WHITE: Direction.N, BLACK: Direction.S}
+
+
+def _destinations(location: Location, deltas: list[tuple[int, int]]) -> tuple[Location, ...]:
+    return tuple(
+        SQUARE_LOCATIONS[square_index(destination)]
+        for destination in (location + delta for delta in deltas)
+        if BaseBoard.is_in_bounds(destination)
+    )
+
+
+def _mask(locations: tuple[Location, ...]) -> int:
+    mask = 0
+    for location in locations:
+        mask |= 1 << square_index(location)
+    return mask
+
+
+KNIGHT_DESTINATIONS: list[tuple[Location, ...]] = [
+    _destinations(location, KNIGHT_DELTAS) for location in SQUARE_LOCATIONS
+]
+KING_DESTINATIONS: list[tuple[Location, ...]] = [
+    _destinations(location, KING_DELTAS) for location in SQUARE_LOCATIONS
+]
+PAWN_ATTACK_DESTINATIONS: dict[Color, list[tuple[Location, ...]]] = {
+    color: [
+        _destinations(location, [(front.i, Direction.E.j), (front.i, Direction.W.j)])
+        for location in SQUARE_LOCATIONS
+    ]
+    for color, front in PAWN_FRONT.items()
+}
+# The square one ahead, followed by the square two ahead when it is on the board
+PAWN_PUSH_DESTINATIONS: dict[Color, list[tuple[Location, ...]]] = {
+    color: [
+        _destinations(location, [(front.i, front.j), (2 * front.i, 2 * front.j)])
+        for location in SQUARE_LOCATIONS
+    ]
+    for color, front in PAWN_FRONT.items()
+}
+
+KNIGHT_ATTACKS: list[int] = [_mask(destinations) for destinations in KNIGHT_DESTINATIONS]
+KING_ATTACKS: list[int] = [_mask(destinations) for destinations in KING_DESTINATIONS]
+PAWN_ATTACKS: dict[Color, list[int]] = {
+    color: [_mask(destinations) for destinations in table]
+    for color, table in PAWN_ATTACK_DESTINATIONS.items()
+}
+PAWN_PUSHES: dict[Color, list[int]] = {
+    color: [_mask(destinations[:1]) for destinations in table]
+    for color, table in PAWN_PUSH_DESTINATIONS.items()
+}
+PAWN_DOUBLE_PUSHES: dict[Color, list[int]] = {
+    color: [_mask(destinations[1:]) for destinations in table]
+    for color, table in PAWN_PUSH_DESTINATIONS.items()
+}
+# The row each color's pawns promote on
+PROMOTION_ROWS: dict[Color, int] = {
+    WHITE: _mask(tuple(SQUARE_LOCATIONS[:BOARD_SIZE])),
+    BLACK: _mask(tuple(SQUARE_LOCATIONS[-BOARD_SIZE:])),
+}
+
+
+def _between(square: int) -> list[int]:
+    """
+    Squares strictly between the given square and every square sharing a rank, file or diagonal.
+    Squares not on a common line map to an empty mask.
+    """
+    between = [0] * len(SQUARE_LOCATIONS)
+    for direction in PARALLEL_DIRECTIONS + DIAGONAL_DIRECTIONS:
+        ray, step = 0, SQUARE_LOCATIONS[square] + direction
+        while BaseBoard.is_in_bounds(step):
+            between[square_index(step)] = ray
+            ray |= 1 << square_index(step)
+            step = step + direction
+    return between
+
+
+# Indexed by [square][square]
+BETWEEN: list[list[int]] = [_between(square) for square in range(len(SQUARE_LOCATIONS))]
@@ -3,7 +3,10 @@ Types used in the Chess engine.
 """
 from __future__ import annotations
 from enum import Enum, IntEnum, auto, IntFlag
-from typing import NamedTuple, Union, Tuple, Any, Optional, SupportsIndex
+from typing import TYPE_CHECKING, NamedTuple, Union, Tuple, Any, Optional, SupportsIndex
+
+if TYPE_CHECKING:
+    from engine.evaluation import Evaluation
 
 
 class Location(NamedTuple):
@@ -99,9 +102,23 @@ class Piece(NamedTuple):
     type: PieceType
 
 
+class Undo(NamedTuple):
+    """
+    Everything `Game.unmake_move` needs to take back a move.
+    """
+    move: Move
+    active_color: Color
+    zobrist_key: int
+    evaluation: Evaluation
+    moved: bool  # Whether the moving piece had moved before
+    captured: Optional[Piece] = None
+    captured_moved: bool = False
+
+
 # Constants
 PARALLEL_DIRECTIONS = [Direction.N, Direction.S, Direction.E, Direction.W]
 DIAGONAL_DIRECTIONS = [Direction.NE, Direction.NW, Direction.SE, Direction.SW]
+NULL_MOVE = Move(Location(0, 0), Location(0, 0))  # Passes the turn, see `Game.make_null_move`
 
 # Aliases
 BLACK = Color.BLACK
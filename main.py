@@ -1,15 +1,42 @@
 """
 Entrypoint for manual tests
 """
+import argparse
+import json
 import time
+from typing import Any, Optional
 
 from bots import MinMaxBot, RandomBot
+from bots.min_max import SearchConfig, SearchStats, TimeControl
 from engine import Color, Game, from_fen
+from engine.book import OpeningBook
 
 
 def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--stats", action="store_true", help="print the search statistics of every move"
+    )
+    parser.add_argument(
+        "--stats-json", metavar="PATH", help="dump the search statistics of every move as JSON"
+    )
+    parser.add_argument(
+        "--book", metavar="PATH", help="Polyglot opening book to play the opening from"
+    )
+    args = parser.parse_args()
+    stats: Optional[SearchStats] = None
+    if args.stats or args.stats_json:
+        stats = SearchStats()
+    searches: list[dict[str, Any]] = []
+
     players = (
-        MinMaxBot(max_depth=6, color=Color.WHITE),
+        MinMaxBot(
+            max_depth=6, color=Color.WHITE,
+            config=SearchConfig(
+                time_control=TimeControl(move_time=5), stats=stats,
+                book=OpeningBook(args.book) if args.book else None
+            )
+        ),
         RandomBot(color=Color.BLACK)
     )
 
@@ -26,6 +53,10 @@ def main() -> None:
         active_player.clock += et - st
         game.execute_move(selected_move)
         print(f"{active_player.name} played {selected_move}")
+        if stats is not None and active_player is players[0]:
+            if args.stats:
+                print(stats)
+            searches.append(stats.as_dict())
         print(game.board)
 
     inactive_player = (
@@ -46,6 +77,10 @@ def main() -> None:
     players[0].display_time_taken()
     players[1].display_time_taken()
 
+    if args.stats_json:
+        with open(args.stats_json, "w", encoding="utf-8") as file:
+            json.dump(searches, file, indent=2)
+
 
 if __name__ == "__main__":
     main()
@@ -3,6 +3,7 @@
 Profiling the engine
 """
 import cProfile
+import json
 import os
 import time
 import pstats
@@ -10,17 +11,25 @@ import random
 
 from dotenv import load_dotenv
 
-from engine import Game, Move
+from bots import MinMaxBot
+from bots.min_max import SearchConfig, SearchStats
+from engine import BitBoard, Board, Game, Move
 from engine.fen_utils import from_fen
+from engine.perft import PERFT_POSITIONS
 from github_action_utils import GithubActionUtils as gau
 
 load_dotenv()
 PER_GAME_MOVE_LIMIT = 250
 GAME_COUNT = int(os.getenv("WORKFLOW_INPUT") or os.getenv("PROFILER_GAME_COUNT", "50"))
+BOARD_TYPES = {"numpy": Board, "bitboard": BitBoard}
+BOARD_TYPE = BOARD_TYPES[os.getenv("PROFILER_BOARD", "bitboard")]
+# Profiles MinMaxBot searches of the perft positions to this depth instead of random games
+SEARCH_DEPTH = os.getenv("PROFILER_SEARCH_DEPTH")
+STATS_JSON = os.getenv("PROFILER_STATS_JSON")  # File to dump the search statistics to
 
 
 def random_game() -> bool:
-    game = Game()
+    game = Game(board_type=BOARD_TYPE)
     from_fen("rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR", game)
     for _ in range(PER_GAME_MOVE_LIMIT):
         moves = list(game.legal_moves())
@@ -45,6 +54,31 @@ def run_games(raw: bool = False) -> None:
     return results
 
 
+def run_searches() -> list:
+    searches = []
+    for position in PERFT_POSITIONS:
+        game = Game(board_type=BOARD_TYPE)
+        from_fen(position.fen, game)
+        stats = SearchStats()
+        bot = MinMaxBot(
+            game.active_color, max_depth=int(SEARCH_DEPTH), config=SearchConfig(stats=stats)
+        )
+        move = bot.select_move(game)
+        print(f"{position.name}: {move}")
+        print(stats)
+        searches.append({"position": position.name, **stats.as_dict()})
+    return searches
+
+
+def profile_searches() -> None:
+    profiler = cProfile.Profile()
+    searches = profiler.runcall(run_searches)
+    pstats.Stats(profiler).sort_stats("cumulative").print_stats(30)
+    if STATS_JSON:
+        with open(STATS_JSON, "w", encoding="utf-8") as file:
+            json.dump(searches, file, indent=2)
+
+
 def run_profiler() -> None:
     profiler = cProfile.Profile()
     profiler_games_results = profiler.runcall(run_games)
@@ -59,12 +93,15 @@ def run_profiler() -> None:
 
 def summary(stat: pstats.Stats, status: dict, raw_time: float) -> None:
     if os.getenv("ENVIRONMENT") == "GITHUB":
-        gau.markdown_line(f"### Profiled {sum(status.values())} Random Games ###")
+        gau.markdown_line(
+            f"### Profiled {sum(status.values())} Random Games ({BOARD_TYPE.__name__}) ###"
+        )
         gau.tabulate(["Status", "Count"], [[key, value] for key, value in status.items()])
         gau.markdown_line("")
         gau.markdown_line(f"Average Per Game Time: {round(stat.total_tt/GAME_COUNT, 5)} s.")
         gau.markdown_line(f"Average Per Game Time (Raw): {round(raw_time/GAME_COUNT, 5)} s.")
     else:
+        print(f"BOARD: {BOARD_TYPE.__name__}")
         print("GAME STATUS:")
         for key, value in status.items():
             print(f"{key}: {value}")
@@ -73,4 +110,7 @@ def summary(stat: pstats.Stats, status: dict, raw_time: float) -> None:
 
 
 if __name__ == "__main__":
-    run_profiler()
+    if SEARCH_DEPTH:
+        profile_searches()
+    else:
+        run_profiler()
@@ -3,7 +3,29 @@ Unittests for this project.
 
 Run using: `python -m unittest tests`
 """
+from tests.test_attacks import TestAttacks
+from tests.test_batch import TestBatch
 from tests.test_bishop import TestBishop
+from tests.test_bitboard import TestBitBoard
+from tests.test_board import TestBoard
+from tests.test_book import TestOpeningBook
+from tests.test_encoding import TestEncoding
+from tests.test_evaluation import TestEvaluation
+from tests.test_game import TestMakeUnmake
 from tests.test_knight import TestKnight
+from tests.test_legal_moves import TestLegalMoves
+from tests.test_magic import TestMagic
+from tests.test_min_max import TestMinMaxBot, TestMoveOrdering, TestSearchStats
+from tests.test_parallel import TestParallel
+from tests.test_perft import TestPerft
+from tests.test_tables import TestTables
+from tests.test_transposition import TestMinMaxTransposition, TestTranspositionTable
+from tests.test_zobrist import TestZobrist
 
-__all__ = ["TestKnight", "TestBishop"]
+__all__ = [
+    "TestKnight", "TestBishop", "TestBitBoard", "TestTables", "TestMagic", "TestMakeUnmake",
+    "TestZobrist", "TestTranspositionTable", "TestMinMaxTransposition", "TestLegalMoves",
+    "TestAttacks", "TestEncoding", "TestBoard", "TestPerft", "TestParallel",
+    "TestBatch", "TestEvaluation", "TestMinMaxBot", "TestMoveOrdering",
+    "TestSearchStats", "TestOpeningBook",
+]
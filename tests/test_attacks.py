@@ -0,0 +1,61 @@
+"""
+Unittests for the square attack queries.
+"""
+import unittest
+
+from engine import BitBoard, Board, Game, from_fen
+from engine.attacks import attackers, is_square_attacked
+from engine.bitboard import square_index
+from engine.types import BLACK, KNIGHT, PAWN, QUEEN, ROOK, WHITE, Location, Piece
+
+
+class TestAttacks(unittest.TestCase):
+
+    def setUp(self) -> None:
+        # Black: rook a8, queen d8, knight c6, pawn e5. White: rook d1 behind a pawn on d4.
+        self.games = [Game(board_type=Board), Game(board_type=BitBoard)]
+        for game in self.games:
+            from_fen("r2qk3/8/2n5/4p3/3P4/8/8/3RK3 w - - 0 1", game)
+
+    def test_attackers_of(self) -> None:
+        for game in self.games:
+            self.assertSetEqual(
+                game.attackers_of((3, 3), BLACK),  # d5
+                {(Piece(BLACK, QUEEN), Location(0, 3))}
+            )
+            self.assertSetEqual(
+                game.attackers_of((4, 3), BLACK),  # d4
+                {
+                    (Piece(BLACK, KNIGHT), Location(2, 2)),
+                    (Piece(BLACK, PAWN), Location(3, 4)),
+                    (Piece(BLACK, QUEEN), Location(0, 3)),
+                }
+            )
+
+    def test_sliders_are_blocked(self) -> None:
+        for game in self.games:
+            self.assertFalse(game.square_attacked((3, 3), WHITE))  # d5, the d4 pawn blocks d1
+            self.assertTrue(game.square_attacked((4, 3), WHITE))  # d4 is defended by the rook
+            self.assertTrue(game.square_attacked((0, 1), BLACK))  # b8, by the a8 rook
+            self.assertTrue(game.square_attacked((7, 0), BLACK))  # a1, down the open a-file
+            self.assertFalse(game.square_attacked((7, 1), BLACK))
+
+    def test_pawns_attack_diagonally_only(self) -> None:
+        for game in self.games:
+            self.assertTrue(game.square_attacked((3, 4), WHITE))  # e5, captured by d4
+            self.assertFalse(game.square_attacked((3, 3), WHITE))  # d5, only pushed onto
+            self.assertTrue(game.square_attacked((4, 5), BLACK))  # f4, captured by e5
+
+    def test_occupancy_override(self) -> None:
+        board = self.games[1].board
+        d4, d7 = square_index((4, 3)), square_index((1, 3))
+        self.assertFalse(is_square_attacked(board, d7, WHITE))
+        self.assertTrue(is_square_attacked(board, d7, WHITE, board.occupancy() & ~(1 << d4)))
+        self.assertEqual(
+            attackers(board, d7, WHITE, board.occupancy() & ~(1 << d4)),
+            board.piece_mask(WHITE, ROOK)
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
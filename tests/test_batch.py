@@ -0,0 +1,114 @@
+"""
+Unittests for vectorized batch move generation, checked against Game.
+"""
+import random
+import unittest
+
+import numpy as np
+
+from engine import BitBoard, Board, Game, from_fen
+from engine.batch import batch_moves, board_array, play_moves, stack_boards
+from engine.bitboard import iter_squares, square_index
+from engine.perft import PERFT_POSITIONS
+from engine.types import BLACK, WHITE
+
+
+class TestBatch(unittest.TestCase):
+
+    def assert_matches(self, games: list[Game]) -> None:
+        result = batch_moves(
+            stack_boards(game.board for game in games), [game.active_color for game in games]
+        )
+        for game, targets, count in zip(games, result.targets, result.counts):
+            expected: dict[int, set[int]] = {}
+            for move in game.legal_moves():
+                expected.setdefault(square_index(move.start), set()).add(square_index(move.end))
+            actual = {
+                square: set(iter_squares(int(mask))) for square, mask in enumerate(targets) if mask
+            }
+            self.assertEqual(actual, expected)
+            self.assertEqual(count, game.count_legal_moves())
+
+    def test_standard_positions(self) -> None:
+        games = []
+        for position in PERFT_POSITIONS:
+            for board_type in (Board, BitBoard):
+                game = Game(board_type=board_type)
+                from_fen(position.fen, game)
+                games.append(game)
+        self.assert_matches(games)
+
+    def test_checks_and_pins(self) -> None:
+        games = []
+        for fen in (
+            "4k3/8/8/b7/8/8/3B4/4K3 w - - 0 1",  # Pinned bishop
+            "4r2k/8/8/8/8/8/R7/4K1N1 w - - 0 1",  # Single check
+            "4r2k/8/8/8/8/5n2/R7/4K3 w - - 0 1",  # Double check
+            "7k/8/8/8/8/8/8/r3K3 w - - 0 1",  # King on the checking ray
+            "4k2r/6B1/8/8/8/8/8/4K3 b k - 0 1",  # Castling path attacked
+        ):
+            game = Game()
+            from_fen(fen, game)
+            games.append(game)
+        self.assert_matches(games)
+
+    def test_random_playouts(self) -> None:
+        rng = random.Random(11)
+        games = []
+        for position in PERFT_POSITIONS[:4]:
+            game = Game(board_type=BitBoard)
+            from_fen(position.fen, game)
+            for _ in range(30):
+                moves = list(game.legal_moves())
+                if not moves:
+                    break
+                game.make_move(rng.choice(moves))
+                snapshot = Game(board_type=BitBoard)
+                snapshot.board.copy_from(game.board)
+                snapshot.active_color = game.active_color
+                games.append(snapshot)
+        self.assert_matches(games)
+
+    def test_single_color_and_empty_batch(self) -> None:
+        game = Game()
+        from_fen(PERFT_POSITIONS[0].fen, game)
+        boards = np.stack([board_array(game.board)] * 3)
+        self.assertEqual(batch_moves(boards, WHITE).counts.tolist(), [20, 20, 20])
+        self.assertEqual(batch_moves(boards, BLACK).counts.tolist(), [20, 20, 20])
+        self.assertEqual(batch_moves(boards[:0], WHITE).targets.shape, (0, 64))
+
+    def test_stack_boards(self) -> None:
+        rng = random.Random(5)
+        for position in PERFT_POSITIONS:
+            games = [Game(board_type=board_type) for board_type in (Board, BitBoard)]
+            for game in games:
+                from_fen(position.fen, game)
+            for _ in range(6):
+                moves = list(games[0].legal_moves())
+                if not moves:
+                    break
+                move = rng.choice(moves)
+                for game in games:
+                    game.make_move(move)
+            assert isinstance(games[0].board, Board)
+            # The numpy backend only clears the occupied flag of the squares it empties
+            matrix = games[0].board.board * (games[0].board.board[..., 3:] == 1)
+            stacked = stack_boards([games[1].board, games[0].board, games[1].board])
+            np.testing.assert_array_equal(
+                stacked * (stacked[..., 3:] == 1), np.stack([matrix] * 3), err_msg=position.fen
+            )
+
+    def test_play_moves(self) -> None:
+        for position in PERFT_POSITIONS:
+            game = Game(board_type=BitBoard)
+            from_fen(position.fen, game)
+            moves = list(game.legal_moves())
+            for move, played in zip(moves, play_moves(board_array(game.board), moves)):
+                game.make_move(move)
+                expected = board_array(game.board)
+                game.unmake_move()
+                np.testing.assert_array_equal(played, expected, err_msg=str(move))
+
+
+if __name__ == "__main__":
+    unittest.main()
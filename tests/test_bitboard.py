@@ -0,0 +1,90 @@
+"""
+Unittests for the bitboard backend, checked against the numpy Board.
+"""
+import unittest
+
+from engine import BitBoard, Board, Game, from_fen, to_fen
+from engine.types import BLACK, KING, PAWN, QUEEN, ROOK, WHITE, Location, Piece
+
+POSITIONS = [
+    "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1",
+    "r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1",
+    "r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R b KQkq - 0 1",
+    "8/2P2k2/8/8/8/8/2p2K2/8 w - - 0 1",
+]
+
+
+class TestBitBoard(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.board = BitBoard()
+
+    def assert_masks_consistent(self) -> None:
+        for sq, piece in enumerate(self.board.squares):
+            bit = 1 << sq
+            self.assertEqual(bool(self.board.occupied & bit), piece is not None)
+            if piece is not None:
+                self.assertTrue(self.board.pieces[piece.color][piece.type] & bit)
+                self.assertTrue(self.board.colors[piece.color] & bit)
+                self.assertFalse(self.board.colors[~piece.color] & bit)
+
+    def test_place_and_remove(self) -> None:
+        self.board.place_piece((1, 2), (BLACK, ROOK))
+        self.assertEqual(self.board.get_piece((1, 2)), Piece(BLACK, ROOK))
+        self.assertEqual(self.board.pieces[BLACK][ROOK], 1 << 10)
+        self.assertRaises(ValueError, self.board.place_piece, (1, 2), (WHITE, PAWN))
+
+        self.board.remove_piece((1, 2))
+        self.assertIsNone(self.board.piece_at((1, 2)))
+        self.assertEqual(self.board.occupied, 0)
+        self.assertRaises(ValueError, self.board.get_piece, (1, 2))
+
+    def test_move_and_promote(self) -> None:
+        self.board.place_piece((1, 2), (WHITE, PAWN))
+        self.board.place_piece((0, 3), (BLACK, ROOK))
+        self.assertFalse(self.board.has_moved((1, 2)))
+
+        self.board.move_piece((1, 2), (0, 3))
+        self.board.promote_piece((0, 3), QUEEN)
+        self.assertEqual(self.board.get_pieces(), {(Piece(WHITE, QUEEN), Location(0, 3))})
+        self.assertTrue(self.board.has_moved((0, 3)))
+        self.assertFalse(self.board.has_moved((1, 2)))
+        self.assert_masks_consistent()
+
+    def test_matches_numpy_board(self) -> None:
+        for fen in POSITIONS:
+            with self.subTest(fen=fen):
+                numpy_game, bit_game = Game(), Game(board_type=BitBoard)
+                from_fen(fen, numpy_game)
+                from_fen(fen, bit_game)
+
+                self.assertEqual(to_fen(numpy_game), to_fen(bit_game))
+                self.assertEqual(str(numpy_game.board), str(bit_game.board))
+                for color in (BLACK, WHITE):
+                    self.assertSetEqual(
+                        numpy_game.board.get_pieces(color), bit_game.board.get_pieces(color)
+                    )
+                self.assertSetEqual(
+                    set(numpy_game.legal_moves()), set(bit_game.legal_moves())
+                )
+
+    def test_seek_move_copies_board(self) -> None:
+        game = Game(board_type=BitBoard)
+        from_fen(POSITIONS[0], game)
+        move = next(game.legal_moves())
+        child = game.seek_move(move)
+
+        self.assertIsInstance(child.board, BitBoard)
+        self.assertNotEqual(to_fen(child), to_fen(game))
+        self.assertEqual(child.board.get_piece(move.end), game.board.get_piece(move.start))
+
+    def test_copy_from_rejects_other_backends(self) -> None:
+        self.assertRaises(TypeError, self.board.copy_from, Board())
+
+    def test_king_lookup(self) -> None:
+        self.board.place_piece((7, 4), (WHITE, KING))
+        self.assertEqual(self.board.pieces[WHITE][KING], 1 << 60)
+
+
+if __name__ == "__main__":
+    unittest.main()
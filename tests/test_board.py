@@ -0,0 +1,77 @@
+"""
+Unittests for the piece lists and masks of the numpy Board.
+"""
+import random
+import unittest
+
+import numpy as np
+
+from engine import Board, Game, from_fen
+from engine.types import BLACK, PAWN, QUEEN, ROOK, WHITE, Location, Piece, PieceType
+
+
+class TestBoard(unittest.TestCase):
+
+    def assert_lists_match(self, board: Board) -> None:
+        scanned = {
+            (board.get_piece((i, j)), Location(i, j))
+            for i, j in np.argwhere(board.board[:, :, 3] == 1).tolist()
+        }
+        self.assertSetEqual(board.get_pieces(), scanned)
+        self.assertEqual(board.occupancy(), sum(1 << (i * 8 + j) for _, (i, j) in scanned))
+        for color in (BLACK, WHITE):
+            pieces = {p for p in scanned if p[0].color is color}
+            self.assertSetEqual(board.get_pieces(color), pieces)
+            self.assertEqual(board.occupancy(color), sum(1 << (i * 8 + j) for _, (i, j) in pieces))
+            for piece_type in PieceType:
+                self.assertEqual(
+                    board.piece_mask(color, piece_type),
+                    sum(1 << (i * 8 + j) for piece, (i, j) in pieces if piece.type is piece_type),
+                )
+
+    def test_place_move_promote_remove(self) -> None:
+        board = Board()
+        board.place_piece((1, 2), (WHITE, PAWN))
+        board.place_piece((0, 3), (BLACK, ROOK))
+        board.move_piece((1, 2), (0, 3))
+        board.promote_piece((0, 3), QUEEN)
+        self.assertEqual(board.get_pieces(), {(Piece(WHITE, QUEEN), Location(0, 3))})
+        self.assertEqual(board.piece_mask(WHITE, QUEEN), 1 << 3)
+        self.assertEqual(board.piece_mask(BLACK, ROOK), 0)
+
+        board.get_pieces(WHITE).clear()  # A copy, not the board's own set
+        self.assert_lists_match(board)
+        board.remove_piece((0, 3))
+        self.assertEqual(board.get_pieces(), set())
+        self.assertEqual(board.occupancy(), 0)
+
+    def test_lists_follow_make_and_unmake(self) -> None:
+        rng = random.Random(5)
+        game = Game()
+        from_fen("r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1", game)
+        assert isinstance(game.board, Board)
+        for _ in range(40):
+            moves = list(game.legal_moves())
+            if not moves:
+                break
+            game.make_move(rng.choice(moves))
+            self.assert_lists_match(game.board)
+        while game.undo_stack:
+            game.unmake_move()
+            self.assert_lists_match(game.board)
+
+        copy = Board()
+        copy.copy_from(game.board)
+        copy.remove_piece((0, 0))
+        self.assert_lists_match(copy)
+        self.assert_lists_match(game.board)
+
+    def test_direct_writes_reindex(self) -> None:
+        board = Board()
+        board[(4, 4)] = np.array([WHITE, ROOK, 0, 1], dtype=np.int8)
+        self.assertEqual(board.get_pieces(WHITE), {(Piece(WHITE, ROOK), Location(4, 4))})
+        self.assert_lists_match(board)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,80 @@
+"""
+Unittests for PGN reading and the Polyglot opening book.
+"""
+import os
+import pickle
+import tempfile
+import unittest
+
+from bots import MinMaxBot
+from bots.min_max import SearchConfig
+from engine import BitBoard, Game, from_fen
+from engine.book import OpeningBook, build_book, encode_book_move, write_book
+from engine.pgn import START_FEN, parse_san, read_games
+from engine.types import CASTLE, KING, QUEEN, WHITE, Location, Move
+
+PGN = """
+[Event "Ruy Lopez"]
+[Result "1-0"]
+
+1. e4 e5 2. Nf3 {The main line} Nc6 3. Bb5 a6 (3... Nf6 4. O-O) 4. Ba4 Nf6 5. O-O $1 1-0
+
+[Event "Sicilian"]
+[Result "1/2-1/2"]
+
+1. e4 c5 2. Nf3 d6 1/2-1/2
+"""
+
+
+class TestOpeningBook(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.game = Game(board_type=BitBoard)
+        from_fen(START_FEN, self.game)
+        handle, self.path = tempfile.mkstemp(suffix=".bin")
+        os.close(handle)
+        write_book(build_book(read_games(PGN)), self.path)
+        self.book = OpeningBook(self.path)
+
+    def tearDown(self) -> None:
+        self.book.close()
+        os.remove(self.path)
+
+    def test_read_games(self) -> None:
+        ruy_lopez, sicilian = read_games(PGN)
+        self.assertEqual(ruy_lopez.tags, {"Event": "Ruy Lopez", "Result": "1-0"})
+        self.assertEqual(ruy_lopez.moves[6:], ["Ba4", "Nf6", "O-O"])  # Without the variation
+        self.assertEqual(sicilian.moves, ["e4", "c5", "Nf3", "d6"])
+
+    def test_parse_san(self) -> None:
+        from_fen("r3k3/1P6/8/8/8/2N3N1/8/4K2R w Kq - 0 1", self.game)
+        self.assertEqual(parse_san(self.game, "Nce4"), Move(Location(5, 2), Location(4, 4)))
+        self.assertEqual(parse_san(self.game, "O-O").type, CASTLE)
+        self.assertEqual(parse_san(self.game, "bxa8=Q+").promotion_rank, QUEEN)
+        for san in ("Ne4", "Qd4", "e9"):  # Ambiguous, no queen, not a square
+            self.assertRaises(ValueError, parse_san, self.game, san)
+
+    def test_polyglot_keys_and_moves(self) -> None:
+        # The Polyglot key of the start position, and castling as the king taking its rook
+        self.assertEqual(self.game.zobrist_key, 0x463B96181691FC9C)
+        castle = Move(Location(7, 4), Location(7, 6), CASTLE, castle_type=KING)
+        self.assertEqual(encode_book_move(castle), 7 | 4 << 6)
+
+    def test_lookup(self) -> None:
+        e4 = Move(Location(6, 4), Location(4, 4))
+        self.assertEqual(self.book.moves(self.game), [(e4, 3)])  # A win and a draw
+        for san in ("e4", "e5", "Nf3", "Nc6", "Bb5", "a6", "Ba4", "Nf6"):
+            self.game.execute_move(parse_san(self.game, san))
+        self.assertEqual(self.book.choose(self.game), parse_san(self.game, "O-O"))
+        self.game.execute_move(parse_san(self.game, "O-O"))
+        self.assertIsNone(self.book.choose(self.game))  # Out of the book, as is the loser's move
+        self.assertEqual(pickle.loads(pickle.dumps(self.book)).size, self.book.size)
+
+    def test_bot_plays_from_book(self) -> None:
+        bot = MinMaxBot(WHITE, max_depth=2, config=SearchConfig(book=self.book))
+        self.assertEqual(bot.select_move(self.game), Move(Location(6, 4), Location(4, 4)))
+        self.assertEqual(bot.nodes, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
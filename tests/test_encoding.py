@@ -0,0 +1,79 @@
+"""
+Unittests for the 16-bit move encoding and packed move generation.
+"""
+import random
+import unittest
+
+from engine import BitBoard, Board, Game, from_fen, to_fen
+from engine.encoding import decode_move, encode_move, pack_moves, unpack_moves
+from engine.types import (
+    KING, KNIGHT, QUEEN, ROOK,
+    CAPTURE, CAPTURE_AND_PROMOTION, CASTLE, PASSING, PROMOTION,
+    Location, Move
+)
+
+POSITIONS = [
+    "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1",
+    "r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1",
+    "r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R b KQkq - 0 1",
+    "n1n5/PPPk4/8/8/8/8/4Kppp/5N1N b - - 0 1",
+    "4k3/8/8/8/4r3/8/4B3/4K3 w - - 0 1",
+]
+
+
+class TestEncoding(unittest.TestCase):
+
+    def test_round_trip(self) -> None:
+        game = Game()
+        from_fen("r3k3/1P6/8/8/8/8/8/R3K2R w KQ - 0 1", game)
+        moves = [
+            Move(Location(7, 4), Location(7, 5)),
+            Move(Location(7, 0), Location(0, 0), CAPTURE, target=ROOK),
+            Move(Location(7, 4), Location(7, 6), CASTLE, castle_type=KING),
+            Move(Location(7, 4), Location(7, 2), CASTLE, castle_type=QUEEN),
+            Move(Location(1, 1), Location(0, 1), PROMOTION, promotion_rank=KNIGHT),
+            Move(Location(1, 1), Location(0, 0), CAPTURE_AND_PROMOTION, target=ROOK,
+                 promotion_rank=QUEEN),
+        ]
+        for move in moves:
+            with self.subTest(move=move):
+                packed = encode_move(move)
+                self.assertLess(packed, 1 << 16)
+                self.assertEqual(decode_move(packed, game.board), move)
+        self.assertEqual(unpack_moves(pack_moves(moves), game.board), moves)
+        self.assertEqual(pack_moves(moves).itemsize, 2)
+
+    def test_quiet_move_layout(self) -> None:
+        self.assertEqual(encode_move(Move(Location(6, 4), Location(4, 4), PASSING)), 52 | 36 << 6)
+
+    def test_packed_matches_legal_moves(self) -> None:
+        for board_type in (BitBoard, Board):
+            for fen in POSITIONS:
+                with self.subTest(board=board_type.__name__, fen=fen):
+                    game = Game(board_type=board_type)
+                    from_fen(fen, game)
+                    packed = game.packed_legal_moves()
+                    self.assertEqual(len(packed), len(set(packed)))
+                    self.assertSetEqual(
+                        set(unpack_moves(packed, game.board)), set(game.legal_moves())
+                    )
+
+    def test_packed_playout(self) -> None:
+        rng = random.Random(3)
+        game = Game(board_type=BitBoard, debug=True)
+        from_fen(POSITIONS[1], game)
+        start_fen, start_key = to_fen(game), game.zobrist_key
+        for _ in range(60):
+            packed = game.packed_legal_moves()
+            self.assertSetEqual(set(unpack_moves(packed, game.board)), set(game.legal_moves()))
+            if not packed:
+                break
+            game.make_packed_move(rng.choice(packed))
+        while game.undo_stack:
+            game.unmake_move()
+        self.assertEqual(to_fen(game), start_fen)
+        self.assertEqual(game.zobrist_key, start_key)
+
+
+if __name__ == "__main__":
+    unittest.main()
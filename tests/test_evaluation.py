@@ -0,0 +1,115 @@
+"""
+Unittests for the static evaluation of the MinMax bot.
+"""
+import random
+import unittest
+from itertools import product
+
+from bots import MinMaxBot
+from bots.min_max import SearchConfig, SearchOptions
+from bots.min_max.bot import FULL_WINDOW, Node
+from engine import BitBoard, Game, from_fen
+from engine.batch import stack_boards
+from engine.evaluation import Evaluation, evaluate, evaluate_boards, evaluation
+from engine.perft import BOARD_TYPES, PERFT_POSITIONS
+from engine.types import BLACK, KING, QUEEN, WHITE, Location, Move, Piece
+
+
+class TestEvaluation(unittest.TestCase):
+
+    def test_start_position_is_even(self) -> None:
+        game = Game()
+        from_fen(PERFT_POSITIONS[0].fen, game)
+        self.assertEqual(evaluate(game.board, WHITE), 0)
+        self.assertEqual(evaluate(game.board, BLACK), 0)
+
+    def test_material_and_squares(self) -> None:
+        game = Game()
+        from_fen("4k3/8/8/8/3N4/8/8/4K3 w - - 0 1", game)
+        # Knight 320 plus 20 on a central square, the kings' squares cancel out
+        self.assertEqual(evaluate(game.board, WHITE), 340)
+        self.assertEqual(evaluate(game.board, BLACK), -340)
+
+    def test_endgame_tables_without_pieces(self) -> None:
+        game = Game()
+        from_fen("8/8/8/3k4/8/8/8/K7 w - - 0 1", game)
+        # Only kings left: the endgame king table alone, centralised king 40, cornered king -50
+        self.assertEqual(game.evaluation, Evaluation(middlegame=60, endgame=-90, phase=0))
+        self.assertEqual(game.evaluation.score(BLACK), 90)
+
+    def test_incremental_matches_recomputation(self) -> None:
+        rng = random.Random(9)
+        for position in PERFT_POSITIONS:
+            game = Game(board_type=BitBoard, debug=True)  # Recomputes after every move
+            from_fen(position.fen, game)
+            initial = game.evaluation
+            for _ in range(60):
+                if not (moves := list(game.legal_moves())):
+                    break
+                game.make_move(rng.choice(moves))
+                self.assertEqual(game.evaluation, evaluation(game.board))
+            while game.undo_stack:
+                game.unmake_move()
+            self.assertEqual(game.evaluation, initial)
+
+    def test_debug_detects_stale_evaluation(self) -> None:
+        game = Game(board_type=BitBoard, debug=True)
+        from_fen(PERFT_POSITIONS[0].fen, game)
+        game.evaluation = game.evaluation._replace(phase=0)
+        self.assertRaises(RuntimeError, game.make_move, next(game.legal_moves()))
+
+    def test_direct_board_changes(self) -> None:
+        for board_type in BOARD_TYPES.values():
+            with self.subTest(board=board_type.__name__):
+                game = Game(board_type=board_type)
+                game.board.place_piece(Location(7, 4), Piece(WHITE, KING))
+                game.board.place_piece(Location(0, 4), Piece(BLACK, KING))
+                game.board.place_piece(Location(4, 3), Piece(WHITE, QUEEN))
+                self.assertEqual(game.evaluation, evaluation(game.board))
+                self.assertGreater(game.evaluation.score(WHITE), 0)  # A queen up
+
+                # Taken back over a piece put on the board after the move
+                game.make_move(Move(Location(7, 4), Location(7, 3)))
+                game.board.remove_piece(Location(4, 3))
+                game.unmake_move()
+                self.assertEqual(game.evaluation, evaluation(game.board))
+
+    def test_batch_matches_single(self) -> None:
+        rng = random.Random(5)
+        games = []
+        for position, board_type in product(PERFT_POSITIONS, BOARD_TYPES.values()):
+            game = Game(board_type=board_type)
+            from_fen(position.fen, game)
+            for _ in range(rng.randrange(20)):
+                if not (moves := list(game.legal_moves())):
+                    break
+                game.execute_move(rng.choice(moves))
+            games.append(game)
+        boards = stack_boards(game.board for game in games)
+        for color in (WHITE, BLACK):
+            self.assertEqual(
+                evaluate_boards(boards, color).tolist(),
+                [evaluate(game.board, color) for game in games]
+            )
+
+    def test_batched_leaves_match_minimax(self) -> None:
+        bot = MinMaxBot(
+            WHITE, max_depth=1,
+            config=SearchConfig(hash_size_mb=0, options=SearchOptions(quiescence=False))
+        )
+        for fen in (PERFT_POSITIONS[1].fen, "6k1/5ppp/8/8/8/8/8/R5K1 w - - 0 1"):
+            game = Game(board_type=BitBoard)
+            from_fen(fen, game)
+            expected = float("-inf")
+            for move in list(game.legal_moves()):
+                game.make_move(move)
+                if game.is_in_checkmate(game.active_color):
+                    expected = float("inf")
+                else:
+                    expected = max(expected, bot.leaf_node_heuristics(game))
+                game.unmake_move()
+            self.assertEqual(bot.evaluate(game, Node(1, FULL_WINDOW, 1)), expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
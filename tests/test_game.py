@@ -0,0 +1,91 @@
+"""
+Unittests for playing and taking back moves on a Game.
+"""
+import random
+import unittest
+
+from engine import BitBoard, Board, Game, from_fen, to_fen
+from engine.board import BaseBoard
+from engine.types import (
+    BLACK, CASTLE, KING, NULL_MOVE, PAWN, QUEEN, ROOK, WHITE, Location, Move, Piece, PROMOTION
+)
+from engine.zobrist import zobrist_key
+
+
+def snapshot(board: BaseBoard) -> set[tuple[Piece, Location, bool]]:
+    return {(piece, loc, board.has_moved(loc)) for piece, loc in board.get_pieces()}
+
+
+class TestMakeUnmake(unittest.TestCase):
+
+    board_types: list[type[BaseBoard]] = [Board, BitBoard]
+
+    def test_castle_round_trip(self) -> None:
+        for board_type in self.board_types:
+            with self.subTest(board_type=board_type.__name__):
+                game = Game(board_type=board_type)
+                from_fen("r3k2r/8/8/8/8/8/8/R3K2R w KQkq - 0 1", game)
+                before = snapshot(game.board)
+
+                game.make_move(Move(Location(7, 4), Location(7, 6), CASTLE, castle_type=KING))
+                self.assertEqual(game.board.get_piece((7, 5)), Piece(WHITE, ROOK))
+                self.assertTrue(game.board.has_moved((7, 5)))
+                self.assertIs(game.active_color, BLACK)
+
+                game.unmake_move()
+                self.assertSetEqual(snapshot(game.board), before)
+                self.assertIs(game.active_color, WHITE)
+                self.assertEqual(len(list(game.castling_moves())), 2)
+
+    def test_promotion_round_trip(self) -> None:
+        for board_type in self.board_types:
+            with self.subTest(board_type=board_type.__name__):
+                game = Game(board_type=board_type)
+                from_fen("4k3/P7/8/8/8/8/8/4K3 w - - 0 1", game)
+                before = snapshot(game.board)
+
+                game.make_move(
+                    Move(Location(1, 0), Location(0, 0), PROMOTION, promotion_rank=QUEEN)
+                )
+                self.assertEqual(game.board.get_piece((0, 0)), Piece(WHITE, QUEEN))
+
+                game.unmake_move()
+                self.assertSetEqual(snapshot(game.board), before)
+                self.assertEqual(game.board.get_piece((1, 0)), Piece(WHITE, PAWN))
+
+    def test_random_games_round_trip(self) -> None:
+        rng = random.Random(7)
+        for board_type in self.board_types:
+            with self.subTest(board_type=board_type.__name__):
+                game = Game(board_type=board_type)
+                from_fen("rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1", game)
+                history = []
+                for _ in range(80):
+                    moves = list(game.legal_moves())
+                    if not moves:
+                        break
+                    history.append((to_fen(game), snapshot(game.board)))
+                    game.make_move(rng.choice(moves))
+
+                while history:
+                    game.unmake_move()
+                    fen, pieces = history.pop()
+                    self.assertEqual(to_fen(game), fen)
+                    self.assertSetEqual(snapshot(game.board), pieces)
+                self.assertListEqual(game.undo_stack, [])
+
+    def test_null_move_round_trip(self) -> None:
+        for board_type in self.board_types:
+            game = Game(board_type=board_type, debug=True)
+            from_fen("r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1", game)
+            fen, key = to_fen(game), game.zobrist_key
+            game.make_null_move()
+            self.assertEqual(game.active_color, BLACK)
+            self.assertEqual(to_fen(game).split()[:3], [fen.split()[0], "b", fen.split()[2]])
+            self.assertEqual(game.zobrist_key, zobrist_key(game.board, BLACK))
+            self.assertIs(game.unmake_move(), NULL_MOVE)
+            self.assertEqual((to_fen(game), game.zobrist_key), (fen, key))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,214 @@
+"""
+Unittests for check and pin aware legal move generation.
+"""
+import unittest
+
+import numpy as np
+
+from engine import BitBoard, Board, Game, from_fen
+from engine.board import BaseBoard
+from engine.types import BLACK, KING, KNIGHT, QUEEN, ROOK, WHITE, Location, Move, MoveType, Piece
+
+
+class TestLegalMoves(unittest.TestCase):
+
+    board_types: list[type[BaseBoard]] = [Board, BitBoard]
+
+    def moves(self, fen: str) -> dict[Location, set[Location]]:
+        """
+        Destinations of every piece that can move, for each board backend.
+        """
+        results = []
+        for board_type in self.board_types:
+            game = Game(board_type=board_type)
+            from_fen(fen, game)
+            destinations: dict[Location, set[Location]] = {}
+            for move in game.legal_moves():
+                destinations.setdefault(move.start, set()).add(move.end)
+            results.append(destinations)
+        self.assertEqual(results[0], results[1])
+        return results[0]
+
+    def test_pinned_piece_moves_along_ray(self) -> None:
+        # White bishop on d2 is pinned by the black bishop on a5
+        moves = self.moves("4k3/8/8/b7/8/8/3B4/4K3 w - - 0 1")
+        self.assertSetEqual(moves[Location(6, 3)], {(5, 2), (4, 1), (3, 0)})
+
+    def test_pinned_knight_cannot_move(self) -> None:
+        moves = self.moves("4k3/4r3/8/8/8/8/4N3/4K3 w - - 0 1")
+        self.assertNotIn(Location(6, 4), moves)
+
+    def test_check_evasions(self) -> None:
+        # Rook on e8 checks the king on e1: block on the e-file, capture, or step aside
+        moves = self.moves("4r2k/8/8/8/8/8/R7/4K1N1 w - - 0 1")
+        self.assertSetEqual(moves[Location(6, 0)], {(6, 4)})
+        self.assertSetEqual(moves[Location(7, 6)], {(6, 4)})
+        self.assertSetEqual(moves[Location(7, 4)], {(6, 3), (6, 5), (7, 3), (7, 5)})
+
+    def test_double_check_only_king_moves(self) -> None:
+        moves = self.moves("4r2k/8/8/8/8/5n2/R7/4K3 w - - 0 1")
+        self.assertSetEqual(set(moves), {Location(7, 4)})
+
+    def test_king_cannot_retreat_along_check_ray(self) -> None:
+        moves = self.moves("7k/8/8/8/8/8/8/r3K3 w - - 0 1")
+        self.assertNotIn(Location(7, 5), moves[Location(7, 4)])
+
+    def test_no_castling_into_check(self) -> None:
+        for board_type in self.board_types:
+            game = Game(board_type=board_type)
+            from_fen("4k2r/6B1/8/8/8/8/8/4K3 b k - 0 1", game)
+            self.assertFalse(any(
+                move.type is MoveType.CASTLE for move in game.legal_moves()
+            ))
+
+    def test_count_legal_moves(self) -> None:
+        for board_type in self.board_types:
+            for fen in (
+                "r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1",
+                "n1n5/PPPk4/8/8/8/8/4Kppp/5N1N b - - 0 1",
+                "4r2k/8/8/8/8/5n2/R7/4K3 w - - 0 1",
+                "4k3/8/8/8/8/8/8/4K2K w - - 0 1",  # Two kings, counted the slow way
+            ):
+                with self.subTest(board=board_type.__name__, fen=fen):
+                    game = Game(board_type=board_type)
+                    from_fen(fen, game)
+                    moves = list(game.legal_moves())
+                    self.assertEqual(game.count_legal_moves(), len(moves))
+                    self.assertEqual(
+                        game.legal_move_counts(),
+                        {
+                            (game.board.get_piece(start), start): sum(
+                                move.start == start for move in moves
+                            )
+                            for start in {move.start for move in moves}
+                        }
+                    )
+
+    def test_move_stages(self) -> None:
+        for board_type in self.board_types:
+            for fen in (
+                "r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1",
+                "n1n5/PPPk4/8/8/8/8/4Kppp/5N1N b - - 0 1",
+                "4k3/8/8/8/8/8/8/4K2K w - - 0 1",
+            ):
+                with self.subTest(board=board_type.__name__, fen=fen):
+                    game = Game(board_type=board_type)
+                    from_fen(fen, game)
+                    staged = list(game.move_stages())  # Generated in stages
+                    moves = list(game.legal_moves())
+                    # Split from the moves cached for the position
+                    for hash_move, captures, quiets in (staged, game.move_stages()):
+                        self.assertEqual(hash_move, [])
+                        self.assertCountEqual(captures + quiets, moves)
+                        self.assertTrue(all(
+                            move.type not in (MoveType.PASSING, MoveType.CASTLE)
+                            for move in captures
+                        ))
+                        self.assertTrue(all(
+                            move.type in (MoveType.PASSING, MoveType.CASTLE) for move in quiets
+                        ))
+
+                    # The hash move comes first and only once
+                    for cached in (True, False):
+                        if not cached:
+                            game.statuses.clear()
+                        hash_move, captures, quiets = game.move_stages(moves[-1])
+                        self.assertEqual(hash_move, [moves[-1]])
+                        self.assertCountEqual(hash_move + captures + quiets, moves)
+
+    def test_captures_only(self) -> None:
+        for board_type in self.board_types:
+            for fen in (
+                "r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1",
+                "n1n5/PPPk4/8/8/8/8/4Kppp/5N1N b - - 0 1",
+                "4r2k/8/8/8/8/5n2/R7/4K3 w - - 0 1",
+                "4k3/8/8/8/8/8/8/4K2K w - - 0 1",
+            ):
+                with self.subTest(board=board_type.__name__, fen=fen):
+                    game = Game(board_type=board_type)
+                    from_fen(fen, game)
+                    self.assertCountEqual(
+                        game.legal_moves(captures_only=True),
+                        [
+                            move for move in game.legal_moves()
+                            if move.target is not None or move.promotion_rank is not None
+                        ]
+                    )
+
+    def test_illegal_hash_move_is_skipped(self) -> None:
+        for board_type in self.board_types:
+            game = Game(board_type=board_type)
+            from_fen("4k3/4r3/8/8/8/8/4N3/4K3 w - - 0 1", game)
+            # The pinned knight may not move, nor can a piece that isn't there
+            pinned = Move(Location(6, 4), Location(4, 3))
+            missing = Move(Location(5, 0), Location(4, 0))
+            for move in (pinned, missing):
+                self.assertEqual(next(game.move_stages(move)), [])
+
+    def test_status_cache(self) -> None:
+        for board_type in self.board_types:
+            game = Game(board_type=board_type)
+            from_fen("4k3/8/8/8/8/8/8/R3K3 w - - 0 1", game)
+            moves = list(game.legal_moves())
+            self.assertFalse(game.is_in_check(game.active_color))
+            status = game.statuses.entries[game.zobrist_key]
+            self.assertEqual((list(status.moves or ()), status.in_check), (moves, False))
+
+            # Still cached after a move is taken back
+            game.make_move(moves[0])
+            game.unmake_move()
+            self.assertIs(game.statuses.entries[game.zobrist_key].moves, status.moves)
+            self.assertEqual(list(game.legal_moves()), moves)
+
+            # A piece put on the board directly leaves the Zobrist key as it is
+            game.board.place_piece(Location(6, 4), Piece(WHITE, ROOK))
+            expected = Game(board_type=board_type)
+            from_fen("4k3/8/8/8/8/8/4R3/R3K3 w - - 0 1", expected)
+            self.assertCountEqual(game.legal_moves(), expected.legal_moves())
+
+    def test_status_cache_board_changes(self) -> None:
+        white_king, black_king = Location(7, 4), Location(0, 4)
+        square = Location(4, 4)
+        for board_type in self.board_types:
+            with self.subTest(board=board_type.__name__):
+                game = Game(board_type=board_type)
+                game.board.place_piece(white_king, Piece(WHITE, KING))
+                game.board.place_piece(black_king, Piece(BLACK, KING))
+                game.board.place_piece(square, Piece(WHITE, ROOK))
+                self.assertEqual(len(list(game.legal_moves())), 18)
+
+                # The same squares taken, by another piece
+                game.reset()
+                game.board.place_piece(white_king, Piece(WHITE, KING))
+                game.board.place_piece(black_king, Piece(BLACK, KING))
+                game.board.place_piece(square, Piece(WHITE, QUEEN))
+                self.assertEqual(len(list(game.legal_moves())), 31)
+
+                game.board.remove_piece(square)
+                game.board.place_piece(square, Piece(WHITE, KNIGHT))
+                self.assertEqual(len(list(game.legal_moves())), 13)
+
+                # Pawns that have moved may not push two squares
+                from_fen("4k3/8/8/8/8/8/4P3/4K3 w - - 0 1", game)
+                self.assertEqual(len(list(game.legal_moves())), 6)
+                from_fen("4k3/8/8/8/8/8/4P3/4K3 w - - 0 1", game)
+                game.board.set_moved(Location(6, 4), True)
+                self.assertEqual(len(list(game.legal_moves())), 5)
+
+        # A rook written into the matrix of the numpy backend
+        game = Game(board_type=Board)
+        from_fen("4k3/8/8/8/8/8/8/4K3 w - - 0 1", game)
+        self.assertEqual(len(list(game.legal_moves())), 5)
+        assert isinstance(game.board, Board)
+        game.board[(4, 4)] = np.array([WHITE, ROOK, 0, 1], dtype=np.int8)
+        self.assertEqual(len(list(game.legal_moves())), 18)
+
+    def test_checkmate(self) -> None:
+        for board_type in self.board_types:
+            game = Game(board_type=board_type)
+            from_fen("R5k1/5ppp/8/8/8/8/8/4K3 b - - 0 1", game)
+            self.assertTrue(game.is_in_checkmate(game.active_color))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,58 @@
+"""
+Unittests for the magic bitboard sliding attack lookup.
+"""
+import random
+import unittest
+
+from engine.bitboard import square_index
+from engine.magic import (
+    BISHOP_MAGICS, ROOK_MAGICS, _ray_attacks,
+    bishop_attacks, queen_attacks, rook_attacks
+)
+from engine.types import DIAGONAL_DIRECTIONS, PARALLEL_DIRECTIONS
+
+
+def mask(*locations: tuple[int, int]) -> int:
+    return sum(1 << square_index(location) for location in locations)
+
+
+class TestMagic(unittest.TestCase):
+
+    def test_rook_blocked(self) -> None:
+        occupancy = mask((1, 1), (1, 3), (4, 1))
+        expected = mask((0, 1), (1, 0), (1, 2), (1, 3), (2, 1), (3, 1), (4, 1))
+        self.assertEqual(rook_attacks(square_index((1, 1)), occupancy), expected)
+
+    def test_bishop_empty_board(self) -> None:
+        expected = mask((0, 0), (2, 2), (3, 3), (4, 4), (5, 5), (6, 6), (7, 7), (0, 2), (2, 0))
+        self.assertEqual(bishop_attacks(square_index((1, 1)), 0), expected)
+
+    def test_queen_is_rook_and_bishop(self) -> None:
+        occupancy = mask((3, 5), (6, 4), (2, 2))
+        square = square_index((4, 4))
+        self.assertEqual(
+            queen_attacks(square, occupancy),
+            rook_attacks(square, occupancy) | bishop_attacks(square, occupancy)
+        )
+
+    def test_matches_ray_walk(self) -> None:
+        rng = random.Random(0)
+        for _ in range(2000):
+            square = rng.randrange(64)
+            occupancy = rng.getrandbits(64) & rng.getrandbits(64)
+            self.assertEqual(
+                rook_attacks(square, occupancy),
+                _ray_attacks(square, occupancy, PARALLEL_DIRECTIONS)
+            )
+            self.assertEqual(
+                bishop_attacks(square, occupancy),
+                _ray_attacks(square, occupancy, DIAGONAL_DIRECTIONS)
+            )
+
+    def test_magic_count(self) -> None:
+        self.assertEqual(len(ROOK_MAGICS), 64)
+        self.assertEqual(len(BISHOP_MAGICS), 64)
+
+
+if __name__ == "__main__":
+    unittest.main()
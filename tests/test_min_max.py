@@ -0,0 +1,227 @@
+"""
+Unittests for the search of the MinMax bot.
+"""
+import json
+import time
+import unittest
+from typing import Optional
+
+from bots import MinMaxBot
+from bots.min_max import SearchConfig, SearchOptions, SearchStats, TimeControl
+from bots.min_max.bot import FULL_WINDOW, Node
+from bots.min_max.ordering import MoveOrdering
+from engine import BitBoard, Game, from_fen
+from engine.perft import PERFT_POSITIONS
+from engine.types import BLACK, CAPTURE, PAWN, QUEEN, WHITE, Location, Move
+
+
+ALPHA_BETA = SearchOptions(*[False] * len(SearchOptions._fields))
+
+
+class Unordered(MoveOrdering):
+
+    def order(
+        self, game: Game, moves: list[Move], ply: int, hash_move: Optional[Move] = None
+    ) -> list[Move]:
+        return moves
+
+
+class TestMinMaxBot(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.game = Game(board_type=BitBoard)
+        from_fen(PERFT_POSITIONS[1].fen, self.game)  # Kiwipete
+
+    def test_time_budget(self) -> None:
+        self.assertIsNone(TimeControl().budget(clock=10, move_count=5))
+        self.assertEqual(TimeControl(move_time=2).budget(clock=10, move_count=5), 2)
+        # 60 s for the game and 1 s per move: 65 - 35 = 30 s left, a thirtieth of it plus 1 s
+        self.assertEqual(TimeControl(game_time=60, increment=1).budget(35, 5), 2)
+        self.assertEqual(TimeControl(game_time=60).budget(clock=61, move_count=5), 0)
+
+    def test_iterations_reach_max_depth(self) -> None:
+        bot = MinMaxBot(WHITE, max_depth=1)
+        move = bot.select_move(self.game)
+        self.assertEqual(bot.completed_depth, 1)
+        self.assertIn(move, list(self.game.legal_moves()))
+
+    def test_stops_in_time(self) -> None:
+        bot = MinMaxBot(
+            WHITE, max_depth=8, config=SearchConfig(time_control=TimeControl(move_time=0.5))
+        )
+        key, evaluation = self.game.zobrist_key, self.game.evaluation
+        start = time.perf_counter()
+        move = bot.select_move(self.game)
+        self.assertLess(time.perf_counter() - start, 1.5)
+        self.assertLess(bot.completed_depth, 8)
+        self.assertGreaterEqual(bot.completed_depth, 0)
+        self.assertIn(move, list(self.game.legal_moves()))
+        # An aborted search leaves the game as it found it
+        self.assertEqual(self.game.undo_stack, [])
+        self.assertEqual((self.game.zobrist_key, self.game.evaluation), (key, evaluation))
+
+    def test_first_iteration_always_completes(self) -> None:
+        bot = MinMaxBot(
+            WHITE, max_depth=3, config=SearchConfig(time_control=TimeControl(move_time=0))
+        )
+        bot.select_move(self.game)
+        self.assertEqual(bot.completed_depth, 0)
+
+    def test_ordering_keeps_scores(self) -> None:
+        bot = MinMaxBot(WHITE, max_depth=2, config=SearchConfig(options=ALPHA_BETA))
+        unordered = MinMaxBot(WHITE, max_depth=2, config=SearchConfig(options=ALPHA_BETA))
+        unordered.ordering = Unordered()
+        moves = list(self.game.legal_moves())
+        self.assertEqual(
+            bot.search_root(self.game, moves, 2), unordered.search_root(self.game, moves, 2)
+        )
+        self.assertLess(bot.nodes, unordered.nodes)
+
+    def test_quiescence_sees_past_the_horizon(self) -> None:
+        game = Game(board_type=BitBoard)
+        # The e5 pawn is defended by the d6 pawn
+        from_fen("4k3/8/3p4/4p3/8/8/7Q/4K3 w - - 0 1", game)
+        capture = Move(Location(6, 7), Location(3, 4), CAPTURE, target=PAWN)
+        horizon = MinMaxBot(
+            WHITE, max_depth=0, config=SearchConfig(options=SearchOptions(quiescence=False))
+        )
+        self.assertEqual(horizon.select_move(game), capture)
+        bot = MinMaxBot(WHITE, max_depth=0)
+        game.make_move(capture)
+        self.assertLess(bot.evaluate(game, Node(0, FULL_WINDOW, 1)), 0)
+        game.unmake_move()
+        self.assertNotEqual(bot.select_move(game), capture)
+
+    def test_windows_keep_best_score(self) -> None:
+        plain = MinMaxBot(
+            WHITE, max_depth=1, config=SearchConfig(options=ALPHA_BETA._replace(quiescence=True))
+        )
+        windowed = MinMaxBot(
+            WHITE, max_depth=1,
+            config=SearchConfig(options=SearchOptions(null_move=False, late_move_reductions=False))
+        )
+        self.assertEqual(
+            max(score for _, score in plain.iterative_deepening(self.game)),
+            max(score for _, score in windowed.iterative_deepening(self.game))
+        )
+        self.assertLess(windowed.nodes, plain.nodes)
+
+    def test_reductions_search_fewer_nodes(self) -> None:
+        from_fen(
+            "r4rk1/1pp1qppp/p1np1n2/2b1p1B1/2B1P1b1/P1NP1N2/1PP1QPPP/R4RK1 w - - 0 10", self.game
+        )
+        options = SearchOptions(null_move=False, late_move_reductions=False)
+        unreduced = MinMaxBot(WHITE, max_depth=3, config=SearchConfig(options=options))
+        unreduced.select_move(self.game)
+        for reduction in ("null_move", "late_move_reductions"):
+            reduced = options._replace(**{reduction: True})
+            bot = MinMaxBot(WHITE, max_depth=3, config=SearchConfig(options=reduced))
+            bot.select_move(self.game)
+            self.assertLess(bot.nodes, unreduced.nodes)
+
+    def test_zugzwang_prone(self) -> None:
+        from_fen("4k3/4p3/8/8/8/8/4P3/4K2N w - - 0 1", self.game)
+        self.assertFalse(MinMaxBot.zugzwang_prone(self.game))
+        self.game.make_move(Move(Location(6, 4), Location(4, 4)))
+        self.assertTrue(MinMaxBot.zugzwang_prone(self.game))
+
+
+class TestSearchStats(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.game = Game(board_type=BitBoard)
+        from_fen(PERFT_POSITIONS[1].fen, self.game)
+
+    def test_search_fills_stats(self) -> None:
+        depths: list[int] = []
+        stats = SearchStats(on_iteration=lambda stats: depths.append(stats.iterations[-1].depth))
+        bot = MinMaxBot(WHITE, max_depth=2, config=SearchConfig(stats=stats))
+        move = bot.select_move(self.game)
+        self.assertEqual(depths, [0, 1, 2])
+        self.assertEqual(stats.nodes, bot.nodes)
+        self.assertEqual(stats.iterations[-1].move, move)
+        self.assertEqual(sum(iteration.nodes for iteration in stats.iterations), stats.nodes)
+        self.assertGreater(stats.leaves, 0)
+        self.assertGreater(stats.hash_hits, 0)
+        self.assertGreater(stats.hash_probes, stats.hash_hits)
+        self.assertGreater(stats.max_ply, 2)  # Quiescence searches past the depth
+        self.assertGreater(sum(stats.cutoffs), 0)
+        self.assertIsNotNone(stats.branching_factor)
+
+        report = json.loads(json.dumps(stats.as_dict()))
+        self.assertEqual(report["nodes"], stats.nodes)
+        self.assertEqual([iteration["depth"] for iteration in report["iterations"]], [0, 1, 2])
+        self.assertIn("nodes/s", str(stats))
+
+        # Every move's search starts from zero
+        self.game.execute_move(move)
+        self.game.execute_move(next(self.game.legal_moves()))
+        bot.select_move(self.game)
+        self.assertEqual(stats.nodes, bot.nodes - report["nodes"])
+        self.assertEqual(len(stats.iterations), 3)
+
+    def test_report_after_mate(self) -> None:
+        from_fen("6k1/5ppp/8/8/8/8/8/R3K3 w - - 0 1", self.game)
+        stats = SearchStats()
+        MinMaxBot(WHITE, max_depth=2, config=SearchConfig(stats=stats)).select_move(self.game)
+        self.assertEqual(stats.iterations[-1].score, float("inf"))
+
+        # Read after the search, the time is that of the search
+        seconds = stats.seconds
+        time.sleep(0.01)
+        self.assertEqual(stats.seconds, seconds)
+        self.assertEqual(stats.nodes_per_second, stats.nodes / seconds)
+
+        report = json.loads(json.dumps(stats.as_dict(), allow_nan=False))
+        self.assertEqual(report["seconds"], seconds)
+        self.assertEqual(report["iterations"][-1]["score"], "inf")
+        self.assertEqual(float(report["iterations"][-1]["score"]), stats.iterations[-1].score)
+
+    def test_cutoff_histogram(self) -> None:
+        stats = SearchStats()
+        for index in (0, 0, 3):
+            stats.cutoff(index)
+        self.assertEqual(stats.cutoffs, [2, 0, 0, 1])
+        self.assertAlmostEqual(stats.first_move_cutoff_rate or 0, 2 / 3)
+
+
+class TestMoveOrdering(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.game = Game(board_type=BitBoard)
+        # The d4 pawn can take the queen or the pawn
+        from_fen("4k3/8/8/2q1p3/3P4/8/8/3QK3 w - - 0 1", self.game)
+        self.ordering = MoveOrdering()
+
+    def test_captures_by_victim_then_attacker(self) -> None:
+        order = self.ordering.order(self.game, list(self.game.legal_moves()), ply=1)
+        self.assertEqual(order[:2], [
+            Move(Location(4, 3), Location(3, 2), CAPTURE, target=QUEEN),
+            Move(Location(4, 3), Location(3, 4), CAPTURE, target=PAWN),
+        ])
+
+    def test_hash_move_killers_and_history(self) -> None:
+        quiet = [move for move in self.game.legal_moves() if move.target is None]
+        self.ordering.record_cutoff(self.game, quiet[0], ply=1, depth=3)
+        self.ordering.record_cutoff(self.game, quiet[1], ply=1, depth=3)
+        self.ordering.record_cutoff(self.game, quiet[2], ply=1, depth=3)
+        self.ordering.record_cutoff(self.game, quiet[3], ply=2, depth=5)
+        self.assertEqual(self.ordering.killers[1], [quiet[2], quiet[1]])
+
+        order = self.ordering.order(self.game, quiet, ply=1, hash_move=quiet[4])
+        self.assertEqual(order[:4], [quiet[4], quiet[2], quiet[1], quiet[3]])
+
+        self.ordering.new_search()
+        self.assertEqual(self.ordering.killers, [])
+        self.assertEqual(self.ordering.score(self.game, quiet[3], ply=1), 12)
+
+    def test_captures_are_not_killers(self) -> None:
+        capture = Move(Location(4, 3), Location(3, 2), CAPTURE, target=QUEEN)
+        self.ordering.record_cutoff(self.game, capture, ply=1, depth=3)
+        self.assertEqual(self.ordering.killers, [])
+        self.assertEqual(sum(self.ordering.history[WHITE]), 0)
+        self.assertEqual(sum(self.ordering.history[BLACK]), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,92 @@
+"""
+Unittests for splitting tree walks and searches across processes.
+"""
+import multiprocessing
+import random
+import time
+import unittest
+
+from bots import MinMaxBot
+from bots.min_max import SearchConfig, SearchStats, TimeControl
+from bots.min_max.transposition import Bound, SharedTranspositionTable
+from engine import BitBoard, Game, from_fen, to_fen
+from engine.parallel import split
+from engine.perft import PERFT_POSITIONS, divide, parallel_divide
+from engine.types import WHITE
+
+
+class TestParallel(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.game = Game(board_type=BitBoard)
+        from_fen(PERFT_POSITIONS[1].fen, self.game)  # Kiwipete
+
+    def test_fen_round_trip(self) -> None:
+        for move in list(self.game.legal_moves()):
+            self.game.make_move(move)
+            copy = Game(board_type=BitBoard)
+            from_fen(to_fen(self.game), copy)
+            self.assertEqual(copy.zobrist_key, self.game.zobrist_key)
+            self.assertSetEqual(set(copy.legal_moves()), set(self.game.legal_moves()))
+            self.game.unmake_move()
+
+    def test_split(self) -> None:
+        subtrees = split(self.game, 3, split_depth=2)
+        self.assertEqual(len(subtrees), 2038)
+        self.assertEqual({subtree.depth for subtree in subtrees}, {1})
+        self.assertSetEqual({subtree.root for subtree in subtrees}, set(self.game.legal_moves()))
+
+    def test_parallel_divide_matches(self) -> None:
+        expected = divide(self.game, 2)
+        for split_depth, subtree_count in ((1, 48), (2, 2038)):
+            with self.subTest(split_depth=split_depth):
+                counts, workers = parallel_divide(self.game, 2, 2, split_depth)
+                self.assertEqual(counts, expected)
+                self.assertEqual(sum(worker.tasks for worker in workers), subtree_count)
+
+    def test_lazy_smp_matches_serial(self) -> None:
+        random.seed(0)
+        from_fen("4k3/8/8/3q4/8/8/3R4/4K3 w - - 0 1", self.game)
+        serial = MinMaxBot(WHITE, max_depth=2)
+        parallel_bot = MinMaxBot(WHITE, max_depth=2, config=SearchConfig(workers=3))
+        self.assertEqual(parallel_bot.select_move(self.game), serial.select_move(self.game))
+        self.assertEqual(parallel_bot.completed_depth, 2)
+        self.assertGreater(parallel_bot.nodes, serial.nodes)  # The helpers' nodes included
+
+    def test_lazy_smp_stops_in_time(self) -> None:
+        bot = MinMaxBot(WHITE, max_depth=8, config=SearchConfig(
+            workers=2, time_control=TimeControl(move_time=0.5)
+        ))
+        start = time.perf_counter()
+        move = bot.select_move(self.game)
+        self.assertLess(time.perf_counter() - start, 2)
+        self.assertIn(move, list(self.game.legal_moves()))
+
+    def test_lazy_smp_spawn(self) -> None:
+        # Processes that start afresh receive no more than the helper task, so the bot
+        # itself, with stats reporting to a lambda, need not pickle
+        start_method = multiprocessing.get_start_method()
+        multiprocessing.set_start_method("spawn", force=True)
+        try:
+            iterations: list[int] = []
+            bot = MinMaxBot(WHITE, max_depth=2, config=SearchConfig(
+                workers=2,
+                stats=SearchStats(lambda stats: iterations.append(len(stats.iterations)))
+            ))
+            self.assertIn(bot.select_move(self.game), list(self.game.legal_moves()))
+            self.assertEqual(bot.completed_depth, 2)
+            self.assertEqual(iterations, [1, 2, 3])
+        finally:
+            multiprocessing.set_start_method(start_method, force=True)
+
+    def test_shared_table(self) -> None:
+        table = SharedTranspositionTable(size_mb=0.01)
+        attached = SharedTranspositionTable(size_mb=0.01, name=table.name)
+        table.store(12345, depth=3, score=1.5, bound=Bound.LOWER)
+        self.assertEqual(attached.probe(12345), (3, 1.5, Bound.LOWER, None))
+        # A slot with fields of two different stores is rejected
+        attached.scores[12345 % attached.size] = 2.5
+        self.assertIsNone(table.probe(12345))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,57 @@
+"""
+Unittests for perft, at depths shallow enough for the test suite.
+"""
+import json
+import os
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from io import StringIO
+
+from engine import BitBoard, Board, Game, from_fen
+from engine.encoding import uci
+from engine.perft import PERFT_POSITIONS, divide, main, perft, run_position
+from engine.types import CASTLE, KING, KNIGHT, PROMOTION, Location, Move
+
+
+class TestPerft(unittest.TestCase):
+
+    def test_positions(self) -> None:
+        for board_type, depth in ((BitBoard, 3), (Board, 2)):
+            for position in PERFT_POSITIONS:
+                with self.subTest(board=board_type.__name__, position=position.name):
+                    result = run_position(position, depth, board_type)
+                    self.assertTrue(result.passed, (result.nodes, result.expected))
+
+    def test_divide_sums_to_perft(self) -> None:
+        game = Game(board_type=BitBoard)
+        from_fen(PERFT_POSITIONS[1].fen, game)
+        counts = divide(game, 2)
+        self.assertEqual(len(counts), 48)
+        self.assertEqual(counts["e1g1"], 43)
+        self.assertEqual(sum(counts.values()), perft(game, 2))
+
+    def test_uci(self) -> None:
+        self.assertEqual(uci(Move(Location(6, 4), Location(4, 4))), "e2e4")
+        self.assertEqual(
+            uci(Move(Location(7, 4), Location(7, 6), CASTLE, castle_type=KING)), "e1g1"
+        )
+        self.assertEqual(
+            uci(Move(Location(1, 0), Location(0, 0), PROMOTION, promotion_rank=KNIGHT)), "a7a8n"
+        )
+
+    def test_json_report(self) -> None:
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "perft.json")
+            with redirect_stdout(StringIO()):
+                status = main(["--depth", "2", "--position", "start", "--json", path])
+            with open(path, encoding="utf-8") as report_file:
+                report = json.load(report_file)
+        self.assertEqual(status, 0)
+        self.assertEqual(report["nodes"], 400)
+        self.assertEqual(report["positions"][0]["divide"]["e2e4"], 20)
+        self.assertTrue(report["positions"][0]["passed"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,57 @@
+"""
+Unittests for the precomputed move and attack tables.
+"""
+import unittest
+
+from engine.bitboard import square_index
+from engine.tables import (
+    KING_ATTACKS, KING_DESTINATIONS, KNIGHT_ATTACKS, KNIGHT_DESTINATIONS,
+    PAWN_ATTACKS, PAWN_ATTACK_DESTINATIONS, PAWN_PUSH_DESTINATIONS
+)
+from engine.types import BLACK, WHITE, Location
+
+
+class TestTables(unittest.TestCase):
+
+    def test_knight_destinations(self) -> None:
+        self.assertSetEqual(
+            set(KNIGHT_DESTINATIONS[square_index((0, 0))]), {(1, 2), (2, 1)}
+        )
+        self.assertEqual(len(KNIGHT_DESTINATIONS[square_index((4, 4))]), 8)
+        self.assertEqual(len(KNIGHT_DESTINATIONS[square_index((1, 1))]), 4)
+
+    def test_king_destinations(self) -> None:
+        self.assertSetEqual(
+            set(KING_DESTINATIONS[square_index((7, 7))]), {(6, 6), (6, 7), (7, 6)}
+        )
+        self.assertEqual(len(KING_DESTINATIONS[square_index((3, 3))]), 8)
+
+    def test_pawn_destinations(self) -> None:
+        self.assertSetEqual(
+            set(PAWN_ATTACK_DESTINATIONS[WHITE][square_index((6, 0))]), {(5, 1)}
+        )
+        self.assertSetEqual(
+            set(PAWN_ATTACK_DESTINATIONS[BLACK][square_index((1, 4))]), {(2, 3), (2, 5)}
+        )
+        self.assertTupleEqual(
+            PAWN_PUSH_DESTINATIONS[WHITE][square_index((6, 4))], ((5, 4), (4, 4))
+        )
+        self.assertTupleEqual(PAWN_PUSH_DESTINATIONS[BLACK][square_index((6, 4))], ((7, 4),))
+        self.assertTupleEqual(PAWN_PUSH_DESTINATIONS[WHITE][square_index((0, 4))], ())
+
+    def test_attack_masks_match_destinations(self) -> None:
+        tables = [
+            (KNIGHT_ATTACKS, KNIGHT_DESTINATIONS),
+            (KING_ATTACKS, KING_DESTINATIONS),
+            (PAWN_ATTACKS[WHITE], PAWN_ATTACK_DESTINATIONS[WHITE]),
+            (PAWN_ATTACKS[BLACK], PAWN_ATTACK_DESTINATIONS[BLACK]),
+        ]
+        for masks, destinations in tables:
+            for mask, squares in zip(masks, destinations):
+                self.assertEqual(
+                    mask, sum(1 << square_index(Location(*loc)) for loc in squares)
+                )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,99 @@
+"""
+Unittests for the Min-Max Bot's transposition table.
+"""
+import unittest
+from unittest.mock import MagicMock, patch
+
+from bots import MinMaxBot
+from bots.min_max import SearchConfig
+from bots.min_max.bot import FULL_WINDOW, Node
+from bots.min_max.transposition import ENTRY_SIZE, Bound, TranspositionTable
+from engine import BitBoard, Game, from_fen
+from engine.encoding import decode_move
+from engine.types import QUEEN, WHITE, Location, Move, PROMOTION
+
+
+class TestTranspositionTable(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.table = TranspositionTable(size_mb=0.01)
+
+    def test_memory_budget(self) -> None:
+        self.assertEqual(self.table.size, 512)  # 10485 bytes / 18 rounded down to a power of 2
+        self.assertLessEqual(self.table.size * ENTRY_SIZE, 0.01 * 2**20)
+
+    def test_store_and_probe(self) -> None:
+        move = Move(Location(1, 0), Location(0, 0), PROMOTION, promotion_rank=QUEEN)
+        self.table.store(12345, depth=3, score=1.5, bound=Bound.LOWER, move=move)
+
+        entry = self.table.probe(12345)
+        assert entry is not None
+        self.assertEqual(entry.depth, 3)
+        self.assertEqual(entry.score, 1.5)
+        self.assertIs(entry.bound, Bound.LOWER)
+        assert entry.move is not None
+        self.assertEqual(decode_move(entry.move, Game().board), move)
+        self.assertIsNone(self.table.probe(12345 + self.table.size))
+        self.assertEqual(self.table.filled(), 1)
+
+    def test_probe_reads_score_once(self) -> None:
+        self.table.store(12345, depth=3, score=1.5, bound=Bound.LOWER)
+        index = 12345 % self.table.size
+        score_bits = self.table.score_bits
+
+        def read_then_overwrite(slot: int) -> int:
+            # Another process writes a score right after the key check has read the slot
+            bits: int = score_bits[slot]
+            self.table.scores[index] = 2.5
+            return bits
+
+        racing = MagicMock()
+        racing.__getitem__.side_effect = read_then_overwrite
+        with patch.object(self.table, "score_bits", racing):
+            entry = self.table.probe(12345)
+        self.assertEqual(entry, (3, 1.5, Bound.LOWER, None))
+
+    def test_depth_preferred_replacement(self) -> None:
+        other_key = 7 + self.table.size  # Same slot as key 7
+        self.table.store(7, depth=5, score=1, bound=Bound.EXACT)
+        self.table.store(other_key, depth=2, score=2, bound=Bound.EXACT)
+        self.assertIsNotNone(self.table.probe(7))
+        self.assertIsNone(self.table.probe(other_key))
+
+        self.table.store(7, depth=1, score=3, bound=Bound.UPPER)  # Same position always replaces
+        self.assertEqual(self.table.probe(7), (1, 3, Bound.UPPER, None))
+
+    def test_aging_replacement(self) -> None:
+        other_key = 7 + self.table.size
+        self.table.store(7, depth=5, score=1, bound=Bound.EXACT)
+        self.table.new_search()
+        self.table.store(other_key, depth=2, score=2, bound=Bound.EXACT)
+        self.assertIsNone(self.table.probe(7))
+        self.assertIsNotNone(self.table.probe(other_key))
+
+    def test_clear(self) -> None:
+        self.table.store(7, depth=5, score=1, bound=Bound.EXACT)
+        self.table.clear()
+        self.assertIsNone(self.table.probe(7))
+
+
+class TestMinMaxTransposition(unittest.TestCase):
+
+    def test_same_scores_with_table(self) -> None:
+        fen = "r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1"
+        game = Game(board_type=BitBoard)
+        from_fen(fen, game)
+        with_table = MinMaxBot(WHITE, max_depth=1)
+        without_table = MinMaxBot(WHITE, max_depth=1, config=SearchConfig(hash_size_mb=0))
+        for move in list(game.legal_moves())[:8]:
+            game.make_move(move)
+            self.assertEqual(
+                with_table.evaluate(game, Node(1, FULL_WINDOW, 1)),
+                without_table.evaluate(game, Node(1, FULL_WINDOW, 1)),
+            )
+            game.unmake_move()
+        self.assertGreater(with_table.table.filled(), 0)  # type: ignore[union-attr]
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,75 @@
+"""
+Unittests for the incrementally updated Zobrist key.
+"""
+import unittest
+
+from engine import BitBoard, Game, from_fen
+from engine.types import BLACK, CASTLE, KING, PAWN, Location, Move
+from engine.zobrist import BLACK_QUEENSIDE, WHITE_KINGSIDE, castling_rights, zobrist_key
+
+START_FEN = "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1"
+
+
+def move(start: tuple[int, int], end: tuple[int, int]) -> Move:
+    return Move(Location(*start), Location(*end))
+
+
+class TestZobrist(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.game = Game(board_type=BitBoard, debug=True)
+        from_fen(START_FEN, self.game)
+
+    def test_polyglot_reference_keys(self) -> None:
+        """
+        Keys published with the Polyglot book format specification.
+        """
+        self.assertEqual(self.game.zobrist_key, 0x463B96181691FC9C)
+        self.game.make_move(move((6, 4), (4, 4)))  # e4
+        self.assertEqual(self.game.zobrist_key, 0x823C9B50FD114196)
+        self.game.make_move(move((1, 3), (3, 3)))  # d5
+        self.assertEqual(self.game.zobrist_key, 0x0756B94461C50FB0)
+        self.game.make_move(move((4, 4), (3, 4)))  # e5
+        self.assertEqual(self.game.zobrist_key, 0x662FAFB965DB29D4)
+
+    def test_unmake_restores_key(self) -> None:
+        initial = self.game.zobrist_key
+        for _ in range(3):
+            self.game.make_move(next(self.game.legal_moves()))
+        while self.game.undo_stack:
+            self.game.unmake_move()
+        self.assertEqual(self.game.zobrist_key, initial)
+
+    def test_castling_changes_rights(self) -> None:
+        from_fen("r3k2r/8/8/8/8/8/8/R3K2R b KQkq - 0 1", self.game)
+        self.game.make_move(Move(Location(0, 4), Location(0, 6), CASTLE, castle_type=KING))
+        self.assertEqual(
+            self.game.zobrist_key, zobrist_key(self.game.board, self.game.active_color)
+        )
+
+    def test_fen_castling_field(self) -> None:
+        from_fen("r3k2r/8/8/8/8/8/8/R3K2R w Kq - 0 1", self.game)
+        self.assertEqual(castling_rights(self.game.board), WHITE_KINGSIDE | BLACK_QUEENSIDE)
+        from_fen("r3k2r/8/8/8/8/8/8/R3K2R w - - 0 1", self.game)
+        self.assertEqual(castling_rights(self.game.board), 0)
+        self.assertTrue(self.game.board.has_moved((7, 4)))
+
+    def test_debug_detects_stale_key(self) -> None:
+        self.game.zobrist_key ^= 1
+        self.assertRaises(RuntimeError, self.game.make_move, move((6, 0), (5, 0)))
+
+    def test_direct_board_changes(self) -> None:
+        key = self.game.zobrist_key
+        self.game.board.place_piece((4, 4), (BLACK, PAWN))
+        self.assertNotEqual(self.game.zobrist_key, key)
+        self.assertEqual(
+            self.game.zobrist_key, zobrist_key(self.game.board, self.game.active_color)
+        )
+        self.game.make_move(move((6, 0), (5, 0)))  # Checked against a recomputation
+        self.game.board.remove_piece((4, 4))
+        self.game.unmake_move()
+        self.assertEqual(self.game.zobrist_key, key)
+
+
+if __name__ == "__main__":
+    unittest.main()